@@ -0,0 +1,142 @@
+# HTTP Response Encoding
+# Accept-Encoding negotiation, gzip/brotli compression and ETag validation shared by all endpoints
+
+import functools
+import gzip
+import os
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))  # smaller bodies are sent as-is
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Server preference order when the client weights encodings equally
+SUPPORTED_ENCODINGS = ('br', 'gzip') if BROTLI_AVAILABLE else ('gzip',)
+
+# Cache entry field holding the precompressed body for each encoding
+ENCODED_BODY_FIELDS = {'gzip': 'body_gzip', 'br': 'body_br'}
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q-value}"""
+    weights: Dict[str, float] = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported content coding for the client, or None for identity"""
+    weights = parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        q = weights.get(coding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress body with the given content coding"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def precompress(body: bytes) -> Dict[str, bytes]:
+    """Compressed variants of body for every supported encoding, keyed by cache field"""
+    return {ENCODED_BODY_FIELDS[encoding]: compress(body, encoding) for encoding in SUPPORTED_ENCODINGS}
+
+
+def select_body(entry: Dict[str, Any], accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """Choose a cached entry's precompressed body for the client, falling back to identity"""
+    body = entry['body']
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return body, None
+    encoding = negotiate_encoding(accept_encoding)
+    encoded_body = entry.get(ENCODED_BODY_FIELDS.get(encoding, ''))
+    if encoded_body is None:
+        return body, None
+    return encoded_body, encoding
+
+
+def make_etag(content_hash: str, encoding: Optional[str] = None) -> str:
+    """Weak ETag for a payload hash; each content coding gets its own validator
+
+    Weak because the hash leaves out rebuild timestamps, so two bodies that
+    differ only in those share a validator.
+    """
+    tag = content_hash[:32]
+    return f'W/"{tag}-{encoding}"' if encoding else f'W/"{tag}"'
+
+
+def etag_matches(if_none_match: Optional[str], content_hash: str) -> bool:
+    """Whether an If-None-Match header names this payload in any content coding"""
+    if not if_none_match:
+        return False
+    tag = content_hash[:32]
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        if candidate == tag or candidate.startswith(f'{tag}-'):
+            return True
+    return False
+
+
+def add_vary(headers, value: str = 'Accept-Encoding'):
+    """Add a token to the Vary header without duplicating it"""
+    existing = headers.get('Vary', '')
+    tokens = [token.strip() for token in existing.split(',') if token.strip()]
+    if value.lower() not in (token.lower() for token in tokens):
+        tokens.append(value)
+    headers['Vary'] = ', '.join(tokens)
+
+
+def encode_response(req, response):
+    """Compress a response body in place when the client accepts it"""
+    if response.headers.get('Content-Encoding') or response.direct_passthrough:
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return response
+    encoding = negotiate_encoding(req.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    add_vary(response.headers)
+    return response
+
+
+def encoded_response(handler):
+    """Decorator applying Accept-Encoding negotiation to an HTTP function's response"""
+    @functools.wraps(handler)
+    def wrapper(req, *args, **kwargs):
+        return encode_response(req, handler(req, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,198 @@
+# Line Index
+# Best available line, consensus line and book count per market and side, built once per odds snapshot
+
+import statistics
+import threading
+import weakref
+from typing import Any, Dict, List, Optional
+
+from odds_normalization import normalized_snapshot_games
+from parlay_pricing import (
+    NUMPY_AVAILABLE, american_to_decimal, decimal_to_american, is_valid_american_odds, load_numpy
+)
+
+
+def _moneyline_rank(line: Dict[str, Any]):
+    return line['price']
+
+
+def _spread_rank(line: Dict[str, Any]):
+    # More points for the bettor first, then the better price
+    return line['point'], line['price']
+
+
+def _over_rank(line: Dict[str, Any]):
+    return -line['point'], line['price']
+
+
+def _under_rank(line: Dict[str, Any]):
+    return line['point'], line['price']
+
+
+# American odds order the same way as payouts (-105 beats -110, +150 beats +120)
+_RANKS = {
+    'moneyline': {'home': _moneyline_rank, 'away': _moneyline_rank},
+    'spread': {'home': _spread_rank, 'away': _spread_rank},
+    'total': {'over': _over_rank, 'under': _under_rank}
+}
+
+# (market, side) slots of the vectorized index and the sign applied to the point when ranking
+# (0: price only, 1: more points first, -1: fewer points first); must agree with _RANKS
+_SLOTS = [('moneyline', 'home'), ('moneyline', 'away'), ('spread', 'home'), ('spread', 'away'),
+          ('total', 'over'), ('total', 'under')]
+_SLOT_INDEX = {slot: i for i, slot in enumerate(_SLOTS)}
+_POINT_SIGNS = [0, 0, 1, 1, -1, 1]
+
+
+def _line(market: str, value: Any) -> Optional[Dict[str, Any]]:
+    """A book's line as {'price'[, 'point']}, or None when it is incomplete or not valid American odds"""
+    line = {'price': value} if market == 'moneyline' else value
+    if not isinstance(line, dict) or not is_valid_american_odds(line.get('price')) or \
+            (market != 'moneyline' and line.get('point') is None):
+        return None
+    return line
+
+
+def _consensus_price(decimals: List[float]) -> int:
+    # Median of the payouts, not of the American odds, so -105 and +105 average to even money
+    return int(decimal_to_american(statistics.median(decimals)))
+
+
+def _entry(market: str, best: Dict[str, Any], book: str, consensus_point: Optional[float],
+           consensus_price: int, books: int) -> Dict[str, Any]:
+    consensus = {'price': consensus_price} if market == 'moneyline' else \
+        {'point': consensus_point, 'price': consensus_price}
+    return {**best, 'book': book, 'consensus': consensus, 'books': books}
+
+
+def best_lines(sportsbooks: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Best line per market and side across a game's books, with the book offering it
+
+    Moneylines pick the highest price; spreads the most points, then price;
+    totals the lowest over / highest under, then price. The first book listed
+    wins ties. Each entry also carries the consensus (median point and median
+    payout across books) and the number of books quoting that side.
+    """
+    quotes: Dict[str, Dict[str, List]] = {}
+    for book, lines in sportsbooks.items():
+        for market, sides in lines.items():
+            ranks = _RANKS.get(market)
+            if ranks is None:
+                continue
+            for side, value in sides.items():
+                line = _line(market, value)
+                if side in ranks and line is not None:
+                    quotes.setdefault(market, {}).setdefault(side, []).append((book, line))
+
+    best: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for market, sides in quotes.items():
+        for side, side_quotes in sides.items():
+            rank = _RANKS[market][side]
+            book, line = side_quotes[0]
+            for candidate_book, candidate in side_quotes[1:]:
+                if rank(candidate) > rank(line):
+                    book, line = candidate_book, candidate
+            consensus_point = None if market == 'moneyline' else \
+                float(statistics.median(quote['point'] for _, quote in side_quotes))
+            consensus_price = _consensus_price([american_to_decimal(quote['price']) for _, quote in side_quotes])
+            best.setdefault(market, {})[side] = _entry(market, line, book, consensus_point, consensus_price,
+                                                       len(side_quotes))
+    return best
+
+
+def _group_medians(np, values, groups, starts, counts):
+    """Median of values within each group (groups sorted contiguously at starts)"""
+    ordered = values[np.lexsort((values, groups))]
+    return (ordered[starts + (counts - 1) // 2] + ordered[starts + counts // 2]) / 2
+
+
+def _build_line_index_numpy(games: List[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
+    """build_line_index as grouped array reductions over every quote in the snapshot"""
+    np = load_numpy()
+
+    # One row per (game, market, side, book) quote; the group id is game * slots + slot
+    groups, positions, points, prices, quotes = [], [], [], [], []
+    slot_count = len(_SLOTS)
+    for game_number, game in enumerate(games):
+        base = game_number * slot_count
+        for position, (book, lines) in enumerate(game['sportsbooks'].items()):
+            for market, sides in lines.items():
+                moneyline = market == 'moneyline'
+                for side, value in sides.items():
+                    slot = _SLOT_INDEX.get((market, side))
+                    if slot is None:
+                        continue
+                    if moneyline:
+                        if not is_valid_american_odds(value):
+                            continue
+                        point, price, line = 0.0, value, {'price': value}
+                    else:
+                        point, price, line = value.get('point'), value.get('price'), value
+                        if point is None or not is_valid_american_odds(price):
+                            continue
+                    groups.append(base + slot)
+                    positions.append(position)
+                    points.append(point)
+                    prices.append(price)
+                    quotes.append((book, line))
+
+    index: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+    if not groups:
+        return index
+
+    groups = np.asarray(groups, dtype=np.int64)
+    points = np.asarray(points, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    ranked_points = points * np.asarray(_POINT_SIGNS, dtype=np.float64)[groups % len(_SLOTS)]
+
+    # Within each group ascending by point, price and reverse listing order: the last row is the best
+    order = np.lexsort((-np.asarray(positions), prices, ranked_points, groups))
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    counts = np.diff(np.r_[starts, len(order)])
+    best_rows = order[starts + counts - 1]
+
+    consensus_points = _group_medians(np, points, groups, starts, counts)
+    consensus_prices = decimal_to_american(_group_medians(np, american_to_decimal(prices), groups, starts, counts))
+
+    for group, row, count, consensus_point, consensus_price in zip(
+            sorted_groups[starts].tolist(), best_rows.tolist(), counts.tolist(),
+            consensus_points.tolist(), consensus_prices.tolist()):
+        game_number, slot = divmod(group, len(_SLOTS))
+        market, side = _SLOTS[slot]
+        book, line = quotes[row]
+        game_lines = index.setdefault(games[game_number]['id'], {})
+        game_lines.setdefault(market, {})[side] = _entry(market, line, book, consensus_point, int(consensus_price),
+                                                         count)
+    return index
+
+
+def build_line_index(games: List[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
+    """game id -> best_lines for every game with at least one complete quote
+
+    Uses grouped numpy reductions over the whole snapshot when numpy is
+    available, and best_lines per game otherwise; both give the same index.
+    """
+    if NUMPY_AVAILABLE:
+        return _build_line_index_numpy(games)
+    index = {}
+    for game in games:
+        lines = best_lines(game['sportsbooks'])
+        if lines:
+            index[game['id']] = lines
+    return index
+
+
+_index_lock = threading.Lock()
+_indexes: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+
+def snapshot_line_index(snapshot: Any) -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
+    """The line index for an odds snapshot, built on first use and dropped with the snapshot"""
+    with _index_lock:
+        index: Optional[Dict[str, Any]] = _indexes.get(snapshot)
+    if index is None:
+        index = build_line_index(normalized_snapshot_games(snapshot))
+        with _index_lock:
+            index = _indexes.setdefault(snapshot, index)
+    return index
@@ -0,0 +1,180 @@
+# Live Score Lookup
+# Memoized API-Sports responses with a prebuilt team-name index per sport
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from single_flight import SingleFlight
+from team_registry import TeamRegistry, team_registry
+
+
+def _parse_timestamp(value: Any) -> Optional[float]:
+    """Seconds since epoch from an ISO string or numeric timestamp"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _score_game_timestamp(score_game: Dict[str, Any]) -> Optional[float]:
+    """Start time of an API-Sports game (flat or american-football nested layout)"""
+    timestamp = _parse_timestamp(score_game.get('timestamp'))
+    if timestamp is None:
+        timestamp = _parse_timestamp(score_game.get('date'))
+    if timestamp is None:
+        date_info = (score_game.get('game') or {}).get('date') or {}
+        timestamp = _parse_timestamp(date_info.get('timestamp'))
+    return timestamp
+
+
+class MatchMetrics:
+    """Per-sport counters for Odds API -> API-Sports match attempts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, sport_key: str, matched: bool):
+        """Count one match attempt"""
+        with self._lock:
+            counts = self._counts.setdefault(sport_key, {'attempts': 0, 'matched': 0})
+            counts['attempts'] += 1
+            if matched:
+                counts['matched'] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Attempts, matches and match rate per sport"""
+        with self._lock:
+            return {
+                sport: {
+                    **counts,
+                    'match_rate': round(counts['matched'] / counts['attempts'], 4) if counts['attempts'] else None
+                }
+                for sport, counts in self._counts.items()
+            }
+
+
+class LiveScoreIndex:
+    """Dict-based lookup from canonical (home, away) teams to API-Sports games"""
+
+    def __init__(self, sport_key: str, score_games: List[Dict[str, Any]], registry: TeamRegistry = team_registry):
+        self.sport_key = sport_key
+        self.registry = registry
+        self.size = len(score_games)
+        self._by_teams: Dict[Tuple[str, str], List[Tuple[Optional[float], Dict[str, Any]]]] = {}
+
+        for score_game in score_games:
+            teams = score_game.get('teams') or {}
+            home = registry.team_key(sport_key, (teams.get('home') or {}).get('name'))
+            away = registry.team_key(sport_key, (teams.get('away') or {}).get('name'))
+            if not home or not away:
+                continue
+            # A matchup repeats across a season; keep every meeting with its start time
+            self._by_teams.setdefault((home, away), []).append((_score_game_timestamp(score_game), score_game))
+
+    def match(self, home_team: Optional[str], away_team: Optional[str],
+              commence_time: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Find the API-Sports game for an Odds API matchup
+
+        When the matchup occurs more than once, the meeting closest to
+        commence_time wins; without a time the first listed meeting wins.
+        """
+        home = self.registry.team_key(self.sport_key, home_team)
+        away = self.registry.team_key(self.sport_key, away_team)
+        meetings = self._by_teams.get((home, away))
+        if not meetings:
+            return None
+
+        target = _parse_timestamp(commence_time)
+        if target is None or len(meetings) == 1:
+            return meetings[0][1]
+        return min(
+            meetings,
+            key=lambda meeting: abs(meeting[0] - target) if meeting[0] is not None else float('inf')
+        )[1]
+
+
+class ApiSportsScoreCache:
+    """TTL cache of API-Sports score indexes keyed by sport and season
+
+    ttl_for, when given, computes the TTL in milliseconds at lookup time
+    (for example from upstream quota); otherwise ttl_ms is used.
+    """
+
+    def __init__(self, fetcher: Callable[[str, str], Optional[List[Dict[str, Any]]]], ttl_ms: int,
+                 ttl_for: Optional[Callable[[], int]] = None):
+        self.fetcher = fetcher
+        self.ttl_ms = ttl_ms
+        self.ttl_for = ttl_for
+        self._entries: Dict[Tuple[str, str], Tuple[int, LiveScoreIndex]] = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.stats = {'hits': 0, 'fetches': 0, 'coalesced': 0, 'failures': 0}
+        self.match_metrics = MatchMetrics()
+
+    def get_index(self, sport_key: str, season: str) -> Optional[LiveScoreIndex]:
+        """Return a fresh score index for the sport and season, fetching if needed"""
+        key = (sport_key, season)
+        now = int(time.time() * 1000)
+        ttl_ms = self.ttl_for() if self.ttl_for else self.ttl_ms
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < ttl_ms:
+                self.stats['hits'] += 1
+                return entry[1]
+
+        # Concurrent misses for the same sport and season share one fetch
+        index, shared = self._flights.do(f"{sport_key}:{season}", lambda: self._fetch(sport_key, season))
+        if shared:
+            self.stats['coalesced'] += 1
+        return index
+
+    def _fetch(self, sport_key: str, season: str) -> Optional[LiveScoreIndex]:
+        self.stats['fetches'] += 1
+        score_games = self.fetcher(sport_key, season)
+        if score_games is None:
+            self.stats['failures'] += 1
+            return None
+
+        index = LiveScoreIndex(sport_key, score_games)
+        with self._lock:
+            self._entries[(sport_key, season)] = (int(time.time() * 1000), index)
+        return index
+
+
+class LiveScoreSession:
+    """Request-scoped view over the score cache
+
+    Each sport is resolved at most once per request, including failures, so a
+    request never calls API-Sports more than once per sport. indexes seeds
+    sports already resolved by a concurrent prefetch (None for a failed or
+    late fetch), which are then never fetched again on the request path.
+    """
+
+    def __init__(self, cache: ApiSportsScoreCache, season: str,
+                 indexes: Optional[Dict[str, Optional[LiveScoreIndex]]] = None):
+        self.cache = cache
+        self.season = season
+        self._indexes: Dict[str, Optional[LiveScoreIndex]] = dict(indexes or {})
+
+    def index_for(self, sport_key: str) -> Optional[LiveScoreIndex]:
+        """Score index for a sport, memoized for the lifetime of this session"""
+        if sport_key not in self._indexes:
+            self._indexes[sport_key] = self.cache.get_index(sport_key, self.season)
+        return self._indexes[sport_key]
+
+    def match(self, sport_key: str, home_team: Optional[str], away_team: Optional[str],
+              commence_time: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Find the API-Sports game for a matchup in the given sport"""
+        index = self.index_for(sport_key)
+        if index is None:
+            return None
+        score_game = index.match(home_team, away_team, commence_time)
+        self.cache.match_metrics.record(sport_key, score_game is not None)
+        return score_game
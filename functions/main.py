@@ -6,32 +6,75 @@ from firebase_functions.options import set_global_options
 from firebase_admin import initialize_app, auth
 from flask import Flask, request, jsonify, Request
 from flask_cors import CORS
-import requests
 import json
+import math
 import os
+import sys
+import threading
 import time
 import random
 import jwt
-from datetime import datetime, timedelta
-import pytz
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
-from marshmallow import Schema, fields, validate, ValidationError
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
+from odds_snapshot import OddsSnapshotStore, SNAPSHOT_MARKETS, fan_out
+from live_scores import ApiSportsScoreCache, LiveScoreSession
+from response_cache import ResponseCache, Serialized
+from http_encoding import encoded_response, etag_matches, make_etag, select_body
+from rate_limiter import create_rate_limiter
+from upstream_client import UpstreamClient
+from quota_governor import QuotaGovernor
+from token_cache import KeyRefresher, VerifiedTokenCache
+from parlay_pricing import price_parlays
+from odds_normalization import ALL_MARKETS, normalize_game, normalized_snapshot_games
+from line_index import best_lines, snapshot_line_index
+from precomputed_views import (
+    LIVE_PRECOMPUTE_INTERVAL_SECONDS, PRECOMPUTE_INTERVAL_MINUTES, PrecomputedViews, create_view_store
+)
+from parlay_simulation import (
+    SIMULATION_TIME_BUDGET_MS, NUMPY_AVAILABLE as SIMULATION_AVAILABLE, find_correlated_legs, resolve_leg_games,
+    simulate_joint_probability
+)
 
 # Load environment variables
 load_dotenv()
 
 # Firebase Admin SDK initialization (lazy-loaded)
 firebase_app = None
+firebase_app_lock = threading.Lock()
 
 def get_firebase_app():
-    """Get or initialize Firebase app"""
+    """Get or initialize Firebase app (safe to call from the key refresher and request threads at once)"""
     global firebase_app
     if firebase_app is None:
-        firebase_app = initialize_app()
+        with firebase_app_lock:
+            if firebase_app is None:
+                firebase_app = initialize_app()
     return firebase_app
 
+def fetch_firebase_public_keys():
+    """Fetch ID token signing certificates into the Admin SDK's cache-control session
+
+    Relies on Admin SDK internals (firebase-admin 6.x/7.x); if they move in a
+    later release this becomes a no-op and verification fetches keys itself.
+    """
+    try:
+        from firebase_admin._token_gen import ID_TOKEN_CERT_URI
+        fetch_certificates = auth._get_client(get_firebase_app())._token_verifier.request
+    except (ImportError, AttributeError) as e:
+        print(f"Firebase key prefetch unavailable: {str(e)}")
+        return None
+    return fetch_certificates(ID_TOKEN_CERT_URI)
+
+def is_firebase_token_rejection(error: Exception) -> bool:
+    """Only genuine token rejections (invalid, expired, revoked) are negatively cached"""
+    return isinstance(error, auth.InvalidIdTokenError)
+
+# Verified Firebase ID token claims, and background refresh of the signing keys
+firebase_token_cache = VerifiedTokenCache()
+firebase_key_refresher = KeyRefresher(fetch_firebase_public_keys)
+
 # ---------- AUTH HELPERS ----------
 def require_firebase_user(req: Request):
     """Checks for a Firebase user ID token (used for browser/user calls)."""
@@ -39,9 +82,14 @@ def require_firebase_user(req: Request):
     if not auth_header.startswith("Bearer "):
         return None
     token = auth_header.split(" ", 1)[1]
+    firebase_key_refresher.maybe_refresh()
     try:
-        claims = auth.verify_id_token(token)
-        return claims  # includes uid, email, etc.
+        # Repeat requests with the same token skip signature verification
+        return firebase_token_cache.verify(
+            token,
+            lambda t: auth.verify_id_token(t, app=get_firebase_app()),
+            is_rejection=is_firebase_token_rejection
+        )  # includes uid, email, etc.
     except Exception:
         return None
 
@@ -94,6 +142,20 @@ APISPORTS_KEY = os.getenv('APISPORTS_KEY', None)
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
 JWT_ISSUER = os.getenv('JWT_ISSUER', 'prizmbets-api')
 JWT_AUDIENCE = os.getenv('JWT_AUDIENCE', 'prizmbets-app')
+JWT_ALGORITHMS = ['HS256']
+JWT_MAX_AGE_SECONDS = 86400  # tokens older than 24 hours must be reissued
+
+# Validation options are built once; every decode reuses the same configured decoder
+jwt_decoder = jwt.PyJWT(options={
+    'verify_signature': True,
+    'verify_exp': True,
+    'verify_iat': True,
+    'verify_nbf': True,
+    'verify_iss': True,
+    'verify_aud': True,
+    'require': ['exp', 'iat']
+})
+jwt_token_cache = VerifiedTokenCache()
 
 # Validation function to be called when functions are invoked
 def validate_env_vars():
@@ -111,12 +173,38 @@ APISPORTS_ENDPOINTS = {
     'baseball_mlb': 'https://v1.baseball.api-sports.io',
     'icehockey_nhl': 'https://v1.hockey.api-sports.io'
 }
+APISPORTS_SEASON = '2024'  # Current season
+
+# Keep-alive connection pools and retry policy shared by every upstream fetch
+upstream_client = UpstreamClient()
 
-# Enhanced cache for API responses with TTL management
-api_cache = {}
+# Quota accounting from provider usage headers; drives adaptive cache TTLs
+# The Odds API quota is monthly (renewal day configurable); API-Sports resets daily at 00:00 UTC
+odds_quota = QuotaGovernor(
+    'the-odds-api', 'x-requests-remaining', 'x-requests-used',
+    period='month', reset_day=int(os.getenv('ODDS_QUOTA_RESET_DAY', '1'))
+)
+apisports_quota = QuotaGovernor('api-sports', 'x-ratelimit-requests-remaining', period='day')
+
+# Bounded cache for API responses with TTL, LRU and stale-while-revalidate management
 CACHE_DURATION = 300000  # 5 minutes in milliseconds
 LIVE_CACHE_DURATION = 60000  # 1 minute for live data
 ODDS_CACHE_DURATION = 120000  # 2 minutes for odds data
+api_cache = ResponseCache(default_ttl=CACHE_DURATION)
+
+# Views published by the scheduled precompute pipeline, shared by every instance
+precomputed_views = PrecomputedViews(lambda: create_view_store(get_firebase_app))
+
+def load_view(cache_key, build, max_age_ms):
+    """Cache loader: the published view when it is younger than max_age_ms, else build it
+
+    Published views are served as stored (body and hash reused) and the cache
+    entry ages from when the view was generated, not from when it was read.
+    """
+    record = precomputed_views.load(cache_key, max_age_ms=max_age_ms)
+    if record is None:
+        return build()
+    return Serialized(record['body'], record['content_hash'], record['generated_at'])
 
 # Sport key mapping for frontend to API compatibility
 SPORT_KEY_MAPPING = {
@@ -136,41 +224,228 @@ SPORT_KEY_MAPPING = {
     'wnba': 'basketball_wnba'
 }
 
-# Rate limiting storage
-rate_limit_storage = {}
+# Rate limiting
 RATE_LIMIT_WINDOW = 60000  # 1 minute in milliseconds
 RATE_LIMIT_MAX_REQUESTS = 100  # requests per window
+rate_limiter = create_rate_limiter(RATE_LIMIT_WINDOW)
 
-# Input validation schemas
-class BetSchema(Schema):
-    team = fields.Str(required=True, validate=validate.Length(min=1, max=100))
-    bet_type = fields.Str(required=True, validate=validate.OneOf(['spread', 'moneyline', 'total', 'prop']))
-    odds = fields.Int(required=True, validate=validate.Range(min=-1000, max=1000))
-    line = fields.Float(allow_none=True, validate=validate.Range(min=-100, max=100))
+# Input validation schemas live in request_schemas, imported on first validation so
+# marshmallow stays off the cold-start path of endpoints that take no request body
+def loaded_validation_stats():
+    """Compiled-validator counters, without importing the validation layer just for a health check"""
+    module = sys.modules.get('request_validation')
+    return module.get_validation_stats() if module else {}
+
+def validate_request_data(schema_class, data):
+    """Validate request data against a schema compiled once per process
+
+    Returns (result, None) or (None, errors) where errors holds a safe
+    message plus per-field details.
+    """
+    from request_validation import get_validator
+    return get_validator(schema_class).validate(data)
+
+# Batch evaluation: parlays in one request are validated independently so each reports its own errors
+MAX_PARLAY_BATCH = 50
+
+def validate_parlay_batch(items):
+    """Validate a list of parlays
+
+    Returns (valid, errors): validated parlays and field errors, each keyed by
+    the parlay's position in the request.
+    """
+    from request_schemas import ParlaySchema
+    from request_validation import get_validator
+    validator = get_validator(ParlaySchema)
+    valid, errors = {}, {}
+    for index, item in enumerate(items):
+        result, error = validator.validate(item)
+        if error:
+            errors[index] = error['details']
+        else:
+            valid[index] = result
+    return valid, errors
+
+def evaluate_parlay_batch(items):
+    """Evaluate many parlays, returning results in input order with per-item errors"""
+    valid, errors = validate_parlay_batch(items)
+    indexes = sorted(valid)
+    evaluations = dict(zip(indexes, evaluate_parlays([valid[index] for index in indexes]))) if indexes else {}
     
-class ParlaySchema(Schema):
-    bets = fields.List(fields.Nested(BetSchema), required=True, validate=validate.Length(min=1, max=12))
-    total_amount = fields.Float(required=True, validate=validate.Range(min=1, max=10000))
+    results = []
+    for index in range(len(items)):
+        if index in evaluations:
+            results.append({'index': index, **evaluations[index]})
+        else:
+            results.append({
+                'index': index,
+                'success': False,
+                'error': 'Invalid parlay',
+                'details': errors.get(index, {'_schema': ['Invalid parlay']})
+            })
     
-class SportFilterSchema(Schema):
-    sport = fields.Str(required=False, validate=validate.OneOf([
-        'nfl', 'nba', 'mlb', 'nhl', 'mma', 'ufc', 'soccer', 'tennis', 
-        'golf', 'ncaaf', 'ncaab', 'wnba', 'americanfootball_nfl',
-        'basketball_nba', 'baseball_mlb', 'icehockey_nhl', 'mma_mixed_martial_arts'
-    ]))
-    per_sport = fields.Int(required=False, validate=validate.Range(min=1, max=50))
-    upcoming = fields.Bool(required=False)
+    return {
+        'success': True,
+        'batch_size': len(items),
+        'evaluated': len(evaluations),
+        'failed': len(items) - len(evaluations),
+        'results': results
+    }
 
-def validate_request_data(schema_class, data):
-    """Validate request data using marshmallow schema"""
-    try:
-        schema = schema_class()
-        result = schema.load(data)
-        return result, None
-    except ValidationError as e:
-        return None, f"Validation error: {str(e.messages)}"
-    except Exception as e:
-        return None, f"Validation failed: {str(e)}"
+def evaluate_parlay(bets, total_amount, simulation=None):
+    """Score a validated parlay from its priced legs (deterministic; seeded when simulated)"""
+    parlay = {'bets': bets, 'total_amount': total_amount}
+    if simulation is not None:
+        parlay['simulation'] = simulation
+    return evaluate_parlays([parlay])[0]
+
+def find_parlay_correlations(bets):
+    """Correlated leg pairs, placing legs in games from the stored odds snapshots (no upstream fetch)"""
+    legs = [{**bet, 'sport': SPORT_KEY_MAPPING.get(bet['sport'], bet['sport'])} if bet.get('sport') else bet
+            for bet in bets]
+    return find_correlated_legs(legs, resolve_leg_games(legs, odds_snapshots.peek_all()))
+
+def simulate_parlay(pricing, correlations, options, deadline):
+    """Monte Carlo joint hit probability for a parlay within what is left of the request's time budget"""
+    if not SIMULATION_AVAILABLE:
+        return {'available': False, 'reason': 'Simulation engine unavailable'}
+    remaining_ms = (deadline - time.perf_counter()) * 1000
+    if remaining_ms <= 0:
+        return {'available': False, 'reason': 'Simulation time budget exhausted'}
+    result = simulate_joint_probability(
+        [leg['fair_probability'] for leg in pricing['legs']],
+        correlations,
+        trials=options['trials'],
+        seed=options['seed'],
+        time_budget_ms=remaining_ms
+    )
+    payout = pricing['potential_payout']
+    result['expected_value'] = round(result['joint_probability'] * payout - pricing['stake'], 2)
+    result['expected_return_pct'] = round(result['expected_value'] / pricing['stake'] * 100, 2)
+    return {'available': True, **result}
+
+def evaluate_parlays(parlays):
+    """Score many validated parlays, pricing them together in one engine pass
+
+    Parlays that request simulation share one SIMULATION_TIME_BUDGET_MS
+    budget, so a batch stays within a single request's latency envelope.
+    """
+    pricings = price_parlays([parlay['bets'] for parlay in parlays], [parlay['total_amount'] for parlay in parlays])
+    deadline = time.perf_counter() + SIMULATION_TIME_BUDGET_MS / 1000
+    
+    results = []
+    for parlay, pricing in zip(parlays, pricings):
+        correlations = find_parlay_correlations(parlay['bets'])
+        simulation = None
+        if parlay.get('simulation') is not None:
+            simulation = simulate_parlay(pricing, correlations, parlay['simulation'], deadline)
+        results.append(score_priced_parlay(parlay['bets'], pricing, correlations, simulation))
+    return results
+
+def score_priced_parlay(bets, pricing, correlations=(), simulation=None):
+    """Build the evaluation response for one parlay from its pricing
+
+    correlations are the leg pairs from find_parlay_correlations; when a
+    completed simulation is given its joint probability replaces the
+    independent one in the value assessment.
+    """
+    num_bets = len(bets)
+    correlated_with = {}
+    for pair in correlations:
+        first, second = pair['legs']
+        correlated_with.setdefault(first, []).append((second, pair['relation']))
+        correlated_with.setdefault(second, []).append((first, pair['relation']))
+    
+    bet_analyses = []
+    for i, (bet, leg) in enumerate(zip(bets, pricing['legs'])):
+        probability = leg['fair_probability']
+        
+        factors = [f"Vig-free win probability {probability:.0%}"]
+        if probability >= 0.7:
+            factors.append('Heavy favorite')
+        elif probability < 0.4:
+            factors.append('Underdog price')
+        if bet.get('opposing_odds') is None:
+            factors.append('No reference market provided; standard -110 margin assumed')
+        for other, relation in correlated_with.get(i, []):
+            factors.append(f"Correlated with bet {other + 1} ({relation.replace('_', ' ')})")
+        
+        bet_analyses.append({
+            'bet_number': i + 1,
+            'team': bet.get('team', f'Team {i+1}'),
+            'bet_type': bet.get('bet_type', 'Spread'),
+            'odds': bet.get('odds', -110),
+            'decimal_odds': leg['decimal_odds'],
+            'implied_probability': leg['implied_probability'],
+            'confidence_score': round(probability, 2),
+            'individual_score': round(min(10.0, max(1.0, probability * 10)), 1),
+            'key_factors': factors,
+            'risk_assessment': 'Low' if probability > 0.65 else 'Medium' if probability > 0.45 else 'High'
+        })
+    
+    # Geometric mean of leg scores, scaled down by the bettor's expected loss
+    base_score = math.prod(analysis['individual_score'] for analysis in bet_analyses) ** (1 / num_bets)
+    simulated = simulation is not None and simulation.get('available')
+    expected_return_pct = simulation['expected_return_pct'] if simulated else pricing['expected_return_pct']
+    value_factor = max(0.0, 1 + expected_return_pct / 100)
+    
+    # Penalize each pair of legs that share a game or a team
+    correlation_penalty = min(1.0, 0.25 * len(correlations))
+    overall_score = min(10.0, max(1.0, base_score * value_factor - correlation_penalty))
+    
+    # Generate recommendation
+    if overall_score >= 8.0:
+        recommendation = "STRONG BET"
+        confidence_level = "High"
+    elif overall_score >= 7.0:
+        recommendation = "GOOD BET"
+        confidence_level = "Medium-High"
+    elif overall_score >= 6.0:
+        recommendation = "FAIR BET"
+        confidence_level = "Medium"
+    else:
+        recommendation = "RISKY BET"
+        confidence_level = "Low"
+    
+    return {
+        'success': True,
+        'overall_score': round(overall_score, 1),
+        'recommendation': recommendation,
+        'confidence_level': confidence_level,
+        'parlay_analysis': {
+            'total_bets': num_bets,
+            'potential_payout': pricing['potential_payout'],
+            'potential_profit': pricing['potential_profit'],
+            'decimal_odds': pricing['decimal_odds'],
+            'implied_probability': pricing['implied_probability'],
+            'fair_probability': pricing['fair_probability'],
+            'expected_value': pricing['expected_value'],
+            'expected_return_pct': pricing['expected_return_pct'],
+            'house_edge_pct': pricing['house_edge_pct'],
+            'risk_level': confidence_level,
+            'correlation_impact': f"{correlation_penalty:.1f} point penalty",
+            'correlated_legs': [
+                {
+                    'bets': [pair['legs'][0] + 1, pair['legs'][1] + 1],
+                    'relation': pair['relation'],
+                    'correlation': pair['correlation'],
+                    'game_id': pair['game_id']
+                }
+                for pair in correlations
+            ]
+        },
+        **({'simulation': simulation} if simulation is not None else {}),
+        'individual_bets': bet_analyses,
+        'key_insights': [
+            f"This {num_bets}-leg parlay has an overall score of {overall_score:.1f}/10",
+            f"Pays {pricing['decimal_odds']:.2f}x with a {pricing['fair_probability']:.1%} vig-free chance to hit",
+            f"Expected value: {pricing['expected_value']:+.2f} ({pricing['expected_return_pct']:+.1f}%)",
+            *([f"Simulated joint hit chance {simulation['joint_probability']:.1%} over {simulation['trials']:,} trials "
+               f"(expected value {simulation['expected_value']:+.2f})"] if simulated else []),
+            f"Risk assessment: {confidence_level}",
+            f"Primary recommendation: {recommendation}"
+        ]
+    }
 
 def sanitize_error_message(error_msg, is_production=True):
     """Sanitize error messages for production to prevent information leakage"""
@@ -193,55 +468,47 @@ def sanitize_error_message(error_msg, is_production=True):
     # Default safe message
     return "An error occurred. Please try again or contact support."
 
-def clean_expired_cache():
-    """Clean expired cache entries to prevent memory bloat"""
-    current_time = int(time.time() * 1000)
-    expired_keys = [
-        key for key, value in api_cache.items()
-        if current_time - value['timestamp'] > value.get('ttl', CACHE_DURATION)
-    ]
-    for key in expired_keys:
-        del api_cache[key]
+def fetch_odds_snapshot(sport):
+    """Fetch all snapshot markets for a sport from The Odds API"""
+    try:
+        odds_url = f"{ODDS_API_BASE_URL}/sports/{sport}/odds"
+        params = {
+            'apiKey': ODDS_API_KEY,
+            'regions': 'us',
+            'markets': SNAPSHOT_MARKETS,
+            'oddsFormat': 'american',
+            'dateFormat': 'iso'
+        }
+
+        response = upstream_client.get(odds_url, params=params)
+        odds_quota.record(response.headers)
+
+        if response.status_code == 200:
+            return response.json()
+        print(f"Odds API error for {sport}: {response.status_code}")
+
+    except Exception as e:
+        print(f"Odds API request failed for {sport}: {str(e)}")
+
+    return None
+
+# Shared per-sport odds snapshots used by every odds/games/live endpoint
+odds_snapshots = OddsSnapshotStore(
+    fetch_odds_snapshot, ODDS_CACHE_DURATION,
+    ttl_for=lambda snapshot: odds_quota.ttl_for(ODDS_CACHE_DURATION, snapshot.next_start())
+)
 
 def convert_bookmakers_to_sportsbooks(game_data):
-    """Convert bookmakers array format to sportsbooks object format"""
-    converted_game = {
-        'id': game_data.get('id'),
-        'sport': game_data.get('sport'),
-        'commence_time': game_data.get('commence_time'),
-        'home_team': game_data.get('home_team'),
-        'away_team': game_data.get('away_team'),
-        'status': 'scheduled',
-        'sportsbooks': {}
-    }
-    
-    # Convert bookmaker array to sportsbooks object
-    for bookmaker in game_data.get('bookmakers', []):
-        book_key = bookmaker.get('key')
-        if book_key in ['draftkings', 'fanduel', 'betmgm', 'caesars', 'betrivers']:
-            for market in bookmaker.get('markets', []):
-                if market.get('key') == 'h2h':
-                    outcomes = market.get('outcomes', [])
-                    moneyline = {}
-                    for outcome in outcomes:
-                        if outcome.get('name') == game_data.get('home_team'):
-                            moneyline['home'] = outcome.get('price')
-                        elif outcome.get('name') == game_data.get('away_team'):
-                            moneyline['away'] = outcome.get('price')
-                    
-                    if moneyline:
-                        converted_game['sportsbooks'][book_key] = {
-                            'moneyline': moneyline
-                        }
-    
-    return converted_game
+    """Convert bookmakers array format to sportsbooks object format (moneyline, spread and total)"""
+    return normalize_game(game_data, markets=ALL_MARKETS)
+
+def check_rate_limit(req, max_requests=RATE_LIMIT_MAX_REQUESTS, user_id=None, cost=1):
+    """Check if request exceeds rate limit with user-based and IP-based limits
 
-def check_rate_limit(req, max_requests=RATE_LIMIT_MAX_REQUESTS, user_id=None):
-    """Check if request exceeds rate limit with user-based and IP-based limits"""
+    cost is the number of rate-limit units the request consumes (e.g. one per
+    parlay in a batch evaluation).
+    """
     try:
-        current_time = int(time.time() * 1000)
-        window_start = current_time - RATE_LIMIT_WINDOW
-        
         # Determine rate limit key (prefer user_id over IP)
         if user_id:
             limit_key = f"user:{user_id}"
@@ -257,39 +524,19 @@ def check_rate_limit(req, max_requests=RATE_LIMIT_MAX_REQUESTS, user_id=None):
             )
             limit_key = f"ip:{client_ip}"
         
-        # Clean old entries for all stored keys
-        expired_keys = []
-        for key, requests in rate_limit_storage.items():
-            rate_limit_storage[key] = [
-                timestamp for timestamp in requests
-                if timestamp > window_start
-            ]
-            if not rate_limit_storage[key]:
-                expired_keys.append(key)
+        decision = rate_limiter.hit(limit_key, max_requests, cost)
         
-        for key in expired_keys:
-            del rate_limit_storage[key]
-        
-        # Check current key's request count
-        if limit_key not in rate_limit_storage:
-            rate_limit_storage[limit_key] = []
-        
-        current_requests = len(rate_limit_storage[limit_key])
-        
-        if current_requests >= max_requests:
+        if not decision['allowed']:
             return False, {
                 'error': 'Rate limit exceeded',
                 'message': f'Maximum {max_requests} requests per minute exceeded',
-                'retry_after': 60,
+                'retry_after': decision['retry_after'],
                 'limit_type': 'user' if user_id else 'ip'
             }
         
-        # Record this request
-        rate_limit_storage[limit_key].append(current_time)
-        
         return True, {
-            'remaining': max_requests - current_requests - 1,
-            'reset_time': window_start + RATE_LIMIT_WINDOW,
+            'remaining': decision['remaining'],
+            'reset_time': decision['reset_time'],
             'limit_type': 'user' if user_id else 'ip'
         }
         
@@ -298,10 +545,9 @@ def check_rate_limit(req, max_requests=RATE_LIMIT_MAX_REQUESTS, user_id=None):
         return True, {}  # Allow request on error
 
 def get_cache_headers(cache_duration_seconds=300):
-    """Get optimized cache headers for responses"""
+    """Get optimized cache headers for responses (ETags come from the cached payload)"""
     return {
-        'Cache-Control': f'public, max-age={cache_duration_seconds}, stale-while-revalidate=60',
-        'ETag': str(hash(str(time.time() // cache_duration_seconds))),  # Simple ETag based on time window
+        'Cache-Control': f'public, max-age={cache_duration_seconds}, stale-while-revalidate={api_cache.max_stale // 1000}',
     }
 
 def get_cors_headers(origin=None):
@@ -348,6 +594,23 @@ def get_security_headers():
         'Server': 'PrizmBets-API/2.0'
     }
 
+def cached_json_response(req, cached_data, headers):
+    """Build a response from a cache entry with a content-hash ETag
+
+    Returns 304 with no body when If-None-Match already names the payload,
+    otherwise a 200 with the precompressed body the client accepts.
+    """
+    body, encoding = select_body(cached_data, req.headers.get('Accept-Encoding'))
+    headers['ETag'] = make_etag(cached_data['content_hash'], encoding)
+    
+    if etag_matches(req.headers.get('If-None-Match'), cached_data['content_hash']):
+        headers.pop('Content-Type', None)
+        return https_fn.Response(status=304, headers=headers)
+    
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return https_fn.Response(body, status=200, headers=headers)
+
 def handle_cors_preflight(req):
     """Handle CORS preflight requests"""
     origin = req.headers.get('Origin')
@@ -369,22 +632,18 @@ def verify_jwt_token(req):
         if not token:
             return None, 'Missing JWT token'
         
+        # Tokens verified recently skip the HMAC check and claims parsing
+        hit, cached = jwt_token_cache.lookup(token)
+        if hit and cached:
+            return cached['user_id'], None
+        
         # Decode JWT token with issuer and audience validation
-        decoded = jwt.decode(
-            token, 
-            JWT_SECRET_KEY, 
-            algorithms=['HS256'],
+        decoded = jwt_decoder.decode(
+            token,
+            JWT_SECRET_KEY,
+            algorithms=JWT_ALGORITHMS,
             issuer=JWT_ISSUER,
-            audience=JWT_AUDIENCE,
-            options={
-                'verify_exp': True,
-                'verify_iat': True,
-                'verify_nbf': True,
-                'verify_iss': True,
-                'verify_aud': True,
-                'require_exp': True,
-                'require_iat': True
-            }
+            audience=JWT_AUDIENCE
         )
         
         user_id = decoded.get('sub') or decoded.get('user_id')
@@ -392,14 +651,20 @@ def verify_jwt_token(req):
             return None, 'Invalid token payload'
         
         # Additional security checks
+        now = time.time()
         issued_at = decoded.get('iat')
-        if issued_at and issued_at > datetime.utcnow().timestamp():
+        if issued_at and issued_at > now:
             return None, 'Token issued in the future'
         
         # Check if token is too old (max 24 hours)
-        if issued_at and (datetime.utcnow().timestamp() - issued_at) > 86400:
+        if issued_at and (now - issued_at) > JWT_MAX_AGE_SECONDS:
             return None, 'Token expired - please login again'
         
+        jwt_token_cache.store(
+            token,
+            {'user_id': user_id, 'exp': decoded['exp']},
+            expires_at=int((issued_at + JWT_MAX_AGE_SECONDS) * 1000) if issued_at else None
+        )
         return user_id, None
         
     except jwt.ExpiredSignatureError:
@@ -427,6 +692,7 @@ def verify_jwt_token(req):
     ),
     invoker="public"
 )
+@encoded_response
 def api_health(req: https_fn.Request) -> https_fn.Response:
     """Health check endpoint"""
     if req.method == 'OPTIONS':
@@ -442,7 +708,21 @@ def api_health(req: https_fn.Request) -> https_fn.Response:
                 'odds_api': 'operational',
                 'sports_api': 'operational',
                 'firebase_functions': 'operational'
-            }
+            },
+            'cache': api_cache.get_stats(),
+            'rate_limiter': rate_limiter.get_stats(),
+            'auth_token_cache': {
+                'firebase': firebase_token_cache.get_stats(),
+                'jwt': jwt_token_cache.get_stats()
+            },
+            'upstream': upstream_client.get_stats(),
+            'validation': loaded_validation_stats(),
+            'precomputed_views': precomputed_views.get_stats(),
+            'upstream_quota': {
+                'odds_api': odds_quota.snapshot(),
+                'api_sports': apisports_quota.snapshot()
+            },
+            'live_score_matching': apisports_scores.match_metrics.snapshot()
         }),
         status=200,
         headers={
@@ -452,6 +732,31 @@ def api_health(req: https_fn.Request) -> https_fn.Response:
         }
     )
 
+def build_odds_comparison_view(sport):
+    """Build the odds comparison payload from the sport's odds snapshot (None if unavailable)"""
+    snapshot = odds_snapshots.get(sport)
+    if snapshot is None:
+        return None
+    
+    # Normalized games (moneyline, spread and total per book) and the line-shopping index (best
+    # line, book and consensus per side) are built by the first odds view of each snapshot and
+    # shared until the next fetch; other endpoints reading the snapshot never build the index
+    line_index = snapshot_line_index(snapshot)
+    games = []
+    
+    for game in normalized_snapshot_games(snapshot)[:10]:  # Limit to 10 games
+        # Only include games with odds data
+        if game['sportsbooks']:
+            games.append({**game, 'best_lines': line_index.get(game['id'], {})})
+    
+    return {
+        'success': True,
+        'games': games,
+        'data_source': 'theoddsapi',
+        'demo_mode': False,
+        'count': len(games)
+    }
+
 # Odds Comparison Function
 @https_fn.on_request(
     cors=options.CorsOptions(
@@ -462,6 +767,7 @@ def api_health(req: https_fn.Request) -> https_fn.Response:
     timeout_sec=60,  # Adequate timeout for API calls
     invoker="public"
 )
+@encoded_response
 def api_odds_comparison(req: https_fn.Request) -> https_fn.Response:
     """Get odds comparison for sports"""
     if req.method == 'OPTIONS':
@@ -503,87 +809,22 @@ def api_odds_comparison(req: https_fn.Request) -> https_fn.Response:
                 sport = SPORT_KEY_MAPPING.get(requested_sport, requested_sport)
                 print(f"Sport mapping: {requested_sport} -> {sport}")
         
-        # Clean expired cache entries periodically
-        if random.random() < 0.1:  # 10% chance to clean cache
-            clean_expired_cache()
-        
-        # Check cache first
+        # Serve from cache (stale entries are revalidated in the background)
         cache_key = f"odds_{sport}"
-        now = int(time.time() * 1000)
-        
-        if cache_key in api_cache:
-            cached_data = api_cache[cache_key]
-            cache_ttl = cached_data.get('ttl', ODDS_CACHE_DURATION)
-            if now - cached_data['timestamp'] < cache_ttl:
-                return https_fn.Response(
-                    json.dumps(cached_data['data']),
-                    status=200,
-                    headers={
-                        'Content-Type': 'application/json',
-                        **get_cors_headers(req.headers.get('Origin')),
-                        **get_cache_headers(cache_ttl // 1000)
-                    }
-                )
         
-        # Fetch from The Odds API
         try:
-            odds_url = f"{ODDS_API_BASE_URL}/sports/{sport}/odds"
-            params = {
-                'api_key': ODDS_API_KEY,
-                'regions': 'us',
-                'markets': 'h2h,spreads,totals',
-                'oddsFormat': 'american',
-                'dateFormat': 'iso'
-            }
-            
-            response = requests.get(odds_url, params=params, timeout=10)
+            cached_data = api_cache.get_or_load(
+                cache_key,
+                lambda: load_view(cache_key, lambda: build_odds_comparison_view(sport), ODDS_CACHE_DURATION),
+                ODDS_CACHE_DURATION
+            )
             
-            if response.status_code == 200:
-                odds_data = response.json()
-                games = []
-                
-                for game in odds_data[:10]:  # Limit to 10 games
-                    # Keep the raw API format temporarily for conversion
-                    raw_game = {
-                        'id': game.get('id'),
-                        'sport': sport,
-                        'commence_time': game.get('commence_time'),
-                        'home_team': game.get('home_team'),
-                        'away_team': game.get('away_team'),
-                        'bookmakers': game.get('bookmakers', [])[:5]  # Limit to 5 bookmakers
-                    }
-                    
-                    # Convert to frontend-expected format
-                    converted_game = convert_bookmakers_to_sportsbooks(raw_game)
-                    
-                    # Only include games with odds data
-                    if converted_game['sportsbooks']:
-                        games.append(converted_game)
-                
-                result = {
-                    'success': True,
-                    'games': games,
-                    'data_source': 'theoddsapi',
-                    'demo_mode': False,
-                    'count': len(games)
-                }
-                
-                # Cache the result with TTL
-                api_cache[cache_key] = {
-                    'data': result,
-                    'timestamp': now,
-                    'ttl': ODDS_CACHE_DURATION
-                }
-                
-                return https_fn.Response(
-                    json.dumps(result),
-                    status=200,
-                    headers={
-                        'Content-Type': 'application/json',
-                        **get_cors_headers(req.headers.get('Origin')),
-                        **get_cache_headers(ODDS_CACHE_DURATION // 1000)
-                    }
-                )
+            if cached_data is not None:
+                return cached_json_response(req, cached_data, {
+                    'Content-Type': 'application/json',
+                    **get_cors_headers(req.headers.get('Origin')),
+                    **get_cache_headers(cached_data['ttl'] // 1000)
+                })
             
         except Exception as api_error:
             print(f"Odds API error: {api_error}")
@@ -595,6 +836,7 @@ def api_odds_comparison(req: https_fn.Request) -> https_fn.Response:
         for game in raw_demo_games[:10]:  # Limit to 10 games
             converted_game = convert_bookmakers_to_sportsbooks(game)
             if converted_game['sportsbooks']:  # Only include games with odds
+                converted_game['best_lines'] = best_lines(converted_game['sportsbooks'])
                 converted_demo_games.append(converted_game)
         
         result = {
@@ -639,6 +881,7 @@ def api_odds_comparison(req: https_fn.Request) -> https_fn.Response:
     ),
     invoker="public"
 )
+@encoded_response
 def api_evaluate(req: https_fn.Request) -> https_fn.Response:
     """Evaluate parlay with AI analysis - REQUIRES AUTHENTICATION"""
     if req.method == 'OPTIONS':
@@ -673,8 +916,22 @@ def api_evaluate(req: https_fn.Request) -> https_fn.Response:
 
     user_id = user.get('uid')
     
+    # Batch requests are charged one rate-limit unit per parlay
+    body = req.get_json(silent=True)
+    batch = body.get('parlays') if isinstance(body, dict) else None
+    is_batch = batch is not None
+    if is_batch and (not isinstance(batch, list) or not 1 <= len(batch) <= MAX_PARLAY_BATCH):
+        return https_fn.Response(
+            json.dumps({'error': f'parlays must be a list of 1 to {MAX_PARLAY_BATCH} parlays'}),
+            status=400,
+            headers={
+                'Content-Type': 'application/json',
+                **get_cors_headers(req.headers.get('Origin'))
+            }
+        )
+    
     # Check rate limiting with user-based limits
-    allowed, rate_info = check_rate_limit(req, 30, user_id)  # Lower limit for parlay evaluations
+    allowed, rate_info = check_rate_limit(req, 30, user_id, cost=len(batch) if is_batch else 1)  # Lower limit for parlay evaluations
     if not allowed:
         return https_fn.Response(
             json.dumps({
@@ -705,11 +962,22 @@ def api_evaluate(req: https_fn.Request) -> https_fn.Response:
                 }
             )
         
+        if is_batch:
+            return https_fn.Response(
+                json.dumps(evaluate_parlay_batch(batch)),
+                status=200,
+                headers={
+                    'Content-Type': 'application/json',
+                    **get_cors_headers(req.headers.get('Origin'))
+                }
+            )
+        
         # Validate parlay data using marshmallow schema
+        from request_schemas import ParlaySchema
         validated_data, validation_error = validate_request_data(ParlaySchema, data)
         if validation_error:
             return https_fn.Response(
-                json.dumps({'error': sanitize_error_message(validation_error)}),
+                json.dumps(validation_error),
                 status=400,
                 headers={
                     'Content-Type': 'application/json',
@@ -717,79 +985,7 @@ def api_evaluate(req: https_fn.Request) -> https_fn.Response:
                 }
             )
         
-        bets = validated_data['bets']
-        
-        # AI Evaluation Logic (simplified)
-        total_score = 0
-        bet_analyses = []
-        
-        for i, bet in enumerate(bets):
-            # Generate realistic analysis for each bet
-            confidence = random.uniform(0.65, 0.92)
-            score = random.uniform(6.5, 9.2)
-            
-            factors = []
-            if confidence > 0.8:
-                factors.extend(['Strong recent form', 'Favorable matchup history'])
-            if confidence > 0.75:
-                factors.append('Home field advantage' if random.choice([True, False]) else 'Key player availability')
-            if confidence < 0.7:
-                factors.append('Weather concerns' if random.choice([True, False]) else 'Recent injuries')
-            
-            analysis = {
-                'bet_number': i + 1,
-                'team': bet.get('team', f'Team {i+1}'),
-                'bet_type': bet.get('bet_type', 'Spread'),
-                'odds': bet.get('odds', -110),
-                'confidence_score': round(confidence, 2),
-                'individual_score': round(score, 1),
-                'key_factors': factors,
-                'risk_assessment': 'Low' if confidence > 0.8 else 'Medium' if confidence > 0.7 else 'High'
-            }
-            
-            bet_analyses.append(analysis)
-            total_score += score
-        
-        # Calculate overall parlay score
-        num_bets = len(bets)
-        base_score = total_score / num_bets
-        
-        # Apply parlay correlation penalty
-        correlation_penalty = min(0.5, (num_bets - 1) * 0.1)
-        overall_score = max(1.0, base_score - correlation_penalty)
-        
-        # Generate recommendation
-        if overall_score >= 8.0:
-            recommendation = "STRONG BET"
-            confidence_level = "High"
-        elif overall_score >= 7.0:
-            recommendation = "GOOD BET"
-            confidence_level = "Medium-High"
-        elif overall_score >= 6.0:
-            recommendation = "FAIR BET"
-            confidence_level = "Medium"
-        else:
-            recommendation = "RISKY BET"
-            confidence_level = "Low"
-        
-        result = {
-            'success': True,
-            'overall_score': round(overall_score, 1),
-            'recommendation': recommendation,
-            'confidence_level': confidence_level,
-            'parlay_analysis': {
-                'total_bets': num_bets,
-                'potential_payout': data.get('total_amount', 100) * 2.5,  # Simplified calculation
-                'risk_level': confidence_level,
-                'correlation_impact': f"{correlation_penalty:.1f} point penalty"
-            },
-            'individual_bets': bet_analyses,
-            'key_insights': [
-                f"This {num_bets}-leg parlay has an overall score of {overall_score:.1f}/10",
-                f"Risk assessment: {confidence_level}",
-                f"Primary recommendation: {recommendation}"
-            ]
-        }
+        result = evaluate_parlays([validated_data])[0]
         
         return https_fn.Response(
             json.dumps(result),
@@ -816,7 +1012,7 @@ def api_evaluate(req: https_fn.Request) -> https_fn.Response:
             }
         )
 
-def get_live_scores_from_apisports(sport_key):
+def get_live_scores_from_apisports(sport_key, season=APISPORTS_SEASON):
     """Get live scores from API-Sports for enhanced data"""
     try:
         # Safety check: skip if no API key available
@@ -835,11 +1031,12 @@ def get_live_scores_from_apisports(sport_key):
         # Get current games/scores
         url = f"{endpoint}/games"
         params = {
-            'season': '2024',  # Current season
+            'season': season,
             'timezone': 'America/New_York'
         }
         
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = upstream_client.get(url, params=params, headers=headers)
+        apisports_quota.record(response.headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -854,42 +1051,62 @@ def get_live_scores_from_apisports(sport_key):
     
     return None
 
-def enhance_game_with_live_scores(game, sport_key):
+# API-Sports score indexes shared across requests (keyed by sport and season)
+apisports_scores = ApiSportsScoreCache(
+    get_live_scores_from_apisports, LIVE_CACHE_DURATION,
+    ttl_for=lambda: int(LIVE_CACHE_DURATION * apisports_quota.ttl_scale())
+)
+
+def fetch_sports_data(sport_keys):
+    """Odds snapshots and API-Sports score indexes for several sports in one concurrent fan-out
+
+    Returns (snapshots, score_session): every upstream call shares one worker
+    pool and deadline, and the session serves the prefetched score indexes
+    so matching never calls API-Sports on the request path.
+    """
+    tasks = {}
+    for sport_key in sport_keys:
+        tasks[('odds', sport_key)] = lambda sport_key=sport_key: odds_snapshots.get(sport_key)
+        if sport_key in APISPORTS_ENDPOINTS:
+            tasks[('scores', sport_key)] = lambda sport_key=sport_key: apisports_scores.get_index(
+                sport_key, APISPORTS_SEASON
+            )
+    results = fan_out(tasks)
+    snapshots = {sport_key: results[('odds', sport_key)] for sport_key in sport_keys}
+    indexes = {sport_key: result for (kind, sport_key), result in results.items() if kind == 'scores'}
+    return snapshots, LiveScoreSession(apisports_scores, APISPORTS_SEASON, indexes)
+
+def enhance_game_with_live_scores(game, sport_key, score_session=None):
     """Enhance game data with live scores from API-Sports"""
     try:
-        live_scores = get_live_scores_from_apisports(sport_key)
-        if not live_scores:
-            return game
-            
-        # Try to match the game by team names (fuzzy matching)
-        home_team = game.get('home_team', '').lower()
-        away_team = game.get('away_team', '').lower()
+        if score_session is None:
+            score_session = LiveScoreSession(apisports_scores, APISPORTS_SEASON)
         
-        for score_game in live_scores:
-            score_home = score_game.get('teams', {}).get('home', {}).get('name', '').lower()
-            score_away = score_game.get('teams', {}).get('away', {}).get('name', '').lower()
-            
-            # Simple team name matching (could be improved with fuzzy matching)
-            if (home_team in score_home or score_home in home_team) and \
-               (away_team in score_away or score_away in away_team):
-                
-                # Add live score data
-                game['live_data'] = {
-                    'status': score_game.get('status', {}).get('long', 'scheduled'),
-                    'home_score': score_game.get('scores', {}).get('home', {}).get('total'),
-                    'away_score': score_game.get('scores', {}).get('away', {}).get('total'),
-                    'period': score_game.get('status', {}).get('short'),
-                    'time_remaining': score_game.get('status', {}).get('timer'),
-                    'last_updated': datetime.now().isoformat()
-                }
-                print(f"Enhanced {game.get('id')} with live score data")
-                break
+        # Match the game by team names via the prebuilt index
+        score_game = score_session.match(
+            sport_key, game.get('home_team'), game.get('away_team'), game.get('commence_time')
+        )
+        if score_game:
+            # Add live score data
+            game['live_data'] = {
+                'status': score_game.get('status', {}).get('long', 'scheduled'),
+                'home_score': score_game.get('scores', {}).get('home', {}).get('total'),
+                'away_score': score_game.get('scores', {}).get('away', {}).get('total'),
+                'period': score_game.get('status', {}).get('short'),
+                'time_remaining': score_game.get('status', {}).get('timer'),
+                'last_updated': datetime.now().isoformat()
+            }
+            print(f"Enhanced {game.get('id')} with live score data")
                 
     except Exception as e:
         print(f"Error enhancing game with live scores: {str(e)}")
     
     return game
 
+def demo_american_odds():
+    """Random valid American odds between -150 and +150 (never inside -100..+100)"""
+    return random.choice((-1, 1)) * random.randint(100, 150)
+
 def generate_demo_games(sport):
     """Generate demo games data when API is unavailable"""
     teams_map = {
@@ -927,8 +1144,8 @@ def generate_demo_games(sport):
                         {
                             'key': 'h2h',
                             'outcomes': [
-                                {'name': home, 'price': random.randint(-150, 150)},
-                                {'name': away, 'price': random.randint(-150, 150)}
+                                {'name': home, 'price': demo_american_odds()},
+                                {'name': away, 'price': demo_american_odds()}
                             ]
                         }
                     ]
@@ -939,6 +1156,78 @@ def generate_demo_games(sport):
     
     return games
 
+def build_all_games_view(per_sport):
+    """Build the multi-sport games payload from the shared odds snapshots"""
+    # Sports to fetch data for
+    sports_list = [
+        {'key': 'americanfootball_nfl', 'name': 'NFL'},
+        {'key': 'basketball_nba', 'name': 'NBA'},  
+        {'key': 'baseball_mlb', 'name': 'MLB'},
+        {'key': 'basketball_wnba', 'name': 'WNBA'},
+    ]
+    
+    all_games = []
+    data_sources = []
+    
+    # Fetch every sport's odds snapshot and score index concurrently within one deadline
+    snapshots, score_session = fetch_sports_data([sport['key'] for sport in sports_list])
+    
+    for sport in sports_list:
+        short_sport = sport['key'].split('_', 1)[-1]  # americanfootball_nfl -> nfl
+        try:
+            # Try to get live data first
+            snapshot = snapshots.get(sport['key'])
+            
+            if snapshot is not None:
+                games_data = snapshot.games
+                # Convert to our format
+                converted_games = []
+                for game in games_data[:per_sport]:
+                    converted_game = normalize_game(game, sport=short_sport)
+                    if converted_game['id'] is None:
+                        converted_game['id'] = f"{sport['key']}_unknown"
+                    
+                    if converted_game['sportsbooks']:  # Only include games with odds
+                        # Enhance with live scores from API-Sports
+                        converted_game = enhance_game_with_live_scores(converted_game, sport['key'], score_session)
+                        converted_games.append(converted_game)
+                
+                all_games.extend(converted_games)
+                data_sources.append('live_api')
+                
+            else:
+                # Use demo data as fallback (demo books are not filtered)
+                demo_games = generate_demo_games(sport['key'])[:per_sport]
+                all_games.extend(normalize_game(game, sport=short_sport, books=None) for game in demo_games)
+                data_sources.append('demo')
+                
+        except Exception as sport_error:
+            print(f"Error fetching {sport['name']}: {str(sport_error)}")
+            continue
+    
+    # Determine overall data source
+    if 'live_api' in data_sources:
+        overall_data_source = 'live_api'
+        demo_mode = False
+    else:
+        overall_data_source = 'demo'
+        demo_mode = True
+    
+    # Sort games by start time
+    all_games.sort(key=lambda x: x.get('commence_time', ''))
+    
+    result = {
+        'success': True,
+        'games': all_games,
+        'total_games': len(all_games),
+        'sports_included': len([ds for ds in data_sources if ds != 'demo']),
+        'data_source': overall_data_source,
+        'demo_mode': demo_mode,
+        'last_updated': datetime.now().isoformat()
+    }
+    
+    return result
+
 # All Games Function
 @https_fn.on_request(
     cors=options.CorsOptions(
@@ -947,6 +1236,7 @@ def generate_demo_games(sport):
     ),
     invoker="public"
 )
+@encoded_response
 def api_all_games(req: https_fn.Request) -> https_fn.Response:
     """Get all games from multiple sports"""
     if req.method == 'OPTIONS':
@@ -967,167 +1257,23 @@ def api_all_games(req: https_fn.Request) -> https_fn.Response:
     
     try:
         # Get query parameters
-        per_sport = int(req.args.get('per_sport', 3))
+        per_sport = min(max(int(req.args.get('per_sport', 3)), 1), 50)  # Bound cache key space
         upcoming = req.args.get('upcoming', 'true').lower() == 'true'
         
         cache_key = f'all_games_{per_sport}_{upcoming}'
-        current_time = int(time.time() * 1000)
-        
-        # Check cache
-        if cache_key in api_cache:
-            cached_data = api_cache[cache_key]
-            if current_time - cached_data['timestamp'] < CACHE_DURATION:
-                return https_fn.Response(
-                    json.dumps(cached_data['data']),
-                    status=200,
-                    headers={
-                        'Content-Type': 'application/json',
-                        **get_cors_headers(req.headers.get('Origin'))
-                    }
-                )
-        
-        # Sports to fetch data for
-        sports_list = [
-            {'key': 'americanfootball_nfl', 'name': 'NFL'},
-            {'key': 'basketball_nba', 'name': 'NBA'},  
-            {'key': 'baseball_mlb', 'name': 'MLB'},
-            {'key': 'basketball_wnba', 'name': 'WNBA'},
-        ]
-        
-        all_games = []
-        data_sources = []
-        
-        for sport in sports_list:
-            try:
-                # Try to get live data first
-                url = f"{ODDS_API_BASE_URL}/sports/{sport['key']}/odds"
-                params = {
-                    'apiKey': ODDS_API_KEY,
-                    'regions': 'us',
-                    'markets': 'h2h',
-                    'oddsFormat': 'american',
-                    'dateFormat': 'iso'
-                }
-                
-                response = requests.get(url, params=params, timeout=10)
-                
-                if response.status_code == 200:
-                    games_data = response.json()
-                    # Convert to our format
-                    converted_games = []
-                    for game in games_data[:per_sport]:
-                        converted_game = {
-                            'id': game.get('id', f"{sport['key']}_unknown"),
-                            'sport': sport['key'].replace('americanfootball_', '').replace('basketball_', '').replace('baseball_', '').replace('icehockey_', ''),
-                            'home_team': game.get('home_team'),
-                            'away_team': game.get('away_team'),
-                            'commence_time': game.get('commence_time'),
-                            'status': 'scheduled',
-                            'sportsbooks': {}
-                        }
-                        
-                        # Convert bookmaker data
-                        for bookmaker in game.get('bookmakers', []):
-                            book_key = bookmaker.get('key')
-                            if book_key in ['draftkings', 'fanduel', 'betmgm', 'caesars', 'betrivers']:
-                                for market in bookmaker.get('markets', []):
-                                    if market.get('key') == 'h2h':
-                                        outcomes = market.get('outcomes', [])
-                                        moneyline = {}
-                                        for outcome in outcomes:
-                                            if outcome.get('name') == game.get('home_team'):
-                                                moneyline['home'] = outcome.get('price')
-                                            elif outcome.get('name') == game.get('away_team'):
-                                                moneyline['away'] = outcome.get('price')
-                                        
-                                        if moneyline:
-                                            converted_game['sportsbooks'][book_key] = {
-                                                'moneyline': moneyline
-                                            }
-                        
-                        if converted_game['sportsbooks']:  # Only include games with odds
-                            # Enhance with live scores from API-Sports
-                            converted_game = enhance_game_with_live_scores(converted_game, sport['key'])
-                            converted_games.append(converted_game)
-                    
-                    all_games.extend(converted_games)
-                    data_sources.append('live_api')
-                    
-                else:
-                    # Use demo data as fallback
-                    demo_games = generate_demo_games(sport['key'])[:per_sport]
-                    # Convert demo games to our format
-                    for game in demo_games:
-                        converted_game = {
-                            'id': game['id'],
-                            'sport': sport['key'].replace('americanfootball_', '').replace('basketball_', '').replace('baseball_', ''),
-                            'home_team': game['home_team'],
-                            'away_team': game['away_team'],
-                            'commence_time': game['commence_time'],
-                            'status': 'scheduled',
-                            'sportsbooks': {}
-                        }
-                        
-                        # Convert bookmaker format
-                        for bookmaker in game.get('bookmakers', []):
-                            book_key = bookmaker.get('key')
-                            for market in bookmaker.get('markets', []):
-                                if market.get('key') == 'h2h':
-                                    moneyline = {}
-                                    for outcome in market.get('outcomes', []):
-                                        if outcome.get('name') == game['home_team']:
-                                            moneyline['home'] = outcome.get('price')
-                                        elif outcome.get('name') == game['away_team']:
-                                            moneyline['away'] = outcome.get('price')
-                                    
-                                    if moneyline:
-                                        converted_game['sportsbooks'][book_key] = {
-                                            'moneyline': moneyline
-                                        }
-                        
-                        all_games.append(converted_game)
-                    data_sources.append('demo')
-                    
-            except Exception as sport_error:
-                print(f"Error fetching {sport['name']}: {str(sport_error)}")
-                continue
         
-        # Determine overall data source
-        if 'live_api' in data_sources:
-            overall_data_source = 'live_api'
-            demo_mode = False
-        else:
-            overall_data_source = 'demo'
-            demo_mode = True
-        
-        # Sort games by start time
-        all_games.sort(key=lambda x: x.get('commence_time', ''))
-        
-        result = {
-            'success': True,
-            'games': all_games,
-            'total_games': len(all_games),
-            'sports_included': len([ds for ds in data_sources if ds != 'demo']),
-            'data_source': overall_data_source,
-            'demo_mode': demo_mode,
-            'last_updated': datetime.now().isoformat()
-        }
-        
-        # Cache the result
-        api_cache[cache_key] = {
-            'data': result,
-            'timestamp': current_time
-        }
-        
-        return https_fn.Response(
-            json.dumps(result),
-            status=200,
-            headers={
-                'Content-Type': 'application/json',
-                **get_cors_headers(req.headers.get('Origin'))
-            }
+        # Serve from cache (stale entries are revalidated in the background)
+        cached_data = api_cache.get_or_load(
+            cache_key,
+            lambda: load_view(cache_key, lambda: build_all_games_view(per_sport), CACHE_DURATION),
+            CACHE_DURATION
         )
         
+        return cached_json_response(req, cached_data, {
+            'Content-Type': 'application/json',
+            **get_cors_headers(req.headers.get('Origin'))
+        })
+        
     except Exception as e:
         print(f"All games error: {str(e)}")
         return https_fn.Response(
@@ -1145,6 +1291,136 @@ def api_all_games(req: https_fn.Request) -> https_fn.Response:
             }
         )
 
+def build_live_scores_view():
+    """Build the live, starting-soon and recently-finished payload"""
+    live_games = []
+    starting_soon = []
+    recently_finished = []
+    
+    # Sports to fetch live data for
+    sports_for_live_data = [
+        {'key': 'americanfootball_nfl', 'name': 'NFL'},
+        {'key': 'basketball_nba', 'name': 'NBA'},  
+        {'key': 'baseball_mlb', 'name': 'MLB'},
+        {'key': 'basketball_wnba', 'name': 'WNBA'},
+        {'key': 'icehockey_nhl', 'name': 'NHL'}
+    ]
+    
+    current_utc_time = datetime.now(timezone.utc)
+    eight_hours_ago = current_utc_time - timedelta(hours=8)
+    eight_hours_from_now = current_utc_time + timedelta(hours=8)
+    
+    # Fetch every sport's odds snapshot and score index concurrently within one deadline
+    snapshots, score_session = fetch_sports_data([sport['key'] for sport in sports_for_live_data])
+    
+    for sport in sports_for_live_data:
+        try:
+            # Get odds data which includes game times
+            snapshot = snapshots.get(sport['key'])
+            
+            if snapshot is not None:
+                games_data = snapshot.games
+                
+                for game in games_data[:5]:  # Limit per sport
+                    game_time = datetime.fromisoformat(game.get('commence_time', '').replace('Z', '+00:00'))
+                    
+                    base_game = {
+                        'id': game.get('id', f"{sport['key']}_unknown"),
+                        'sport': sport['name'],
+                        'sport_key': sport['key'],
+                        'home_team': game.get('home_team'),
+                        'away_team': game.get('away_team'),
+                        'commence_time': game.get('commence_time'),
+                        'status': 'scheduled'
+                    }
+                    
+                    # Try to get live score data from API-Sports (fetched once per sport)
+                    try:
+                        live_game = score_session.match(
+                            sport['key'], base_game['home_team'], base_game['away_team'], base_game['commence_time']
+                        )
+                        if live_game:
+                            status = live_game.get('status', {}).get('long', 'scheduled').lower()
+                            
+                            base_game.update({
+                                'live_data': {
+                                    'status': status,
+                                    'home_score': live_game.get('scores', {}).get('home', {}).get('total', 0),
+                                    'away_score': live_game.get('scores', {}).get('away', {}).get('total', 0),
+                                    'period': live_game.get('status', {}).get('short', ''),
+                                    'time_remaining': live_game.get('status', {}).get('timer', ''),
+                                    'last_updated': datetime.now().isoformat()
+                                }
+                            })
+                            
+                            # Categorize based on status
+                            if status in ['live', 'in progress', 'playing', '1st quarter', '2nd quarter', '3rd quarter', '4th quarter', 'halftime']:
+                                live_games.append(base_game)
+                            elif status in ['finished', 'ended', 'final'] and game_time > eight_hours_ago:
+                                recently_finished.append(base_game)
+                    except Exception as match_error:
+                        print(f"Error matching live data: {match_error}")
+                    
+                    # If no live match found, check if starting soon (clients count down from
+                    # commence_time; a server-side countdown would change the payload on every rebuild)
+                    if 'live_data' not in base_game:
+                        if eight_hours_ago <= game_time <= eight_hours_from_now:
+                            starting_soon.append(base_game)
+                            
+        except Exception as sport_error:
+            print(f"Error fetching live data for {sport['name']}: {sport_error}")
+            continue
+    
+    # If no live API data, create some demo/mock live games for testing
+    if not live_games and not starting_soon and not recently_finished:
+        # Demo times are anchored to the hour so rebuilds produce the same payload (and ETag)
+        demo_anchor = current_utc_time.replace(minute=0, second=0, microsecond=0)
+        mock_live_games = [
+            {
+                'id': 'demo_live_1',
+                'sport': 'NFL',
+                'sport_key': 'americanfootball_nfl',
+                'home_team': 'Kansas City Chiefs',
+                'away_team': 'Buffalo Bills',
+                'commence_time': demo_anchor.isoformat(),
+                'status': 'live',
+                'live_data': {
+                    'status': 'live',
+                    'home_score': 21,
+                    'away_score': 14,
+                    'period': '3rd Quarter',
+                    'time_remaining': '8:32',
+                    'last_updated': datetime.now().isoformat()
+                }
+            },
+            {
+                'id': 'demo_starting_1',
+                'sport': 'NBA',
+                'sport_key': 'basketball_nba',
+                'home_team': 'Los Angeles Lakers',
+                'away_team': 'Boston Celtics',
+                'commence_time': (demo_anchor + timedelta(hours=1, minutes=45)).isoformat(),
+                'status': 'scheduled'
+            }
+        ]
+        
+        live_games = [mock_live_games[0]]
+        starting_soon = [mock_live_games[1]]
+    
+    result = {
+        'success': True,
+        'live_games': live_games,
+        'starting_soon': starting_soon,
+        'recently_finished': recently_finished,
+        'total_live': len(live_games),
+        'total_starting_soon': len(starting_soon),
+        'total_recently_finished': len(recently_finished),
+        'last_updated': datetime.now().isoformat(),
+        'cache_duration': 60  # 1 minute cache for live data
+    }
+    
+    return result
+
 # Live Scores Function
 @https_fn.on_request(
     cors=options.CorsOptions(
@@ -1153,6 +1429,7 @@ def api_all_games(req: https_fn.Request) -> https_fn.Response:
     ),
     invoker="public"
 )
+@encoded_response
 def api_live_scores(req: https_fn.Request) -> https_fn.Response:
     """Get live sports scores and game updates"""
     if req.method == 'OPTIONS':
@@ -1173,190 +1450,18 @@ def api_live_scores(req: https_fn.Request) -> https_fn.Response:
     
     try:
         cache_key = 'live_scores_all'
-        current_time = int(time.time() * 1000)
-        
-        # Clean expired cache entries periodically
-        if random.random() < 0.1:
-            clean_expired_cache()
-        
-        # Check cache first (shorter cache time for live data)
-        if cache_key in api_cache:
-            cached_data = api_cache[cache_key]
-            cache_ttl = cached_data.get('ttl', LIVE_CACHE_DURATION)
-            if current_time - cached_data['timestamp'] < cache_ttl:
-                return https_fn.Response(
-                    json.dumps(cached_data['data']),
-                    status=200,
-                    headers={
-                        'Content-Type': 'application/json',
-                        **get_cors_headers(req.headers.get('Origin')),
-                        **get_cache_headers(cache_ttl // 1000)
-                    }
-                )
-        
-        live_games = []
-        starting_soon = []
-        recently_finished = []
         
-        # Sports to fetch live data for
-        sports_for_live_data = [
-            {'key': 'americanfootball_nfl', 'name': 'NFL'},
-            {'key': 'basketball_nba', 'name': 'NBA'},  
-            {'key': 'baseball_mlb', 'name': 'MLB'},
-            {'key': 'basketball_wnba', 'name': 'WNBA'},
-            {'key': 'icehockey_nhl', 'name': 'NHL'}
-        ]
-        
-        current_utc_time = datetime.now(pytz.UTC)
-        eight_hours_ago = current_utc_time - timedelta(hours=8)
-        eight_hours_from_now = current_utc_time + timedelta(hours=8)
-        
-        for sport in sports_for_live_data:
-            try:
-                # Get odds data which includes game times
-                url = f"{ODDS_API_BASE_URL}/sports/{sport['key']}/odds"
-                params = {
-                    'apiKey': ODDS_API_KEY,
-                    'regions': 'us',
-                    'markets': 'h2h',
-                    'oddsFormat': 'american',
-                    'dateFormat': 'iso'
-                }
-                
-                response = requests.get(url, params=params, timeout=8)
-                
-                if response.status_code == 200:
-                    games_data = response.json()
-                    
-                    for game in games_data[:5]:  # Limit per sport
-                        game_time = datetime.fromisoformat(game.get('commence_time', '').replace('Z', '+00:00'))
-                        
-                        base_game = {
-                            'id': game.get('id', f"{sport['key']}_unknown"),
-                            'sport': sport['name'],
-                            'sport_key': sport['key'],
-                            'home_team': game.get('home_team'),
-                            'away_team': game.get('away_team'),
-                            'commence_time': game.get('commence_time'),
-                            'status': 'scheduled'
-                        }
-                        
-                        # Try to get live score data from API-Sports
-                        live_data = get_live_scores_from_apisports(sport['key'])
-                        if live_data:
-                            # Try to match game with live data
-                            for live_game in live_data:
-                                try:
-                                    live_home = live_game.get('teams', {}).get('home', {}).get('name', '').lower()
-                                    live_away = live_game.get('teams', {}).get('away', {}).get('name', '').lower()
-                                    game_home = base_game['home_team'].lower()
-                                    game_away = base_game['away_team'].lower()
-                                    
-                                    # Simple team name matching
-                                    if (game_home in live_home or live_home in game_home) and \
-                                       (game_away in live_away or live_away in game_away):
-                                        
-                                        status = live_game.get('status', {}).get('long', 'scheduled').lower()
-                                        
-                                        base_game.update({
-                                            'live_data': {
-                                                'status': status,
-                                                'home_score': live_game.get('scores', {}).get('home', {}).get('total', 0),
-                                                'away_score': live_game.get('scores', {}).get('away', {}).get('total', 0),
-                                                'period': live_game.get('status', {}).get('short', ''),
-                                                'time_remaining': live_game.get('status', {}).get('timer', ''),
-                                                'last_updated': datetime.now().isoformat()
-                                            }
-                                        })
-                                        
-                                        # Categorize based on status
-                                        if status in ['live', 'in progress', 'playing', '1st quarter', '2nd quarter', '3rd quarter', '4th quarter', 'halftime']:
-                                            live_games.append(base_game)
-                                        elif status in ['finished', 'ended', 'final'] and game_time > eight_hours_ago:
-                                            recently_finished.append(base_game)
-                                        break
-                                except Exception as match_error:
-                                    print(f"Error matching live data: {match_error}")
-                                    continue
-                        
-                        # If no live match found, check if starting soon
-                        if 'live_data' not in base_game:
-                            if eight_hours_ago <= game_time <= eight_hours_from_now:
-                                base_game['countdown'] = max(0, int((game_time - current_utc_time).total_seconds()))
-                                starting_soon.append(base_game)
-                                
-            except Exception as sport_error:
-                print(f"Error fetching live data for {sport['name']}: {sport_error}")
-                continue
-        
-        # If no live API data, create some demo/mock live games for testing
-        if not live_games and not starting_soon and not recently_finished:
-            # Create mock live games for demo
-            mock_live_games = [
-                {
-                    'id': 'demo_live_1',
-                    'sport': 'NFL',
-                    'sport_key': 'americanfootball_nfl',
-                    'home_team': 'Kansas City Chiefs',
-                    'away_team': 'Buffalo Bills',
-                    'commence_time': current_utc_time.isoformat(),
-                    'status': 'live',
-                    'live_data': {
-                        'status': 'live',
-                        'home_score': 21,
-                        'away_score': 14,
-                        'period': '3rd Quarter',
-                        'time_remaining': '8:32',
-                        'last_updated': datetime.now().isoformat()
-                    }
-                },
-                {
-                    'id': 'demo_starting_1',
-                    'sport': 'NBA',
-                    'sport_key': 'basketball_nba',
-                    'home_team': 'Los Angeles Lakers',
-                    'away_team': 'Boston Celtics',
-                    'commence_time': (current_utc_time + timedelta(minutes=45)).isoformat(),
-                    'status': 'scheduled',
-                    'countdown': 2700  # 45 minutes
-                }
-            ]
-            
-            live_games = [mock_live_games[0]]
-            starting_soon = [mock_live_games[1]]
-        
-        result = {
-            'success': True,
-            'live_games': live_games,
-            'starting_soon': starting_soon,
-            'recently_finished': recently_finished,
-            'total_live': len(live_games),
-            'total_starting_soon': len(starting_soon),
-            'total_recently_finished': len(recently_finished),
-            'last_updated': datetime.now().isoformat(),
-            'cache_duration': 60  # 1 minute cache for live data
-        }
-        
-        # Cache the result (shorter duration for live data)
-        api_cache[cache_key] = {
-            'data': result,
-            'timestamp': current_time,
-            'ttl': LIVE_CACHE_DURATION
-        }
-        
-        response_body = json.dumps(result)
-        
-        return https_fn.Response(
-            response_body,
-            status=200,
-            headers={
-                'Content-Type': 'application/json',
-                'Content-Encoding': 'gzip',
-                **get_cors_headers(req.headers.get('Origin')),
-                **get_cache_headers(LIVE_CACHE_DURATION // 1000)
-            }
+        # Serve from cache (stale entries are revalidated in the background)
+        cached_data = api_cache.get_or_load(
+            cache_key, lambda: load_view(cache_key, build_live_scores_view, LIVE_CACHE_DURATION), LIVE_CACHE_DURATION
         )
         
+        return cached_json_response(req, cached_data, {
+            'Content-Type': 'application/json',
+            **get_cors_headers(req.headers.get('Origin')),
+            **get_cache_headers(cached_data['ttl'] // 1000)
+        })
+        
     except Exception as e:
         error_details = {
             'error_type': type(e).__name__,
@@ -1406,6 +1511,7 @@ def api_live_scores(req: https_fn.Request) -> https_fn.Response:
     ),
     invoker="public"
 )
+@encoded_response
 def api_keep_alive(req: https_fn.Request) -> https_fn.Response:
     """Keep the functions warm to prevent cold starts"""
     if req.method == 'OPTIONS':
@@ -1425,21 +1531,59 @@ def api_keep_alive(req: https_fn.Request) -> https_fn.Response:
         }
     )
 
-# Scheduled function to keep functions warm (if using Firebase Scheduler)
+# Scheduled precompute pipeline: publishes the odds, all-games and live-score views so
+# user requests are served from the shared store instead of calling upstream APIs
+PRECOMPUTE_SPORTS = [
+    'americanfootball_nfl', 'basketball_nba', 'baseball_mlb', 'basketball_wnba', 'icehockey_nhl'
+]
+DEFAULT_ALL_GAMES_PER_SPORT = 3
+
+def precompute_builders():
+    """Cache key -> view builder for every precomputed view (keys match the endpoints' cache keys)"""
+    builders = {f"odds_{sport}": (lambda sport=sport: build_odds_comparison_view(sport)) for sport in PRECOMPUTE_SPORTS}
+    builders[f'all_games_{DEFAULT_ALL_GAMES_PER_SPORT}_True'] = lambda: build_all_games_view(DEFAULT_ALL_GAMES_PER_SPORT)
+    builders['live_scores_all'] = build_live_scores_view
+    return builders
+
+def run_precompute():
+    """Refresh every sport's snapshot and score index concurrently, then build and publish each view"""
+    fetch_sports_data(PRECOMPUTE_SPORTS)
+    summary = precomputed_views.run(precompute_builders())
+    print(f"Precompute published {len(summary['published'])} views in {summary['elapsed_ms']} ms, "
+          f"failed: {summary['failed']}")
+    return summary
+
+def run_live_refreshes(started, sleep=time.sleep, clock=time.monotonic):
+    """Republish live scores every LIVE_PRECOMPUTE_INTERVAL_SECONDS until the next scheduled run
+
+    started is the clock reading when the scheduled run began; the run itself
+    published the first copy. Returns how many refreshes were published.
+    """
+    published = 0
+    next_refresh = started + LIVE_PRECOMPUTE_INTERVAL_SECONDS
+    while next_refresh < started + PRECOMPUTE_INTERVAL_MINUTES * 60:
+        sleep(max(0.0, next_refresh - clock()))
+        published += len(precomputed_views.run({'live_scores_all': build_live_scores_view})['published'])
+        next_refresh += LIVE_PRECOMPUTE_INTERVAL_SECONDS
+    return published
+
 try:
     from firebase_functions import scheduler_fn
 
     @scheduler_fn.on_schedule(
-        schedule="every 5 minutes",
-        timezone="America/New_York"
+        schedule=f"every {PRECOMPUTE_INTERVAL_MINUTES} minutes",
+        timezone="America/New_York",
+        timeout_sec=PRECOMPUTE_INTERVAL_MINUTES * 60 + 60  # stays up for the live refreshes
     )
     def keep_warm_scheduled(event):
-        """Scheduled function to keep functions warm"""
+        """Scheduled precompute of the shared endpoint views (also keeps an instance warm)"""
         try:
-            print("Keep-warm scheduler triggered")
-            return "OK"
+            started = time.monotonic()
+            summary = run_precompute()
+            run_live_refreshes(started)
+            return "OK" if not summary['failed'] else "PARTIAL"
         except Exception as e:
-            print(f"Keep-warm failed: {str(e)}")
+            print(f"Precompute failed: {str(e)}")
             return "ERROR"
 except ImportError:
     print("Scheduler functions not available")
@@ -1489,6 +1633,7 @@ def get_agent_dashboard():
     ),
     invoker="public"
 )
+@encoded_response
 def api_agents_health(req: https_fn.Request) -> https_fn.Response:
     """Agent system health check"""
     if req.method == 'OPTIONS':
@@ -1568,6 +1713,7 @@ def api_agents_health(req: https_fn.Request) -> https_fn.Response:
     memory=512,
     timeout_sec=120
 )
+@encoded_response
 def api_agents_dashboard(req: https_fn.Request) -> https_fn.Response:
     """Agent dashboard API"""
     if req.method == 'OPTIONS':
@@ -1722,6 +1868,7 @@ def api_agents_dashboard(req: https_fn.Request) -> https_fn.Response:
     timeout_sec=300,
     invoker="public"
 )
+@encoded_response
 def api_agents_task(req: https_fn.Request) -> https_fn.Response:
     """Execute agent tasks"""
     if req.method == 'OPTIONS':
@@ -1845,6 +1992,7 @@ def api_agents_task(req: https_fn.Request) -> https_fn.Response:
     timeout_sec=120,
     invoker="public"
 )
+@encoded_response
 def api_agents_init(req: https_fn.Request) -> https_fn.Response:
     """Initialize and start the agent system"""
     if req.method == 'OPTIONS':
@@ -1950,6 +2098,7 @@ def api_agents_init(req: https_fn.Request) -> https_fn.Response:
     cors_origins=ALLOWED_ORIGINS,
     cors_methods=["POST", "OPTIONS"]
 ))
+@encoded_response
 def authenticate_with_biometric(req: https_fn.Request) -> https_fn.Response:
     """Authenticate user with biometric credentials and return custom token"""
     try:
@@ -0,0 +1,100 @@
+# Odds Normalization
+# Single-pass conversion of Odds API bookmakers into the per-book sportsbooks model
+
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Books shown to users; everything else in the upstream payload is skipped
+SUPPORTED_BOOKS = frozenset({'draftkings', 'fanduel', 'betmgm', 'caesars', 'betrivers'})
+
+# Odds API market key -> field in a book's normalized lines
+MARKET_FIELDS = {'h2h': 'moneyline', 'spreads': 'spread', 'totals': 'total'}
+ALL_MARKETS = frozenset(MARKET_FIELDS)
+MONEYLINE_ONLY = frozenset({'h2h'})
+
+_TOTAL_SIDES = {'Over': 'over', 'Under': 'under'}
+
+
+@lru_cache(maxsize=None)
+def _market_plan(markets: FrozenSet[str]) -> Dict[str, Tuple[str, bool, bool]]:
+    """market key -> (line field, keyed by over/under, outcomes carry a point)"""
+    return {key: (MARKET_FIELDS[key], key == 'totals', key != 'h2h') for key in markets if key in MARKET_FIELDS}
+
+
+def normalize_bookmakers(bookmakers: Iterable[Dict[str, Any]], home_team: Optional[str], away_team: Optional[str],
+                         books: Optional[FrozenSet[str]] = SUPPORTED_BOOKS,
+                         markets: FrozenSet[str] = MONEYLINE_ONLY) -> Dict[str, Dict[str, Any]]:
+    """Map one game's bookmakers to {book: {'moneyline'|'spread'|'total': line}} in one pass
+
+    Moneylines are {'home': price, 'away': price}; spreads are
+    {'home'|'away': {'point', 'price'}}; totals are {'over'|'under': {'point',
+    'price'}}. books=None keeps every book. Books with none of the requested
+    markets are left out.
+    """
+    sides = {home_team: 'home', away_team: 'away'}
+    plan = _market_plan(markets)
+    sportsbooks = {}
+    for bookmaker in bookmakers:
+        book_key = bookmaker.get('key')
+        if books is not None and book_key not in books:
+            continue
+
+        lines = {}
+        for market in bookmaker.get('markets', ()):
+            spec = plan.get(market.get('key'))
+            if spec is None:
+                continue
+            field, is_total, with_point = spec
+            side_names = _TOTAL_SIDES if is_total else sides
+            line = {}
+            for outcome in market.get('outcomes', ()):
+                side = side_names.get(outcome.get('name'))
+                if side:
+                    line[side] = {'point': outcome.get('point'), 'price': outcome.get('price')} if with_point \
+                        else outcome.get('price')
+            if line:
+                lines[field] = line
+
+        if lines:
+            sportsbooks[book_key] = lines
+    return sportsbooks
+
+
+def normalize_game(game: Dict[str, Any], sport: Optional[str] = None,
+                   books: Optional[FrozenSet[str]] = SUPPORTED_BOOKS,
+                   markets: FrozenSet[str] = MONEYLINE_ONLY) -> Dict[str, Any]:
+    """Frontend game model for one Odds API game (sport defaults to the game's own)"""
+    home_team = game.get('home_team')
+    away_team = game.get('away_team')
+    return {
+        'id': game.get('id'),
+        'sport': game.get('sport') if sport is None else sport,
+        'commence_time': game.get('commence_time'),
+        'home_team': home_team,
+        'away_team': away_team,
+        'status': 'scheduled',
+        'sportsbooks': normalize_bookmakers(game.get('bookmakers') or (), home_team, away_team, books, markets)
+    }
+
+
+_snapshot_lock = threading.Lock()
+_snapshot_games: "weakref.WeakKeyDictionary[Any, Dict[FrozenSet[str], List[Dict[str, Any]]]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def normalized_snapshot_games(snapshot: Any, markets: FrozenSet[str] = ALL_MARKETS) -> List[Dict[str, Any]]:
+    """Normalized games for an odds snapshot, computed once per snapshot and market set
+
+    The returned games are shared between callers and must be treated as
+    read-only; copy a game before adding fields to it.
+    """
+    with _snapshot_lock:
+        cached = _snapshot_games.setdefault(snapshot, {})
+        games = cached.get(markets)
+    if games is None:
+        games = [normalize_game(game, sport=snapshot.sport, markets=markets) for game in snapshot.games]
+        with _snapshot_lock:
+            games = cached.setdefault(markets, games)
+    return games
@@ -0,0 +1,154 @@
+# Odds Snapshot Store
+# One upstream Odds API fetch per sport feeds every odds, games and live view
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from single_flight import SingleFlight
+
+# Superset of markets needed by every endpoint view
+SNAPSHOT_MARKETS = 'h2h,spreads,totals'
+
+# Multi-sport fan-out limits (odds and score fetches for up to five sports share one pool)
+FANOUT_MAX_WORKERS = 10
+FANOUT_DEADLINE_SECONDS = 15
+
+
+def fan_out(tasks: Dict[Hashable, Callable[[], Any]], deadline_seconds: float = FANOUT_DEADLINE_SECONDS,
+            max_workers: int = FANOUT_MAX_WORKERS) -> Dict[Hashable, Any]:
+    """Run independent upstream calls concurrently under one deadline
+
+    Returns {key: result}; calls that raise or miss the deadline map to None.
+    Late calls keep running in the background and still populate their caches.
+    """
+    results: Dict[Hashable, Any] = {key: None for key in tasks}
+    if not tasks:
+        return results
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)))
+    try:
+        futures = {executor.submit(task): key for key, task in tasks.items()}
+        done, not_done = wait(futures, timeout=deadline_seconds)
+
+        for future in done:
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                print(f"Upstream fetch failed for {key}: {str(e)}")
+
+        for future in not_done:
+            print(f"Upstream fetch for {futures[future]} missed the {deadline_seconds}s deadline")
+    finally:
+        executor.shutdown(wait=False)
+
+    return results
+
+
+class OddsSnapshot:
+    """Raw Odds API games for one sport at a point in time"""
+
+    def __init__(self, sport: str, games: List[Dict[str, Any]], fetched_at: int):
+        self.sport = sport
+        self.games = games
+        self.fetched_at = fetched_at  # milliseconds since epoch
+
+    def age_ms(self, now: Optional[int] = None) -> int:
+        """Age of the snapshot in milliseconds"""
+        if now is None:
+            now = int(time.time() * 1000)
+        return now - self.fetched_at
+
+    def next_start(self) -> Optional[int]:
+        """Earliest listed commence time in milliseconds, or None when no games are listed"""
+        if not hasattr(self, '_next_start'):
+            starts = []
+            for game in self.games:
+                try:
+                    starts.append(datetime.fromisoformat(game['commence_time'].replace('Z', '+00:00')).timestamp())
+                except (KeyError, AttributeError, ValueError):
+                    continue
+            self._next_start = int(min(starts) * 1000) if starts else None
+        return self._next_start
+
+
+class OddsSnapshotStore:
+    """Per-sport snapshot cache so each sport is fetched upstream at most once per TTL
+
+    ttl_for, when given, computes each snapshot's TTL at lookup time (for
+    example from upstream quota and the sport's schedule); otherwise every
+    snapshot uses ttl_ms.
+    """
+
+    def __init__(self, fetcher: Callable[[str], Optional[List[Dict[str, Any]]]], ttl_ms: int,
+                 ttl_for: Optional[Callable[[OddsSnapshot], int]] = None):
+        self.fetcher = fetcher
+        self.ttl_ms = ttl_ms
+        self.ttl_for = ttl_for
+        self._snapshots: Dict[str, OddsSnapshot] = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.stats = {'hits': 0, 'fetches': 0, 'coalesced': 0, 'failures': 0}
+
+    def get(self, sport: str) -> Optional[OddsSnapshot]:
+        """Return a fresh snapshot for the sport, fetching upstream if needed"""
+        now = int(time.time() * 1000)
+        with self._lock:
+            snapshot = self._snapshots.get(sport)
+            if snapshot and snapshot.age_ms(now) < self.snapshot_ttl(snapshot):
+                self.stats['hits'] += 1
+                return snapshot
+
+        # Concurrent misses for the same sport share one upstream fetch
+        snapshot, shared = self._flights.do(sport, lambda: self._fetch(sport))
+        if shared:
+            self.stats['coalesced'] += 1
+        return snapshot
+
+    def snapshot_ttl(self, snapshot: OddsSnapshot) -> int:
+        """TTL in milliseconds for a stored snapshot"""
+        return self.ttl_for(snapshot) if self.ttl_for else self.ttl_ms
+
+    def _fetch(self, sport: str) -> Optional[OddsSnapshot]:
+        self.stats['fetches'] += 1
+        games = self.fetcher(sport)
+        if games is None:
+            self.stats['failures'] += 1
+            return None
+
+        snapshot = OddsSnapshot(sport, games, int(time.time() * 1000))
+        with self._lock:
+            self._snapshots[sport] = snapshot
+        return snapshot
+
+    def get_many(self, sports: Iterable[str], deadline_seconds: float = FANOUT_DEADLINE_SECONDS,
+                 max_workers: int = FANOUT_MAX_WORKERS) -> Dict[str, Optional[OddsSnapshot]]:
+        """Fetch several sports concurrently, returning whatever finished before the deadline
+
+        Sports that fail or miss the deadline map to None so callers can fall back
+        per sport. Late fetches keep running and still populate the store.
+        """
+        sports = list(dict.fromkeys(sports))
+        return fan_out({sport: (lambda sport=sport: self.get(sport)) for sport in sports},
+                       deadline_seconds, max_workers)
+
+    def peek(self, sport: str) -> Optional[OddsSnapshot]:
+        """Return the stored snapshot without fetching, regardless of age"""
+        with self._lock:
+            return self._snapshots.get(sport)
+
+    def peek_all(self) -> List[OddsSnapshot]:
+        """Every stored snapshot without fetching, regardless of age"""
+        with self._lock:
+            return list(self._snapshots.values())
+
+    def invalidate(self, sport: Optional[str] = None):
+        """Drop one sport's snapshot, or all of them"""
+        with self._lock:
+            if sport is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(sport, None)
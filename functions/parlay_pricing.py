@@ -0,0 +1,186 @@
+# Parlay Pricing Engine
+# Batched American-odds conversion, vig removal, payout and expected value for parlays
+
+import importlib.util
+import math
+from typing import Any, Dict, List, Sequence
+
+# numpy is imported on first use (see load_numpy) to keep it off the cold-start path
+NUMPY_AVAILABLE = importlib.util.find_spec('numpy') is not None
+np = None
+
+
+def load_numpy():
+    """The numpy module, imported on first call"""
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+# Two-way market at -110 / -110: the margin assumed when a leg has no reference price
+STANDARD_OVERROUND = 2 * (110 / 210)
+
+
+def is_valid_american_odds(odds: Any) -> bool:
+    """American odds are whole numbers at or beyond +/-100"""
+    return isinstance(odds, (int, float)) and not isinstance(odds, bool) and abs(odds) >= 100
+
+
+def american_to_decimal(odds):
+    """Decimal (European) odds for American odds; accepts scalars or arrays"""
+    if NUMPY_AVAILABLE and not isinstance(odds, (int, float)):
+        np = load_numpy()
+        odds = np.asarray(odds, dtype=np.float64)
+        return np.where(odds > 0, 1 + odds / 100, 1 + 100 / np.abs(odds))
+    return 1 + odds / 100 if odds > 0 else 1 + 100 / abs(odds)
+
+
+def decimal_to_american(decimal):
+    """Nearest whole American odds for decimal odds; accepts scalars or arrays"""
+    if NUMPY_AVAILABLE and not isinstance(decimal, (int, float)):
+        np = load_numpy()
+        decimal = np.asarray(decimal, dtype=np.float64)
+        return np.where(decimal >= 2, np.round((decimal - 1) * 100), np.round(-100 / (decimal - 1)))
+    return round((decimal - 1) * 100) if decimal >= 2 else round(-100 / (decimal - 1))
+
+
+def american_to_implied(odds):
+    """Implied win probability (including vig) for American odds"""
+    return 1 / american_to_decimal(odds)
+
+
+def _leg_arrays(parlays: Sequence[Sequence[Dict[str, Any]]]):
+    """Pad legs into (parlays x max_legs) odds and reference-odds matrices plus a mask"""
+    np = load_numpy()
+    width = max((len(legs) for legs in parlays), default=0) or 1
+    # Padding uses even money so the conversions stay finite; the mask removes it afterwards
+    odds = np.full((len(parlays), width), 100.0)
+    opposing = np.full((len(parlays), width), np.nan)
+    mask = np.zeros((len(parlays), width), dtype=bool)
+    for row, legs in enumerate(parlays):
+        for col, leg in enumerate(legs):
+            odds[row, col] = leg['odds']
+            if leg.get('opposing_odds') is not None:
+                opposing[row, col] = leg['opposing_odds']
+            mask[row, col] = True
+    return odds, opposing, mask
+
+
+def _price_numpy(parlays: Sequence[Sequence[Dict[str, Any]]], stakes: Sequence[float]) -> Dict[str, Any]:
+    np = load_numpy()
+    odds, opposing, mask = _leg_arrays(parlays)
+    decimal = np.where(mask, american_to_decimal(odds), 1.0)
+    implied = 1 / decimal
+
+    # Proportional vig removal: scale each price by its market's overround
+    has_reference = ~np.isnan(opposing)
+    opposing_implied = 1 / american_to_decimal(np.where(has_reference, opposing, 100.0))
+    overround = np.where(has_reference, implied + opposing_implied, STANDARD_OVERROUND)
+    fair = np.where(mask, implied / overround, 1.0)
+
+    stakes = np.asarray(stakes, dtype=np.float64)
+    parlay_decimal = decimal.prod(axis=1)
+    hit_probability = fair.prod(axis=1)
+    payout = stakes * parlay_decimal
+    expected_value = hit_probability * payout - stakes
+
+    return {
+        'leg_decimal': decimal,
+        'leg_implied': np.where(mask, implied, np.nan),
+        'leg_fair': np.where(mask, fair, np.nan),
+        'leg_count': mask.sum(axis=1),
+        'parlay_decimal': parlay_decimal,
+        'implied_probability': np.where(mask, implied, 1.0).prod(axis=1),
+        'hit_probability': hit_probability,
+        'payout': payout,
+        'expected_value': expected_value,
+        'house_edge': 1 - hit_probability * parlay_decimal
+    }
+
+
+def _price_python(parlays: Sequence[Sequence[Dict[str, Any]]], stakes: Sequence[float]) -> Dict[str, Any]:
+    columns: Dict[str, List[Any]] = {field: [] for field in (
+        'leg_decimal', 'leg_implied', 'leg_fair', 'leg_count', 'parlay_decimal', 'implied_probability',
+        'hit_probability', 'payout', 'expected_value', 'house_edge'
+    )}
+    for legs, stake in zip(parlays, stakes):
+        decimal = [american_to_decimal(leg['odds']) for leg in legs]
+        implied = [1 / value for value in decimal]
+        fair = []
+        for leg, leg_implied in zip(legs, implied):
+            if leg.get('opposing_odds') is not None:
+                overround = leg_implied + american_to_implied(leg['opposing_odds'])
+            else:
+                overround = STANDARD_OVERROUND
+            fair.append(leg_implied / overround)
+
+        parlay_decimal = math.prod(decimal)
+        hit_probability = math.prod(fair)
+        payout = stake * parlay_decimal
+        columns['leg_decimal'].append(decimal)
+        columns['leg_implied'].append(implied)
+        columns['leg_fair'].append(fair)
+        columns['leg_count'].append(len(legs))
+        columns['parlay_decimal'].append(parlay_decimal)
+        columns['implied_probability'].append(math.prod(implied))
+        columns['hit_probability'].append(hit_probability)
+        columns['payout'].append(payout)
+        columns['expected_value'].append(hit_probability * payout - stake)
+        columns['house_edge'].append(1 - hit_probability * parlay_decimal)
+    return columns
+
+
+def price_parlays(parlays: Sequence[Sequence[Dict[str, Any]]], stakes: Sequence[float]) -> List[Dict[str, Any]]:
+    """Price many parlays in one pass
+
+    Each parlay is a list of legs with American 'odds' and an optional
+    'opposing_odds' (the other side of the same market) used to remove the
+    vig; legs without one assume a standard -110/-110 margin. Legs are treated
+    as independent. Returns one dict per parlay, in input order, with the
+    combined decimal odds, payout, vig-free hit probability, expected value
+    and per-leg breakdown.
+    """
+    for index, legs in enumerate(parlays):
+        if not legs:
+            raise ValueError(f"Parlay {index} has no legs")
+        for leg_index, leg in enumerate(legs):
+            for field in ('odds', 'opposing_odds'):
+                value = leg.get(field)
+                if (field == 'odds' or value is not None) and not is_valid_american_odds(value):
+                    raise ValueError(f"Parlay {index} leg {leg_index} has invalid {field}: {value}")
+    if len(stakes) != len(parlays):
+        raise ValueError("Each parlay needs exactly one stake")
+    if not parlays:
+        return []
+
+    priced = _price_numpy(parlays, stakes) if NUMPY_AVAILABLE else _price_python(parlays, stakes)
+
+    results = []
+    for row, stake in enumerate(stakes):
+        count = int(priced['leg_count'][row])
+        results.append({
+            'stake': float(stake),
+            'decimal_odds': round(float(priced['parlay_decimal'][row]), 4),
+            'potential_payout': round(float(priced['payout'][row]), 2),
+            'potential_profit': round(float(priced['payout'][row]) - float(stake), 2),
+            'implied_probability': round(float(priced['implied_probability'][row]), 6),
+            'fair_probability': round(float(priced['hit_probability'][row]), 6),
+            'expected_value': round(float(priced['expected_value'][row]), 2),
+            'expected_return_pct': round(float(priced['expected_value'][row]) / float(stake) * 100, 2),
+            'house_edge_pct': round(float(priced['house_edge'][row]) * 100, 2),
+            'legs': [
+                {
+                    'decimal_odds': round(float(priced['leg_decimal'][row][col]), 4),
+                    'implied_probability': round(float(priced['leg_implied'][row][col]), 4),
+                    'fair_probability': round(float(priced['leg_fair'][row][col]), 4)
+                }
+                for col in range(count)
+            ]
+        })
+    return results
+
+
+def price_parlay(legs: Sequence[Dict[str, Any]], stake: float) -> Dict[str, Any]:
+    """Price a single parlay (see price_parlays)"""
+    return price_parlays([legs], [stake])[0]
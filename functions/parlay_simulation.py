@@ -0,0 +1,230 @@
+# Parlay Correlation and Simulation
+# Same-game / same-team leg detection from odds snapshots and Monte Carlo joint hit probability
+
+import os
+import threading
+import time
+import weakref
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from parlay_pricing import NUMPY_AVAILABLE, load_numpy
+from team_registry import TeamRegistry, fold_team_name, team_registry
+
+DEFAULT_SIMULATION_TRIALS = 20000
+MAX_SIMULATION_TRIALS = 200000
+DEFAULT_SIMULATION_SEED = 20240901
+SIMULATION_TIME_BUDGET_MS = int(os.getenv('SIMULATION_TIME_BUDGET_MS', '250'))
+SIMULATION_CHUNK_SIZE = 10000  # trials drawn per vectorized step
+MAX_LEGS = 12
+
+# Pairwise latent correlations between legs of the same game
+SAME_SIDE_CORRELATION = 0.6  # e.g. a team's moneyline and its spread
+OPPOSING_SIDE_CORRELATION = -0.6  # one leg on each team
+SIDE_TOTAL_CORRELATION = 0.2  # a side paired with the game total
+
+
+class GameIndex:
+    """Lookup from (sport, team) to listed games for one odds snapshot"""
+
+    def __init__(self, snapshot: Any, registry: TeamRegistry = team_registry):
+        self.sport = snapshot.sport
+        self.registry = registry
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_team: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        for game in snapshot.games:
+            game_id = game.get('id')
+            if not game_id:
+                continue
+            self.by_id[game_id] = game
+            for side in ('home_team', 'away_team'):
+                key = registry.team_key(self.sport, game.get(side))
+                if key:
+                    self._by_team.setdefault(key, []).append((game.get('commence_time') or '', game))
+        for games in self._by_team.values():
+            games.sort(key=lambda entry: entry[0])
+
+    def team_key(self, name: Optional[str]) -> str:
+        return self.registry.team_key(self.sport, name)
+
+    def next_game(self, team: Optional[str]) -> Optional[Dict[str, Any]]:
+        """The team's earliest listed game (ISO commence times sort chronologically)"""
+        games = self._by_team.get(self.team_key(team))
+        return games[0][1] if games else None
+
+
+_index_lock = threading.Lock()
+_indexes: "weakref.WeakKeyDictionary[Any, GameIndex]" = weakref.WeakKeyDictionary()
+
+
+def game_index_for(snapshot: Any) -> GameIndex:
+    """GameIndex for a snapshot, built once and dropped with the snapshot"""
+    with _index_lock:
+        index = _indexes.get(snapshot)
+        if index is None:
+            index = _indexes[snapshot] = GameIndex(snapshot)
+        return index
+
+
+def resolve_leg_games(legs: Sequence[Dict[str, Any]], snapshots: Sequence[Any]) -> List[Optional[Dict[str, Any]]]:
+    """Match each leg to a listed game: by game_id when given, else by team name
+
+    Returns one entry per leg with the game id, sport and team key, or None
+    when the leg cannot be placed in any snapshot.
+    """
+    indexes = [game_index_for(snapshot) for snapshot in snapshots]
+    resolved: List[Optional[Dict[str, Any]]] = []
+    for leg in legs:
+        candidates = [index for index in indexes if not leg.get('sport') or index.sport == leg['sport']]
+        match = None
+        for index in candidates:
+            game = index.by_id.get(leg.get('game_id')) if leg.get('game_id') else index.next_game(leg.get('team'))
+            if game is not None:
+                # A team listed in several sports resolves to its soonest game
+                if match is None or (game.get('commence_time') or '') < (match[1].get('commence_time') or ''):
+                    match = (index, game)
+        if match is None:
+            resolved.append(None)
+            continue
+        index, game = match
+        resolved.append({'game_id': game['id'], 'sport': index.sport, 'team_key': index.team_key(leg.get('team'))})
+    return resolved
+
+
+def _leg_side(leg: Dict[str, Any], resolved: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+    """('total', over/under) for game totals, else ('team', team key)"""
+    if leg.get('bet_type') == 'total':
+        folded = fold_team_name(leg.get('team'))
+        return 'total', 'over' if 'over' in folded.split() else 'under' if 'under' in folded.split() else folded
+    return 'team', resolved['team_key'] if resolved else fold_team_name(leg.get('team'))
+
+
+def find_correlated_legs(legs: Sequence[Dict[str, Any]],
+                         resolved: Sequence[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Pairs of legs that share a game or a team, with the assumed latent correlation"""
+    sides = [_leg_side(leg, game) for leg, game in zip(legs, resolved)]
+    pairs = []
+    for i in range(len(legs)):
+        for j in range(i + 1, len(legs)):
+            same_game = resolved[i] is not None and resolved[j] is not None and \
+                resolved[i]['game_id'] == resolved[j]['game_id']
+            (kind_i, side_i), (kind_j, side_j) = sides[i], sides[j]
+            if same_game:
+                if kind_i != kind_j:
+                    relation, correlation = 'side_and_total', SIDE_TOTAL_CORRELATION
+                elif side_i == side_j:
+                    relation, correlation = 'same_side_same_game', SAME_SIDE_CORRELATION
+                else:
+                    relation, correlation = 'opposing_sides_same_game', OPPOSING_SIDE_CORRELATION
+            elif kind_i == kind_j == 'team' and side_i and side_i == side_j:
+                # Same team in different games: flagged, but the games are modelled as independent
+                relation, correlation = 'same_team', 0.0
+            else:
+                continue
+            pairs.append({'legs': [i, j], 'relation': relation, 'correlation': correlation,
+                          'game_id': resolved[i]['game_id'] if same_game else None})
+    return pairs
+
+
+def correlation_matrix(leg_count: int, pairs: Sequence[Dict[str, Any]]):
+    """Positive-definite latent correlation matrix for the legs"""
+    np = load_numpy()
+    matrix = np.eye(leg_count)
+    for pair in pairs:
+        i, j = pair['legs']
+        matrix[i, j] = matrix[j, i] = pair['correlation']
+    try:
+        np.linalg.cholesky(matrix)
+        return matrix
+    except np.linalg.LinAlgError:
+        # Inconsistent pairwise assumptions: clip to the nearest valid correlation matrix
+        values, vectors = np.linalg.eigh(matrix)
+        matrix = vectors @ np.diag(np.clip(values, 1e-6, None)) @ vectors.T
+        scale = np.sqrt(np.diag(matrix))
+        return matrix / np.outer(scale, scale)
+
+
+class MonteCarloWorkspace:
+    """Preallocated buffers for one thread's simulations
+
+    Flat buffers sized for the largest chunk and leg count are viewed as
+    (trials, legs) matrices, so repeated simulations allocate nothing per
+    chunk.
+    """
+
+    def __init__(self, chunk_size: int = SIMULATION_CHUNK_SIZE, max_legs: int = MAX_LEGS):
+        np = load_numpy()
+        self.chunk_size = chunk_size
+        self.max_legs = max_legs
+        self.normals = np.empty(chunk_size * max_legs)
+        self.correlated = np.empty(chunk_size * max_legs)
+        self.leg_hits = np.empty(chunk_size * max_legs, dtype=bool)
+        self.parlay_hits = np.empty(chunk_size, dtype=bool)
+
+    def views(self, trials: int, legs: int):
+        size = trials * legs
+        return (self.normals[:size].reshape(trials, legs), self.correlated[:size].reshape(trials, legs),
+                self.leg_hits[:size].reshape(trials, legs), self.parlay_hits[:trials])
+
+
+_workspaces = threading.local()
+
+
+def _workspace() -> MonteCarloWorkspace:
+    workspace = getattr(_workspaces, 'workspace', None)
+    if workspace is None:
+        workspace = _workspaces.workspace = MonteCarloWorkspace()
+    return workspace
+
+
+def simulate_joint_probability(probabilities: Sequence[float], pairs: Sequence[Dict[str, Any]],
+                               trials: int = DEFAULT_SIMULATION_TRIALS, seed: int = DEFAULT_SIMULATION_SEED,
+                               time_budget_ms: float = SIMULATION_TIME_BUDGET_MS) -> Dict[str, Any]:
+    """Estimate the chance every leg hits, with correlated legs, by Gaussian-copula Monte Carlo
+
+    Each leg hits when its latent normal falls below the quantile of its
+    vig-free probability; latent normals are correlated per pairs. Trials
+    run in fixed chunks from a seeded generator, so the same inputs give the
+    same estimate. Drawing stops early once time_budget_ms is spent (after at
+    least one chunk); the result reports how many trials ran.
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Simulation requires numpy")
+    legs = len(probabilities)
+    if not 1 <= legs <= MAX_LEGS:
+        raise ValueError(f"Simulation supports 1 to {MAX_LEGS} legs")
+    np = load_numpy()
+
+    started = time.perf_counter()
+    normal = NormalDist()
+    thresholds = np.array([normal.inv_cdf(min(max(p, 1e-9), 1 - 1e-9)) for p in probabilities])
+    cholesky = np.linalg.cholesky(correlation_matrix(legs, pairs))
+    rng = np.random.default_rng(seed)
+    workspace = _workspace()
+
+    completed = hits = 0
+    while completed < trials:
+        size = min(workspace.chunk_size, trials - completed)
+        normals, correlated, leg_hits, parlay_hits = workspace.views(size, legs)
+        rng.standard_normal(out=normals)
+        np.matmul(normals, cholesky.T, out=correlated)
+        np.less(correlated, thresholds, out=leg_hits)
+        np.all(leg_hits, axis=1, out=parlay_hits)
+        hits += int(np.count_nonzero(parlay_hits))
+        completed += size
+        if (time.perf_counter() - started) * 1000 >= time_budget_ms:
+            break
+
+    joint = hits / completed
+    independent = float(np.prod(probabilities))
+    return {
+        'joint_probability': round(joint, 6),
+        'independent_probability': round(independent, 6),
+        'correlation_lift': round(joint / independent, 4) if independent else None,
+        'std_error': round(float(np.sqrt(joint * (1 - joint) / completed)), 6),
+        'trials': completed,
+        'requested_trials': trials,
+        'truncated': completed < trials,
+        'seed': seed,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+    }
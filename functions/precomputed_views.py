@@ -0,0 +1,170 @@
+# Precomputed Views
+# Serialized endpoint payloads published by the scheduled pipeline and read by every instance
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from response_cache import content_hash
+
+# Scheduled runs must be more frequent than the shortest endpoint TTL reading their views (odds: 2 minutes)
+PRECOMPUTE_INTERVAL_MINUTES = int(os.getenv('PRECOMPUTE_INTERVAL_MINUTES', '1'))
+# Live scores (1 minute TTL) are republished on a tighter cadence inside each run, since schedules stop at 1 minute
+LIVE_PRECOMPUTE_INTERVAL_SECONDS = int(os.getenv('LIVE_PRECOMPUTE_INTERVAL_SECONDS', '20'))
+# A view stays servable until two scheduled runs have been missed
+PRECOMPUTED_VIEW_TTL_MS = int(os.getenv('PRECOMPUTED_VIEW_TTL_MS', str(2 * PRECOMPUTE_INTERVAL_MINUTES * 60000)))
+PRECOMPUTED_VIEW_COLLECTION = os.getenv('PRECOMPUTED_VIEW_COLLECTION', 'precomputed_views')
+MAX_RECORD_BYTES = 900 * 1024  # Firestore documents are capped at 1 MiB
+
+
+class MemoryViewStore:
+    """Process-local view store (tests and single-instance development)"""
+
+    def __init__(self):
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._records.get(key)
+
+    def put(self, key: str, record: Dict[str, Any]):
+        with self._lock:
+            self._records[key] = record
+
+
+class FirestoreViewStore:
+    """View store shared by every instance: one Firestore document per view
+
+    Honors FIRESTORE_EMULATOR_HOST through the Firestore client, so the
+    local emulator works without code changes.
+    """
+
+    def __init__(self, client: Any, collection: str = PRECOMPUTED_VIEW_COLLECTION):
+        self.client = client
+        self.collection = collection
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        document = self.client.collection(self.collection).document(key).get()
+        return document.to_dict() if document.exists else None
+
+    def put(self, key: str, record: Dict[str, Any]):
+        self.client.collection(self.collection).document(key).set(record)
+
+
+def create_view_store(get_app: Callable[[], Any]):
+    """Firestore store on Cloud Functions or against the emulator, else an in-memory one
+
+    PRECOMPUTED_VIEW_STORE ('firestore' or 'memory') overrides the choice.
+    """
+    backend = os.getenv('PRECOMPUTED_VIEW_STORE') or (
+        'firestore' if os.getenv('FIRESTORE_EMULATOR_HOST') or os.getenv('K_SERVICE') else 'memory'
+    )
+    if backend == 'firestore':
+        try:
+            from firebase_admin import firestore
+            return FirestoreViewStore(firestore.client(get_app()))
+        except Exception as e:
+            print(f"Firestore view store unavailable, using memory: {str(e)}")
+    return MemoryViewStore()
+
+
+class PrecomputedViews:
+    """Publishes and reads serialized views through a shared store
+
+    The store is created on first use so importing this module stays cheap.
+    Reads never raise: a missing, expired or unreadable record is a miss and
+    the caller builds the view itself. Records keep the serialized body and
+    its content hash so readers can serve them without re-encoding.
+    """
+
+    def __init__(self, store_factory: Callable[[], Any], ttl_ms: int = PRECOMPUTED_VIEW_TTL_MS):
+        self.store_factory = store_factory
+        self.ttl_ms = ttl_ms
+        self._store = None
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'read_failures': 0, 'published': 0,
+                      'publish_failures': 0}
+
+    @staticmethod
+    def _now() -> int:
+        return int(time.time() * 1000)
+
+    @property
+    def store(self):
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = self.store_factory()
+        return self._store
+
+    def publish(self, key: str, data: Any, now: Optional[int] = None) -> bool:
+        """Serialize and store a view; returns whether it was written"""
+        body = json.dumps(data).encode('utf-8')
+        if len(body) > MAX_RECORD_BYTES:
+            print(f"Precomputed view {key} is {len(body)} bytes, too large to publish")
+            self.stats['publish_failures'] += 1
+            return False
+        record = {
+            'body': body,
+            'content_hash': content_hash(data),
+            'generated_at': self._now() if now is None else now,
+            'ttl_ms': self.ttl_ms
+        }
+        try:
+            self.store.put(key, record)
+        except Exception as e:
+            print(f"Publishing precomputed view {key} failed: {str(e)}")
+            self.stats['publish_failures'] += 1
+            return False
+        self.stats['published'] += 1
+        return True
+
+    def load(self, key: str, max_age_ms: Optional[int] = None, now: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """The published record for key ({'body', 'content_hash', 'generated_at', ...})
+
+        Returns None when absent, unreadable, or older than its TTL or
+        max_age_ms (the reading endpoint's own freshness limit), so the
+        caller never serves a view older than it would have built itself.
+        """
+        try:
+            record = self.store.get(key)
+        except Exception as e:
+            print(f"Reading precomputed view {key} failed: {str(e)}")
+            self.stats['read_failures'] += 1
+            return None
+        if record is None:
+            self.stats['misses'] += 1
+            return None
+        now = self._now() if now is None else now
+        ttl_ms = record.get('ttl_ms', self.ttl_ms)
+        if now - record['generated_at'] >= (ttl_ms if max_age_ms is None else min(ttl_ms, max_age_ms)):
+            self.stats['expired'] += 1
+            return None
+        self.stats['hits'] += 1
+        return record
+
+    def run(self, builders: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """Build and publish every view; one failing builder does not stop the rest"""
+        started = time.perf_counter()
+        published, failed = [], []
+        for key, build in builders.items():
+            try:
+                data = build()
+            except Exception as e:
+                print(f"Precompute of {key} failed: {str(e)}")
+                data = None
+            if data is not None and self.publish(key, data):
+                published.append(key)
+            else:
+                failed.append(key)
+        return {
+            'published': published,
+            'failed': failed,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'ttl_ms': self.ttl_ms, 'store': type(self._store).__name__ if self._store else None}
@@ -0,0 +1,166 @@
+# Upstream Quota Governor
+# Tracks provider quota headers and stretches cache TTLs so the budget lasts until it resets
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, Mapping, Optional, Tuple
+
+RESERVE_FRACTION = float(os.getenv('QUOTA_RESERVE_FRACTION', '0.05'))  # held back for manual use and spikes
+MIN_TTL_SCALE = float(os.getenv('QUOTA_MIN_TTL_SCALE', '0.5'))  # fastest polling when quota is plentiful
+MAX_TTL_SCALE = float(os.getenv('QUOTA_MAX_TTL_SCALE', '30'))  # slowest polling when quota is nearly spent
+IDLE_HORIZON_HOURS = float(os.getenv('QUOTA_IDLE_HORIZON_HOURS', '6'))
+IDLE_TTL_SCALE = float(os.getenv('QUOTA_IDLE_TTL_SCALE', '10'))  # TTL multiplier for sports with nothing soon
+BURN_WINDOW_MS = 3600000  # burn rate is measured over the last hour
+MIN_BURN_SAMPLE_MS = 60000  # shorter spans are too noisy to extrapolate
+
+
+def _header_int(headers: Mapping[str, str], name: Optional[str]) -> Optional[int]:
+    if not name:
+        return None
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class QuotaGovernor:
+    """Quota accounting for one upstream provider
+
+    Every response's usage headers update the remaining budget and a burn
+    rate measured over the last hour. The budget that is safe to spend per
+    hour is the remaining quota (less a reserve) spread evenly over the time
+    left until the quota resets. ttl_for() scales a base cache TTL by how far
+    the current burn rate is above or below that pace, and stretches it
+    further for sports with no games starting soon.
+    """
+
+    def __init__(self, name: str, remaining_header: str, used_header: Optional[str] = None,
+                 period: str = 'month', reset_day: int = 1, reserve_fraction: float = RESERVE_FRACTION,
+                 min_scale: float = MIN_TTL_SCALE, max_scale: float = MAX_TTL_SCALE,
+                 idle_horizon_hours: float = IDLE_HORIZON_HOURS, idle_scale: float = IDLE_TTL_SCALE):
+        if period not in ('month', 'day'):
+            raise ValueError(f"Unsupported quota period: {period}")
+        self.name = name
+        self.remaining_header = remaining_header
+        self.used_header = used_header
+        self.period = period
+        self.reset_day = min(max(reset_day, 1), 28)  # valid in every month
+        self.reserve_fraction = reserve_fraction
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.idle_horizon_ms = int(idle_horizon_hours * 3600000)
+        self.idle_scale = idle_scale
+        self.remaining: Optional[int] = None
+        self.used: Optional[int] = None
+        self.updated_at: Optional[int] = None
+        self._spent = 0  # running total of observed consumption, immune to quota resets
+        self._samples: Deque[Tuple[int, int]] = deque()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _now() -> int:
+        return int(time.time() * 1000)
+
+    def record(self, headers: Mapping[str, str], now: Optional[int] = None):
+        """Update the budget from a response's quota headers (missing headers are ignored)"""
+        remaining = _header_int(headers, self.remaining_header)
+        if remaining is None:
+            return
+        used = _header_int(headers, self.used_header)
+        now = self._now() if now is None else now
+
+        with self._lock:
+            if self.remaining is not None:
+                if used is not None and self.used is not None:
+                    delta = used - self.used
+                else:
+                    delta = self.remaining - remaining
+                # A negative delta means the quota was reset; nothing was spent
+                self._spent += max(delta, 0)
+            self.remaining, self.used, self.updated_at = remaining, used, now
+
+            self._samples.append((now, self._spent))
+            while len(self._samples) > 2 and now - self._samples[1][0] >= BURN_WINDOW_MS:
+                self._samples.popleft()
+
+    def _burn_per_hour(self) -> Optional[float]:
+        """Requests spent per hour over the sample window (caller holds the lock)"""
+        if len(self._samples) < 2:
+            return None
+        (first_at, first_spent), (last_at, last_spent) = self._samples[0], self._samples[-1]
+        span = last_at - first_at
+        if span < MIN_BURN_SAMPLE_MS:
+            return None
+        return (last_spent - first_spent) * 3600000 / span
+
+    def resets_at(self, now: Optional[int] = None) -> int:
+        """Milliseconds since epoch at which the quota next resets"""
+        now_dt = datetime.fromtimestamp((self._now() if now is None else now) / 1000, tz=timezone.utc)
+        if self.period == 'day':
+            reset = (now_dt + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        else:
+            reset = now_dt.replace(day=self.reset_day, hour=0, minute=0, second=0, microsecond=0)
+            if reset <= now_dt:
+                year, month = (now_dt.year + 1, 1) if now_dt.month == 12 else (now_dt.year, now_dt.month + 1)
+                reset = reset.replace(year=year, month=month)
+        return int(reset.timestamp() * 1000)
+
+    def _target_per_hour(self, now: int) -> Optional[float]:
+        """Spend rate that exhausts the unreserved budget exactly at reset (caller holds the lock)"""
+        if self.remaining is None:
+            return None
+        total = self.remaining + (self.used or 0)
+        spendable = self.remaining - total * self.reserve_fraction
+        hours_left = max((self.resets_at(now) - now) / 3600000, 1 / 60)
+        return max(spendable, 0) / hours_left
+
+    def ttl_scale(self, now: Optional[int] = None) -> float:
+        """Multiplier for base TTLs: above 1 when burning too fast, below 1 when under budget"""
+        now = self._now() if now is None else now
+        with self._lock:
+            target = self._target_per_hour(now)
+            if target is None:
+                return 1.0
+            if target <= 0:
+                return self.max_scale
+            burn = self._burn_per_hour()
+            if burn is None:
+                return 1.0
+            return min(max(burn / target, self.min_scale), self.max_scale)
+
+    def ttl_for(self, base_ttl_ms: int, next_start_ms: Optional[int] = None, now: Optional[int] = None) -> int:
+        """Cache TTL for one sport given the quota pace and its next game start
+
+        next_start_ms is the earliest commence time among the sport's listed
+        games (in-progress games have already started, so they count as soon).
+        None means the sport has no games listed.
+        """
+        now = self._now() if now is None else now
+        scale = self.ttl_scale(now)
+        if next_start_ms is None or next_start_ms - now > self.idle_horizon_ms:
+            scale = max(scale, self.idle_scale)
+        return int(base_ttl_ms * scale)
+
+    def snapshot(self, now: Optional[int] = None) -> Dict[str, Any]:
+        """Remaining budget, burn rate and current TTL scale for health reporting"""
+        now = self._now() if now is None else now
+        scale = self.ttl_scale(now)
+        with self._lock:
+            burn = self._burn_per_hour()
+            target = self._target_per_hour(now)
+            return {
+                'provider': self.name,
+                'remaining': self.remaining,
+                'used': self.used,
+                'burn_per_hour': round(burn, 2) if burn is not None else None,
+                'budget_per_hour': round(target, 2) if target is not None else None,
+                'ttl_scale': round(scale, 3),
+                'resets_at': datetime.fromtimestamp(self.resets_at(now) / 1000, tz=timezone.utc).isoformat(),
+                'updated_at': self.updated_at
+            }
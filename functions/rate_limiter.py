@@ -0,0 +1,334 @@
+# Rate Limiter
+# Sliding-window rate limiting with in-memory and Redis-backed counters
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+DEFAULT_WINDOW_MS = 60000
+WHEEL_TICKS_PER_WINDOW = 60
+
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')  # 'memory' or 'redis'
+REDIS_URL = os.getenv('REDIS_URL', '')
+REDIS_KEY_PREFIX = os.getenv('RATE_LIMIT_REDIS_PREFIX', 'prizmbets:ratelimit')
+REDIS_SOCKET_TIMEOUT = float(os.getenv('RATE_LIMIT_REDIS_TIMEOUT', '0.25'))  # seconds
+REDIS_RETRY_AFTER_MS = int(os.getenv('RATE_LIMIT_REDIS_RETRY_AFTER_MS', '10000'))  # skip Redis this long after an error
+SYNC_BATCH_SIZE = int(os.getenv('RATE_LIMIT_SYNC_BATCH', '5'))  # local hits per key between round trips
+SYNC_INTERVAL_MS = int(os.getenv('RATE_LIMIT_SYNC_INTERVAL_MS', '1000'))  # max age of a key's shared counts
+MAX_LOCAL_KEYS = int(os.getenv('RATE_LIMIT_MAX_LOCAL_KEYS', '10000'))
+
+
+def sliding_estimate(previous: int, current: int, now: int, window: int, window_ms: int) -> float:
+    """Sliding-window count: previous window weighted by its overlap plus the current window"""
+    elapsed = (now - window * window_ms) / window_ms
+    return previous * (1 - elapsed) + current
+
+
+def retry_after_ms(previous: int, current: int, now: int, window: int, window_ms: int,
+                   limit: int, cost: int) -> int:
+    """Time until a sliding-window estimate leaves room for cost more requests"""
+    window_end = (window + 1) * window_ms
+    if current + cost > limit:
+        # The current window alone is over; wait for it to roll into the weighted slot
+        next_elapsed = 1 - (limit - cost) / current if current else 0.0
+        return max(window_end - now, 0) + int(min(max(next_elapsed, 0.0), 1.0) * window_ms)
+    if previous:
+        needed_elapsed = 1 - (limit - cost - current) / previous
+        return max(int(window * window_ms + needed_elapsed * window_ms) - now, 0)
+    return 0
+
+
+def _decision(allowed: bool, estimate: float, limit: int, window: int, window_ms: int,
+              retry_ms: int) -> Dict[str, Any]:
+    return {
+        'allowed': allowed,
+        'remaining': max(0, int(limit - estimate)),
+        'reset_time': (window + 1) * window_ms,
+        'retry_after': 0 if allowed else max(1, math.ceil(retry_ms / 1000))
+    }
+
+
+class RateLimitBackend:
+    """Interface for rate-limit counter stores"""
+
+    window_ms: int = DEFAULT_WINDOW_MS
+
+    @staticmethod
+    def _now() -> int:
+        return int(time.time() * 1000)
+
+    def hit(self, key: str, limit: int, cost: int = 1, now: Optional[int] = None) -> Dict[str, Any]:
+        """Record cost requests for key if they fit under limit
+
+        Returns a dict with 'allowed', 'remaining', 'reset_time' (ms epoch at
+        which the current window ends) and 'retry_after' (seconds, 0 when
+        allowed).
+        """
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Backend counters for health reporting"""
+        raise NotImplementedError
+
+
+class _Counter:
+    """Request counts for a key's current and previous fixed windows"""
+
+    __slots__ = ('window', 'current', 'previous', 'expires_at')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.current = 0
+        self.previous = 0
+        self.expires_at = 0
+
+
+class SlidingWindowRateLimiter(RateLimitBackend):
+    """Sliding-window-counter limiter with O(1) work per request
+
+    Each key keeps two integers: the count for the current fixed window and
+    the count for the one before it. The sliding estimate weights the previous
+    window by how much of it still overlaps the last window_ms, so memory is
+    constant per key no matter how many requests it makes.
+
+    Idle keys are dropped lazily by a timing wheel: a key is filed under the
+    tick at which both of its windows have passed, and each call only drains
+    the slots whose ticks have elapsed since the previous call. A key is filed
+    at most once per window, so draining is amortized O(1) per request.
+    """
+
+    def __init__(self, window_ms: int = DEFAULT_WINDOW_MS, ticks_per_window: int = WHEEL_TICKS_PER_WINDOW):
+        self.window_ms = window_ms
+        self.tick_ms = max(1, window_ms // ticks_per_window)
+        # Two windows of ticks plus slack, so an expiry never wraps onto a live slot
+        self._slots: List[Set[str]] = [set() for _ in range(2 * ticks_per_window + 2)]
+        self._counters: Dict[str, _Counter] = {}
+        self._wheel_tick: Optional[int] = None
+        self._lock = threading.Lock()
+        self.stats = {'allowed': 0, 'limited': 0, 'expired_keys': 0}
+
+    def _advance_wheel(self, now: int):
+        """Drop keys filed under ticks that have elapsed (caller holds the lock)"""
+        tick = now // self.tick_ms
+        if self._wheel_tick is None:
+            self._wheel_tick = tick
+            return
+        # After a long idle gap every slot is due; one pass over the wheel covers it
+        steps = min(tick - self._wheel_tick, len(self._slots))
+        for offset in range(1, steps + 1):
+            slot = self._slots[(self._wheel_tick + offset) % len(self._slots)]
+            for key in slot:
+                counter = self._counters.get(key)
+                # Keys that saw traffic since being filed are re-filed under a later tick
+                if counter is not None and counter.expires_at <= now:
+                    del self._counters[key]
+                    self.stats['expired_keys'] += 1
+            slot.clear()
+        self._wheel_tick = max(self._wheel_tick, tick)
+
+    def _schedule(self, key: str, counter: _Counter):
+        """File a key under the tick at which both of its windows are over"""
+        counter.expires_at = (counter.window + 2) * self.window_ms
+        tick = counter.expires_at // self.tick_ms
+        self._slots[tick % len(self._slots)].add(key)
+
+    def _roll(self, key: str, counter: _Counter, window: int):
+        """Shift counts forward when the fixed window has changed"""
+        if window == counter.window:
+            return
+        counter.previous = counter.current if window == counter.window + 1 else 0
+        counter.current = 0
+        counter.window = window
+        self._schedule(key, counter)
+
+    def hit(self, key: str, limit: int, cost: int = 1, now: Optional[int] = None) -> Dict[str, Any]:
+        now = self._now() if now is None else now
+        window = now // self.window_ms
+        with self._lock:
+            self._advance_wheel(now)
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters[key] = _Counter(window)
+                self._schedule(key, counter)
+            else:
+                self._roll(key, counter, window)
+
+            estimate = sliding_estimate(counter.previous, counter.current, now, window, self.window_ms)
+            allowed = estimate + cost <= limit
+            if allowed:
+                counter.current += cost
+                estimate += cost
+                self.stats['allowed'] += 1
+                retry_ms = 0
+            else:
+                self.stats['limited'] += 1
+                retry_ms = retry_after_ms(counter.previous, counter.current, now, window, self.window_ms, limit, cost)
+
+        return _decision(allowed, estimate, limit, window, self.window_ms, retry_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'backend': 'memory', 'tracked_keys': len(self._counters), 'window_ms': self.window_ms}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._counters)
+
+
+class _SyncedCounter:
+    """Last known shared counts for a key plus hits admitted locally since"""
+
+    __slots__ = ('window', 'current', 'previous', 'pending', 'synced_at')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.current = 0
+        self.previous = 0
+        self.pending = 0
+        self.synced_at = 0
+
+
+class RedisRateLimiter(RateLimitBackend):
+    """Sliding-window-counter limiter shared by every instance through Redis
+
+    Counts live in one Redis key per client key and fixed window, so all
+    function instances enforce a single limit. A sync is one MULTI/EXEC
+    pipeline: INCRBY the current window, PEXPIRE it, GET the previous window.
+
+    To save round trips, clearly-under-limit hits are admitted locally
+    against the last synced counts and flushed in batches: a key syncs once
+    it has batch_size pending hits, its counts are older than
+    sync_interval_ms, its window rolls over, or it is within batch_size of the
+    limit. Across instances this can over-admit by at most batch_size - 1 hits
+    per instance per key. When Redis is unreachable, decisions fall back to the
+    in-memory limiter, and after a backend error Redis is skipped for
+    retry_after_ms so requests do not each wait out the socket timeout.
+    """
+
+    def __init__(self, client: Any, window_ms: int = DEFAULT_WINDOW_MS, key_prefix: str = REDIS_KEY_PREFIX,
+                 batch_size: int = SYNC_BATCH_SIZE, sync_interval_ms: int = SYNC_INTERVAL_MS,
+                 max_local_keys: int = MAX_LOCAL_KEYS, fallback: Optional[RateLimitBackend] = None,
+                 retry_after_ms: int = REDIS_RETRY_AFTER_MS):
+        self.client = client
+        self.window_ms = window_ms
+        self.key_prefix = key_prefix
+        self.batch_size = max(1, batch_size)
+        self.sync_interval_ms = sync_interval_ms
+        self.max_local_keys = max_local_keys
+        self.fallback = fallback or SlidingWindowRateLimiter(window_ms)
+        self.retry_after_ms = retry_after_ms
+        self._backend_down_until = 0
+        self._local: "OrderedDict[str, _SyncedCounter]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'allowed': 0,
+            'limited': 0,
+            'local_decisions': 0,
+            'round_trips': 0,
+            'backend_errors': 0,
+            'short_circuited': 0
+        }
+
+    def _redis_key(self, key: str, window: int) -> str:
+        return f"{self.key_prefix}:{key}:{window}"
+
+    def _counter(self, key: str, window: int) -> _SyncedCounter:
+        """Local counter for key, bounded LRU (caller holds the lock)"""
+        counter = self._local.get(key)
+        if counter is None:
+            counter = self._local[key] = _SyncedCounter(window)
+            while len(self._local) > self.max_local_keys:
+                # Unflushed hits of an evicted key are dropped: at most batch_size - 1
+                self._local.popitem(last=False)
+        else:
+            self._local.move_to_end(key)
+        return counter
+
+    def _sync(self, key: str, window: int, increment: int):
+        """Add increment to the shared window count; returns (current, previous)"""
+        current_key = self._redis_key(key, window)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.incrby(current_key, increment)
+        pipe.pexpire(current_key, 2 * self.window_ms)
+        pipe.get(self._redis_key(key, window - 1))
+        current, _, previous = pipe.execute()
+        self.stats['round_trips'] += 1
+        return int(current), int(previous or 0)
+
+    def hit(self, key: str, limit: int, cost: int = 1, now: Optional[int] = None) -> Dict[str, Any]:
+        now = self._now() if now is None else now
+        if now < self._backend_down_until:
+            self.stats['short_circuited'] += 1
+            return self.fallback.hit(key, limit, cost, now)
+        window = now // self.window_ms
+        with self._lock:
+            counter = self._counter(key, window)
+            if counter.window != window:
+                # Unflushed hits from the old window only matter as its weighted tail; drop them
+                counter.window, counter.pending = window, 0
+                counter.synced_at = 0
+            estimate = sliding_estimate(counter.previous, counter.current + counter.pending, now, window, self.window_ms)
+            needs_sync = (
+                counter.synced_at == 0 or
+                counter.pending + cost >= self.batch_size or
+                now - counter.synced_at >= self.sync_interval_ms or
+                estimate + cost > limit - self.batch_size
+            )
+            if not needs_sync:
+                counter.pending += cost
+                self.stats['allowed'] += 1
+                self.stats['local_decisions'] += 1
+                return _decision(True, estimate + cost, limit, window, self.window_ms, 0)
+            increment = counter.pending + cost
+            counter.pending = 0
+
+        try:
+            current, previous = self._sync(key, window, increment)
+            estimate = sliding_estimate(previous, current, now, window, self.window_ms)
+            allowed = estimate <= limit
+            if not allowed:
+                # Hand this request's tentative cost back; only denials pay a second round trip
+                self.client.decrby(self._redis_key(key, window), cost)
+                self.stats['round_trips'] += 1
+                current -= cost
+                estimate -= cost
+        except Exception as e:
+            self.stats['backend_errors'] += 1
+            print(f"Rate limit backend error, using local limiter for {self.retry_after_ms} ms: {str(e)}")
+            with self._lock:
+                counter.pending += increment - cost
+                self._backend_down_until = now + self.retry_after_ms
+            return self.fallback.hit(key, limit, cost, now)
+
+        with self._lock:
+            if counter.window == window:
+                counter.current, counter.previous, counter.synced_at = current, previous, now
+            self.stats['allowed' if allowed else 'limited'] += 1
+        retry_ms = 0 if allowed else retry_after_ms(previous, current, now, window, self.window_ms, limit, cost)
+        return _decision(allowed, estimate, limit, window, self.window_ms, retry_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'backend': 'redis', 'tracked_keys': len(self._local), 'window_ms': self.window_ms}
+
+
+def create_rate_limiter(window_ms: int = DEFAULT_WINDOW_MS) -> RateLimitBackend:
+    """Rate-limit backend selected by RATE_LIMIT_BACKEND, falling back to in-memory
+
+    redis is imported only when the Redis backend is selected.
+    """
+    if RATE_LIMIT_BACKEND == 'redis':
+        try:
+            import redis
+        except ImportError:
+            redis = None
+        if redis is not None and REDIS_URL:
+            client = redis.Redis.from_url(
+                REDIS_URL, socket_timeout=REDIS_SOCKET_TIMEOUT, socket_connect_timeout=REDIS_SOCKET_TIMEOUT
+            )
+            return RedisRateLimiter(client, window_ms)
+        print("RATE_LIMIT_BACKEND=redis but redis or REDIS_URL is unavailable; using in-memory rate limiting")
+    return SlidingWindowRateLimiter(window_ms)
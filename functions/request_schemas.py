@@ -0,0 +1,49 @@
+# Request Schemas
+# Marshmallow input schemas, imported on first validation rather than at cold start
+
+from marshmallow import Schema, ValidationError, fields, validate
+
+from parlay_pricing import is_valid_american_odds
+from parlay_simulation import DEFAULT_SIMULATION_SEED, DEFAULT_SIMULATION_TRIALS, MAX_SIMULATION_TRIALS
+
+SUPPORTED_SPORT_FILTERS = (
+    'nfl', 'nba', 'mlb', 'nhl', 'mma', 'ufc', 'soccer', 'tennis',
+    'golf', 'ncaaf', 'ncaab', 'wnba', 'americanfootball_nfl',
+    'basketball_nba', 'baseball_mlb', 'icehockey_nhl', 'mma_mixed_martial_arts'
+)
+
+
+def validate_american_odds(value):
+    """Reject odds strictly between -100 and +100, which American odds cannot express"""
+    if not is_valid_american_odds(value):
+        raise ValidationError('American odds must be -100 or lower, or +100 or higher')
+
+
+class BetSchema(Schema):
+    team = fields.Str(required=True, validate=validate.Length(min=1, max=100))
+    bet_type = fields.Str(required=True, validate=validate.OneOf(['spread', 'moneyline', 'total', 'prop']))
+    odds = fields.Int(required=True, validate=[validate.Range(min=-1000, max=1000), validate_american_odds])
+    opposing_odds = fields.Int(required=False, allow_none=True, validate=[
+        validate.Range(min=-10000, max=10000), validate_american_odds
+    ])  # other side of the same market, used to remove the vig
+    line = fields.Float(allow_none=True, validate=validate.Range(min=-100, max=100))
+    game_id = fields.Str(required=False, validate=validate.Length(min=1, max=100))  # Odds API event id
+    sport = fields.Str(required=False, validate=validate.Length(min=1, max=60))
+
+
+class SimulationSchema(Schema):
+    trials = fields.Int(load_default=DEFAULT_SIMULATION_TRIALS,
+                        validate=validate.Range(min=1000, max=MAX_SIMULATION_TRIALS))
+    seed = fields.Int(load_default=DEFAULT_SIMULATION_SEED, validate=validate.Range(min=0, max=2**32 - 1))
+
+
+class ParlaySchema(Schema):
+    bets = fields.List(fields.Nested(BetSchema), required=True, validate=validate.Length(min=1, max=12))
+    total_amount = fields.Float(required=True, validate=validate.Range(min=1, max=10000))
+    simulation = fields.Nested(SimulationSchema, required=False)  # opt-in Monte Carlo for correlated legs
+
+
+class SportFilterSchema(Schema):
+    sport = fields.Str(required=False, validate=validate.OneOf(SUPPORTED_SPORT_FILTERS))
+    per_sport = fields.Int(required=False, validate=validate.Range(min=1, max=50))
+    upcoming = fields.Bool(required=False)
@@ -0,0 +1,213 @@
+# Request Validation
+# Schemas compiled once per process, with a plain-Python fast path for well-formed payloads
+
+import math
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from marshmallow import RAISE, Schema, ValidationError, fields, missing, validate
+
+ERROR_MESSAGE = 'Invalid request data. Please check your input.'
+
+
+class _Fallback(Exception):
+    """The fast path cannot decide; defer to the full marshmallow load"""
+
+
+def _fallback():
+    raise _Fallback()
+
+
+def _compile_validator(validator: Callable[[Any], Any]) -> Callable[[Any], None]:
+    """Plain comparisons for the common marshmallow validators; anything else is called as-is"""
+    if isinstance(validator, validate.Range):
+        low, high = validator.min, validator.max
+        low_ok = (lambda v: v >= low) if validator.min_inclusive else (lambda v: v > low)
+        high_ok = (lambda v: v <= high) if validator.max_inclusive else (lambda v: v < high)
+
+        def check_range(value):
+            if (low is not None and not low_ok(value)) or (high is not None and not high_ok(value)):
+                _fallback()
+        return check_range
+
+    if isinstance(validator, validate.Length):
+        low, high, equal = validator.min, validator.max, validator.equal
+
+        def check_length(value):
+            size = len(value)
+            if (equal is not None and size != equal) or (low is not None and size < low) or \
+                    (high is not None and size > high):
+                _fallback()
+        return check_length
+
+    if isinstance(validator, validate.OneOf):
+        choices = frozenset(validator.choices)
+
+        def check_choice(value):
+            if value not in choices:
+                _fallback()
+        return check_choice
+
+    def check_custom(value):
+        try:
+            if validator(value) is False:
+                _fallback()
+        except ValidationError:
+            _fallback()
+    return check_custom
+
+
+def _str(value):
+    if type(value) is not str:
+        _fallback()
+    return value
+
+
+def _int(value):
+    if type(value) is not int:
+        _fallback()
+    return value
+
+
+def _float(value):
+    if type(value) not in (int, float) or not math.isfinite(value):
+        _fallback()
+    return float(value)
+
+
+def _bool(value):
+    if type(value) is not bool:
+        _fallback()
+    return value
+
+
+def _compile_field(field: fields.Field) -> Optional[Callable[[Any], Any]]:
+    """Converter for one field, or None when the field type is not supported by the fast path"""
+    if isinstance(field, fields.Nested):
+        if field.many:
+            return None
+        convert = compile_schema(field.schema)
+        if convert is None:
+            return None
+    elif isinstance(field, fields.List):
+        inner = _compile_field(field.inner)
+        if inner is None:
+            return None
+
+        def convert(value):
+            if type(value) is not list:
+                _fallback()
+            return [inner(item) for item in value]
+    elif isinstance(field, fields.Bool):
+        convert = _bool
+    elif isinstance(field, fields.Float):
+        convert = _float
+    elif isinstance(field, fields.Int):
+        convert = _int
+    elif type(field) in (fields.Str, fields.String):
+        convert = _str
+    else:
+        return None
+
+    checks = tuple(_compile_validator(validator) for validator in field.validators)
+    if not checks:
+        return convert
+
+    def convert_and_check(value):
+        value = convert(value)
+        for check in checks:
+            check(value)
+        return value
+    return convert_and_check
+
+
+def compile_schema(schema: Schema) -> Optional[Callable[[Any], Dict[str, Any]]]:
+    """Compile a schema instance into a function returning exactly what schema.load would
+
+    The compiled loader accepts only unambiguous input (exact JSON types, no
+    unknown keys) and raises _Fallback for anything else, including every
+    invalid payload, so error reporting stays with marshmallow. Returns None
+    for schemas the fast path cannot reproduce faithfully (hooks, unknown
+    field types, many=True, non-RAISE unknown handling).
+    """
+    if schema.many or schema.unknown != RAISE or any(schema._hooks.values()):
+        return None
+
+    compiled = []
+    for name, field in schema.load_fields.items():
+        convert = _compile_field(field)
+        if convert is None:
+            return None
+        default = field.load_default
+        compiled.append((field.data_key or name, field.attribute or name, field.required, field.allow_none,
+                         default, convert))
+    known = frozenset(entry[0] for entry in compiled)
+
+    def load(data):
+        if type(data) is not dict or not known.issuperset(data):
+            _fallback()
+        result = {}
+        for key, attribute, required, allow_none, default, convert in compiled:
+            if key not in data:
+                if required:
+                    _fallback()
+                if default is not missing:
+                    result[attribute] = default() if callable(default) else default
+                continue
+            value = data[key]
+            if value is None:
+                if not allow_none:
+                    _fallback()
+                result[attribute] = None
+            else:
+                result[attribute] = convert(value)
+        return result
+    return load
+
+
+class CompiledValidator:
+    """One schema instance plus its compiled fast path, built once and reused for every request"""
+
+    def __init__(self, schema_class: Type[Schema]):
+        self.schema = schema_class()
+        self.fast_load = compile_schema(self.schema)
+        self.stats = {'fast': 0, 'full': 0, 'invalid': 0}
+
+    def validate(self, data: Any) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Return (result, None) for valid data or (None, errors) with per-field messages"""
+        if self.fast_load is not None:
+            try:
+                result = self.fast_load(data)
+                self.stats['fast'] += 1
+                return result, None
+            except _Fallback:
+                pass
+
+        self.stats['full'] += 1
+        try:
+            return self.schema.load(data), None
+        except ValidationError as e:
+            self.stats['invalid'] += 1
+            messages = e.messages if isinstance(e.messages, dict) else {'_schema': e.messages}
+            return None, {'error': ERROR_MESSAGE, 'details': messages}
+
+
+_validators: Dict[Type[Schema], CompiledValidator] = {}
+_validators_lock = threading.Lock()
+
+
+def get_validator(schema_class: Type[Schema]) -> CompiledValidator:
+    """The process-wide CompiledValidator for a schema class"""
+    validator = _validators.get(schema_class)
+    if validator is None:
+        with _validators_lock:
+            validator = _validators.get(schema_class)
+            if validator is None:
+                validator = _validators[schema_class] = CompiledValidator(schema_class)
+    return validator
+
+
+def get_validation_stats() -> Dict[str, Dict[str, Any]]:
+    """Fast-path and fallback counters per compiled schema"""
+    return {schema_class.__name__: {**validator.stats, 'compiled': validator.fast_load is not None}
+            for schema_class, validator in list(_validators.items())}
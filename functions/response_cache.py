@@ -0,0 +1,263 @@
+# Response Cache
+# Bounded in-process API response cache with LRU eviction and stale-while-revalidate
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from http_encoding import precompress
+from single_flight import SingleFlight, SingleFlightTimeout
+
+DEFAULT_TTL = 300000  # 5 minutes in milliseconds
+MAX_STALE_DURATION = int(os.getenv('CACHE_MAX_STALE_MS', '60000'))  # serve stale data for up to 1 minute
+COALESCE_TIMEOUT = int(os.getenv('CACHE_COALESCE_TIMEOUT_MS', '15000'))  # max wait on another request's fetch
+MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '256'))
+MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(32 * 1024 * 1024)))  # approximate payload budget
+
+FRESH = 'fresh'
+STALE = 'stale'
+
+# Rebuild timestamps left out of the content hash, so the ETag only changes when the data does
+VOLATILE_FIELDS = frozenset({'last_updated'})
+
+
+def _without_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _without_volatile(item) for key, item in value.items() if key not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_without_volatile(item) for item in value]
+    return value
+
+
+def content_hash(data: Any) -> str:
+    """SHA-256 of the payload's JSON ignoring VOLATILE_FIELDS at any depth"""
+    return hashlib.sha256(json.dumps(_without_volatile(data)).encode('utf-8')).hexdigest()
+
+
+class Serialized:
+    """Loader result that is already JSON-encoded, e.g. a view published by another instance
+
+    created_at (ms since epoch) is when the payload was generated; the cache
+    entry ages from then rather than from when it was loaded.
+    """
+
+    __slots__ = ('body', 'content_hash', 'created_at')
+
+    def __init__(self, body: bytes, content_hash: str, created_at: Optional[int] = None):
+        self.body = body
+        self.content_hash = content_hash
+        self.created_at = created_at
+
+
+class ResponseCache:
+    """TTL cache that serves stale entries while a single background refresh runs
+
+    Loads for a key are single-flight: concurrent misses wait on one loader call
+    instead of each fetching upstream.
+
+    Capacity is bounded by entry count and stored body bytes, evicting
+    least recently used entries first. Expiry uses one FIFO queue per TTL: all
+    entries in a queue share a TTL, so insertion order is expiry order and
+    purging only ever inspects the queue heads.
+    """
+
+    def __init__(self, default_ttl: int = DEFAULT_TTL, max_stale: int = MAX_STALE_DURATION,
+                 coalesce_timeout: int = COALESCE_TIMEOUT, max_entries: int = MAX_ENTRIES,
+                 max_bytes: int = MAX_BYTES):
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale
+        self.coalesce_timeout = coalesce_timeout
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._expiry_queues: Dict[int, Deque[Tuple[int, str, Dict[str, Any]]]] = {}
+        self._bytes = 0
+        self._flights = SingleFlight()
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'coalesce_timeouts': 0,
+            'refreshes': 0,
+            'refresh_failures': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+
+    @staticmethod
+    def _now() -> int:
+        return int(time.time() * 1000)
+
+    def _state(self, entry: Dict[str, Any], now: int) -> Optional[str]:
+        age = now - entry['timestamp']
+        if age < entry['ttl']:
+            return FRESH
+        if age < entry['ttl'] + self.max_stale:
+            return STALE
+        return None
+
+    @staticmethod
+    def encode(data: Any) -> Dict[str, Any]:
+        """Serialize a payload once: JSON bytes, compressed variants and a content hash"""
+        body = json.dumps(data).encode('utf-8')
+        return {
+            'body': body,
+            **precompress(body),
+            'content_hash': content_hash(data)
+        }
+
+    def lookup(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Return (entry, state) where state is 'fresh', 'stale' or None for a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            return None, None
+        state = self._state(entry, self._now())
+        return (entry, state) if state else (None, None)
+
+    def set(self, key: str, data: Any, ttl: Optional[int] = None) -> Dict[str, Any]:
+        """Store data under key with the given TTL in milliseconds
+
+        The payload is serialized here, so cache hits can write the stored
+        bytes without re-encoding; the decoded payload is not kept, so the
+        stored bodies are what CACHE_MAX_BYTES accounts for. A Serialized
+        payload keeps its body and hash (only compression runs) and is dated
+        from its created_at.
+        """
+        now = self._now()
+        timestamp = now
+        if isinstance(data, Serialized):
+            encoded = {'body': data.body, **precompress(data.body), 'content_hash': data.content_hash}
+            if data.created_at is not None:
+                timestamp = min(now, data.created_at)
+        else:
+            encoded = self.encode(data)
+        entry = {
+            'timestamp': timestamp,
+            'ttl': ttl if ttl is not None else self.default_ttl,
+            **encoded,
+            'size': sum(len(value) for field, value in encoded.items() if field.startswith('body'))
+        }
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous['size']
+            self._entries[key] = entry
+            self._bytes += entry['size']
+
+            # Backdated entries can land behind later deadlines; lookups still honor their own age
+            deadline = timestamp + entry['ttl'] + self.max_stale
+            self._expiry_queues.setdefault(entry['ttl'], deque()).append((deadline, key, entry))
+
+            self._purge_expired(now)
+            self._evict_over_capacity()
+        return entry
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry['size']
+
+    def _purge_expired(self, now: int):
+        """Pop expired heads off each TTL queue (caller holds the lock)"""
+        for ttl, queue in list(self._expiry_queues.items()):
+            while queue and queue[0][0] <= now:
+                _, key, entry = queue.popleft()
+                # Skip queue records for entries that were replaced or evicted
+                if self._entries.get(key) is entry:
+                    self._remove(key)
+                    self.stats['expirations'] += 1
+            if not queue:
+                del self._expiry_queues[ttl]
+
+    def _evict_over_capacity(self):
+        """Evict least recently used entries beyond the limits (caller holds the lock)"""
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.stats['evictions'] += 1
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Return a cache entry for key, loading or revalidating as needed
+
+        Fresh entries are returned directly. Stale entries (within max_stale) are
+        returned immediately while one background thread refreshes them. On a
+        miss the loader runs inline, shared with any concurrent misses for the
+        same key; callers that time out waiting fall back to whatever expired
+        entry is still held. A loader returning None is not cached and yields
+        None so callers can apply their own fallback.
+        """
+        entry, state = self.lookup(key)
+        if state == FRESH:
+            self.stats['hits'] += 1
+            return entry
+        if state == STALE:
+            self.stats['stale_hits'] += 1
+            self._refresh_in_background(key, loader, ttl)
+            return entry
+
+        self.stats['misses'] += 1
+        try:
+            entry, shared = self._flights.do(
+                key, lambda: self._load(key, loader, ttl), timeout=self.coalesce_timeout / 1000
+            )
+            if shared:
+                self.stats['coalesced'] += 1
+            return entry
+        except SingleFlightTimeout:
+            self.stats['coalesce_timeouts'] += 1
+            with self._lock:
+                expired_entry = self._entries.get(key)
+            if expired_entry is not None:
+                return expired_entry
+            return self._load(key, loader, ttl)
+
+    def _load(self, key: str, loader: Callable[[], Any], ttl: Optional[int]) -> Optional[Dict[str, Any]]:
+        data = loader()
+        if data is None:
+            return None
+        return self.set(key, data, ttl)
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Any], ttl: Optional[int]):
+        def refresh():
+            try:
+                self.stats['refreshes'] += 1
+                return self._load(key, loader, ttl)
+            except Exception as e:
+                self.stats['refresh_failures'] += 1
+                print(f"Background cache refresh failed for {key}: {str(e)}")
+                return None
+
+        self._flights.start(key, refresh)
+
+    def clean_expired(self):
+        """Drop entries that are past their TTL plus the stale window"""
+        with self._lock:
+            self._purge_expired(self._now())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/stale/miss/eviction counters plus current size"""
+        with self._lock:
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'approx_bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'max_stale_ms': self.max_stale
+            }
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
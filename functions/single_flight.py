@@ -0,0 +1,73 @@
+# Single-Flight Call Coalescing
+# Ensures only one in-flight call per key; concurrent callers share its result
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class SingleFlightTimeout(Exception):
+    """Raised when a caller gives up waiting on another caller's in-flight call"""
+
+
+class _Call:
+    """One in-flight call and the result it will publish"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Per-key call coalescing for cache misses on hot keys"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def _run(self, key: str, call: _Call, fn: Callable[[], Any]):
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """Run fn once for all concurrent callers of key
+
+        Returns (result, shared) where shared is True when the result came from
+        another caller's call. Errors from that call are re-raised in every
+        waiter. Raises SingleFlightTimeout if a waiter exceeds timeout seconds.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            self._run(key, call, fn)
+        elif not call.done.wait(timeout):
+            raise SingleFlightTimeout(key)
+
+        if call.error is not None:
+            raise call.error
+        return call.result, not leader
+
+    def start(self, key: str, fn: Callable[[], Any]) -> bool:
+        """Run fn in a background thread unless a call for key is already in flight"""
+        with self._lock:
+            if key in self._calls:
+                return False
+            call = self._calls[key] = _Call()
+
+        threading.Thread(target=self._run, args=(key, call, fn), name=f"single-flight-{key}", daemon=True).start()
+        return True
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for key is currently running"""
+        with self._lock:
+            return key in self._calls
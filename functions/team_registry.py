@@ -0,0 +1,229 @@
+# Team Registry
+# Canonical team names and alias tables for Odds API <-> API-Sports matching
+
+import re
+import unicodedata
+from typing import Dict, Iterable, Optional, Tuple
+
+# Canonical name -> aliases seen across Odds API, API-Sports and common short forms.
+# Nicknames are only listed when they are unique within the sport.
+TEAM_ALIASES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    'americanfootball_nfl': {
+        'Arizona Cardinals': ('Cardinals', 'ARI'),
+        'Atlanta Falcons': ('Falcons', 'ATL'),
+        'Baltimore Ravens': ('Ravens', 'BAL'),
+        'Buffalo Bills': ('Bills', 'BUF'),
+        'Carolina Panthers': ('Panthers', 'CAR'),
+        'Chicago Bears': ('Bears', 'CHI'),
+        'Cincinnati Bengals': ('Bengals', 'CIN'),
+        'Cleveland Browns': ('Browns', 'CLE'),
+        'Dallas Cowboys': ('Cowboys', 'DAL'),
+        'Denver Broncos': ('Broncos', 'DEN'),
+        'Detroit Lions': ('Lions', 'DET'),
+        'Green Bay Packers': ('Packers', 'GB'),
+        'Houston Texans': ('Texans', 'HOU'),
+        'Indianapolis Colts': ('Colts', 'IND'),
+        'Jacksonville Jaguars': ('Jaguars', 'JAX'),
+        'Kansas City Chiefs': ('Chiefs', 'KC'),
+        'Las Vegas Raiders': ('Raiders', 'LV', 'Oakland Raiders'),
+        'Los Angeles Chargers': ('Chargers', 'LAC', 'LA Chargers'),
+        'Los Angeles Rams': ('Rams', 'LAR', 'LA Rams'),
+        'Miami Dolphins': ('Dolphins', 'MIA'),
+        'Minnesota Vikings': ('Vikings', 'MIN'),
+        'New England Patriots': ('Patriots', 'NE'),
+        'New Orleans Saints': ('Saints', 'NO'),
+        'New York Giants': ('Giants', 'NY Giants', 'NYG'),
+        'New York Jets': ('Jets', 'NY Jets', 'NYJ'),
+        'Philadelphia Eagles': ('Eagles', 'PHI'),
+        'Pittsburgh Steelers': ('Steelers', 'PIT'),
+        'San Francisco 49ers': ('49ers', 'SF', 'SF 49ers'),
+        'Seattle Seahawks': ('Seahawks', 'SEA'),
+        'Tampa Bay Buccaneers': ('Buccaneers', 'TB'),
+        'Tennessee Titans': ('Titans', 'TEN'),
+        'Washington Commanders': ('Commanders', 'WAS', 'Washington Football Team'),
+    },
+    'basketball_nba': {
+        'Atlanta Hawks': ('Hawks', 'ATL'),
+        'Boston Celtics': ('Celtics', 'BOS'),
+        'Brooklyn Nets': ('Nets', 'BKN'),
+        'Charlotte Hornets': ('Hornets', 'CHA'),
+        'Chicago Bulls': ('Bulls', 'CHI'),
+        'Cleveland Cavaliers': ('Cavaliers', 'CLE'),
+        'Dallas Mavericks': ('Mavericks', 'DAL'),
+        'Denver Nuggets': ('Nuggets', 'DEN'),
+        'Detroit Pistons': ('Pistons', 'DET'),
+        'Golden State Warriors': ('Warriors', 'GSW'),
+        'Houston Rockets': ('Rockets', 'HOU'),
+        'Indiana Pacers': ('Pacers', 'IND'),
+        'Los Angeles Clippers': ('Clippers', 'LAC', 'LA Clippers'),
+        'Los Angeles Lakers': ('Lakers', 'LAL', 'LA Lakers'),
+        'Memphis Grizzlies': ('Grizzlies', 'MEM'),
+        'Miami Heat': ('Heat', 'MIA'),
+        'Milwaukee Bucks': ('Bucks', 'MIL'),
+        'Minnesota Timberwolves': ('Timberwolves', 'MIN'),
+        'New Orleans Pelicans': ('Pelicans', 'NOP'),
+        'New York Knicks': ('Knicks', 'NYK', 'NY Knicks'),
+        'Oklahoma City Thunder': ('Thunder', 'OKC'),
+        'Orlando Magic': ('Magic', 'ORL'),
+        'Philadelphia 76ers': ('76ers', 'Sixers', 'PHI'),
+        'Phoenix Suns': ('Suns', 'PHX'),
+        'Portland Trail Blazers': ('Trail Blazers', 'Blazers', 'POR'),
+        'Sacramento Kings': ('Kings', 'SAC'),
+        'San Antonio Spurs': ('Spurs', 'SAS'),
+        'Toronto Raptors': ('Raptors', 'TOR'),
+        'Utah Jazz': ('Jazz', 'UTA'),
+        'Washington Wizards': ('Wizards', 'WAS'),
+    },
+    'basketball_wnba': {
+        'Atlanta Dream': ('Dream', 'ATL'),
+        'Chicago Sky': ('Sky', 'CHI'),
+        'Connecticut Sun': ('Sun', 'CON'),
+        'Dallas Wings': ('Wings', 'DAL'),
+        'Golden State Valkyries': ('Valkyries', 'GSV'),
+        'Indiana Fever': ('Fever', 'IND'),
+        'Las Vegas Aces': ('Aces', 'LVA'),
+        'Los Angeles Sparks': ('Sparks', 'LA Sparks'),
+        'Minnesota Lynx': ('Lynx', 'MIN'),
+        'New York Liberty': ('Liberty', 'NYL', 'NY Liberty'),
+        'Phoenix Mercury': ('Mercury', 'PHX'),
+        'Seattle Storm': ('Storm', 'SEA'),
+        'Washington Mystics': ('Mystics', 'WAS'),
+    },
+    'baseball_mlb': {
+        'Arizona Diamondbacks': ('Diamondbacks', 'D-backs', 'ARI'),
+        'Athletics': ('Oakland Athletics', "A's", 'OAK', 'Sacramento Athletics'),
+        'Atlanta Braves': ('Braves', 'ATL'),
+        'Baltimore Orioles': ('Orioles', 'BAL'),
+        'Boston Red Sox': ('Red Sox', 'BOS'),
+        'Chicago Cubs': ('Cubs', 'CHC'),
+        'Chicago White Sox': ('White Sox', 'CWS'),
+        'Cincinnati Reds': ('Reds', 'CIN'),
+        'Cleveland Guardians': ('Guardians', 'CLE', 'Cleveland Indians'),
+        'Colorado Rockies': ('Rockies', 'COL'),
+        'Detroit Tigers': ('Tigers', 'DET'),
+        'Houston Astros': ('Astros', 'HOU'),
+        'Kansas City Royals': ('Royals', 'KC'),
+        'Los Angeles Angels': ('Angels', 'LAA', 'LA Angels'),
+        'Los Angeles Dodgers': ('Dodgers', 'LAD', 'LA Dodgers'),
+        'Miami Marlins': ('Marlins', 'MIA'),
+        'Milwaukee Brewers': ('Brewers', 'MIL'),
+        'Minnesota Twins': ('Twins', 'MIN'),
+        'New York Mets': ('Mets', 'NYM', 'NY Mets'),
+        'New York Yankees': ('Yankees', 'NYY', 'NY Yankees'),
+        'Philadelphia Phillies': ('Phillies', 'PHI'),
+        'Pittsburgh Pirates': ('Pirates', 'PIT'),
+        'San Diego Padres': ('Padres', 'SD'),
+        'San Francisco Giants': ('Giants', 'SF Giants', 'SF'),
+        'Seattle Mariners': ('Mariners', 'SEA'),
+        'St. Louis Cardinals': ('Cardinals', 'STL', 'Saint Louis Cardinals'),
+        'Tampa Bay Rays': ('Rays', 'TB'),
+        'Texas Rangers': ('Rangers', 'TEX'),
+        'Toronto Blue Jays': ('Blue Jays', 'TOR'),
+        'Washington Nationals': ('Nationals', 'WSH'),
+    },
+    'icehockey_nhl': {
+        'Anaheim Ducks': ('Ducks', 'ANA'),
+        'Boston Bruins': ('Bruins', 'BOS'),
+        'Buffalo Sabres': ('Sabres', 'BUF'),
+        'Calgary Flames': ('Flames', 'CGY'),
+        'Carolina Hurricanes': ('Hurricanes', 'CAR'),
+        'Chicago Blackhawks': ('Blackhawks', 'CHI'),
+        'Colorado Avalanche': ('Avalanche', 'COL'),
+        'Columbus Blue Jackets': ('Blue Jackets', 'CBJ'),
+        'Dallas Stars': ('Stars', 'DAL'),
+        'Detroit Red Wings': ('Red Wings', 'DET'),
+        'Edmonton Oilers': ('Oilers', 'EDM'),
+        'Florida Panthers': ('Panthers', 'FLA'),
+        'Los Angeles Kings': ('Kings', 'LA Kings', 'LAK'),
+        'Minnesota Wild': ('Wild', 'MIN'),
+        'Montreal Canadiens': ('Canadiens', 'MTL'),
+        'Nashville Predators': ('Predators', 'NSH'),
+        'New Jersey Devils': ('Devils', 'NJD'),
+        'New York Islanders': ('Islanders', 'NYI', 'NY Islanders'),
+        'New York Rangers': ('Rangers', 'NY Rangers', 'NYR'),
+        'Ottawa Senators': ('Senators', 'OTT'),
+        'Philadelphia Flyers': ('Flyers', 'PHI'),
+        'Pittsburgh Penguins': ('Penguins', 'PIT'),
+        'San Jose Sharks': ('Sharks', 'SJS'),
+        'Seattle Kraken': ('Kraken', 'SEA'),
+        'St. Louis Blues': ('Blues', 'STL', 'Saint Louis Blues'),
+        'Tampa Bay Lightning': ('Lightning', 'TBL'),
+        'Toronto Maple Leafs': ('Maple Leafs', 'TOR'),
+        'Utah Mammoth': ('Mammoth', 'Utah Hockey Club', 'Utah HC', 'UTA'),
+        'Vancouver Canucks': ('Canucks', 'VAN'),
+        'Vegas Golden Knights': ('Golden Knights', 'VGK'),
+        'Washington Capitals': ('Capitals', 'WSH'),
+        'Winnipeg Jets': ('Jets', 'WPG'),
+    },
+    'soccer_epl': {
+        'Arsenal': ('Arsenal FC', 'ARS'),
+        'Aston Villa': ('Aston Villa FC', 'AVL'),
+        'Bournemouth': ('AFC Bournemouth', 'BOU'),
+        'Brentford': ('Brentford FC', 'BRE'),
+        'Brighton and Hove Albion': ('Brighton', 'BHA'),
+        'Burnley': ('Burnley FC', 'BUR'),
+        'Chelsea': ('Chelsea FC', 'CHE'),
+        'Crystal Palace': ('Crystal Palace FC', 'CRY'),
+        'Everton': ('Everton FC', 'EVE'),
+        'Fulham': ('Fulham FC', 'FUL'),
+        'Ipswich Town': ('Ipswich', 'IPS'),
+        'Leeds United': ('Leeds', 'LEE'),
+        'Leicester City': ('Leicester', 'LEI'),
+        'Liverpool': ('Liverpool FC', 'LIV'),
+        'Manchester City': ('Man City', 'MCI'),
+        'Manchester United': ('Man United', 'Man Utd', 'MUN'),
+        'Newcastle United': ('Newcastle', 'NEW'),
+        'Nottingham Forest': ("Nott'm Forest", 'NFO'),
+        'Southampton': ('Southampton FC', 'SOU'),
+        'Sunderland': ('Sunderland AFC', 'SUN'),
+        'Tottenham Hotspur': ('Tottenham', 'Spurs', 'TOT'),
+        'West Ham United': ('West Ham', 'WHU'),
+        'Wolverhampton Wanderers': ('Wolves', 'WOL'),
+    },
+}
+
+_PUNCTUATION = re.compile(r"[.'’]")
+_NON_ALNUM = re.compile(r'[^a-z0-9 ]+')
+
+
+def fold_team_name(name: Optional[str]) -> str:
+    """Reduce a team name to a comparison key (accents, case, punctuation folded)"""
+    if not name:
+        return ''
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch)).lower()
+    name = name.replace('&', ' and ')
+    name = _PUNCTUATION.sub('', name)  # "St. Louis" -> "st louis", "L.A." -> "la"
+    return ' '.join(_NON_ALNUM.sub(' ', name).split())
+
+
+class TeamRegistry:
+    """Precomputed per-sport alias lookup resolving team names to canonical names"""
+
+    def __init__(self, aliases: Dict[str, Dict[str, Iterable[str]]] = None):
+        self._lookup: Dict[str, Dict[str, str]] = {}
+        for sport, teams in (aliases if aliases is not None else TEAM_ALIASES).items():
+            lookup = self._lookup.setdefault(sport, {})
+            for canonical, team_aliases in teams.items():
+                for alias in (canonical, *team_aliases):
+                    key = fold_team_name(alias)
+                    existing = lookup.setdefault(key, canonical)
+                    if existing != canonical:
+                        raise ValueError(f"Alias '{alias}' maps to both {existing} and {canonical} in {sport}")
+
+    def canonicalize(self, sport_key: str, name: Optional[str]) -> Optional[str]:
+        """Canonical team name, or None if the name is not registered for the sport"""
+        return self._lookup.get(sport_key, {}).get(fold_team_name(name))
+
+    def team_key(self, sport_key: str, name: Optional[str]) -> str:
+        """Stable matching key: the canonical name when known, else the folded name"""
+        folded = fold_team_name(name)
+        return self._lookup.get(sport_key, {}).get(folded, folded)
+
+    def sports(self):
+        """Sport keys with a registered team list"""
+        return list(self._lookup)
+
+
+# Shared registry built once at import
+team_registry = TeamRegistry()
@@ -0,0 +1,176 @@
+# Verified Token Cache
+# Bounded cache of verified token claims keyed by token digest, with negative caching
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv('TOKEN_CACHE_MAX_ENTRIES', '4096'))
+TOKEN_CACHE_MAX_TTL_MS = int(os.getenv('TOKEN_CACHE_MAX_TTL_MS', '300000'))  # re-verify at least every 5 minutes
+TOKEN_NEGATIVE_TTL_MS = int(os.getenv('TOKEN_NEGATIVE_TTL_MS', '30000'))  # remember rejected tokens briefly
+KEY_REFRESH_FRACTION = 0.8  # refresh public keys after 80% of their max-age
+KEY_REFRESH_DEFAULT_S = 3600
+KEY_REFRESH_RETRY_S = 60
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+class VerifiedTokenCache:
+    """LRU cache of verified token claims keyed by the token's SHA-256 digest
+
+    Entries expire at the earlier of the token's exp claim and max_ttl_ms, so
+    a cached token is never accepted past its own expiry. Tokens that fail
+    verification are remembered for negative_ttl_ms so repeated bad requests
+    skip the crypto work too. Raw tokens are never stored.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES, max_ttl_ms: int = TOKEN_CACHE_MAX_TTL_MS,
+                 negative_ttl_ms: int = TOKEN_NEGATIVE_TTL_MS):
+        self.max_entries = max_entries
+        self.max_ttl_ms = max_ttl_ms
+        self.negative_ttl_ms = negative_ttl_ms
+        self._entries: "OrderedDict[str, Tuple[int, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'rejected': 0, 'evictions': 0}
+
+    @staticmethod
+    def _now() -> int:
+        return int(time.time() * 1000)
+
+    @staticmethod
+    def digest(token: str) -> str:
+        """Cache key for a token"""
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def _put(self, key: str, expires_at: int, claims: Optional[Dict[str, Any]]):
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def lookup(self, token: str, now: Optional[int] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Return (hit, claims); a hit with claims None means the token was rejected recently"""
+        now = self._now() if now is None else now
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            claims = entry[1]
+            self.stats['hits' if claims is not None else 'negative_hits'] += 1
+        return True, (dict(claims) if claims is not None else None)
+
+    def store(self, token: str, claims: Dict[str, Any], now: Optional[int] = None,
+              expires_at: Optional[int] = None):
+        """Cache verified claims until the token's exp (or max_ttl_ms, whichever is sooner)
+
+        expires_at (ms since epoch) can shorten the lifetime further for
+        tokens with policy limits beyond exp.
+        """
+        now = self._now() if now is None else now
+        expires_at = min(expires_at, now + self.max_ttl_ms) if expires_at is not None else now + self.max_ttl_ms
+        exp = claims.get('exp')
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, int(exp * 1000))
+        if expires_at > now:
+            self._put(self.digest(token), expires_at, dict(claims))
+
+    def store_rejected(self, token: str, now: Optional[int] = None):
+        """Remember that a token failed verification"""
+        now = self._now() if now is None else now
+        self._put(self.digest(token), now + self.negative_ttl_ms, None)
+
+    def verify(self, token: str, verifier: Callable[[str], Dict[str, Any]],
+               is_rejection: Callable[[Exception], bool] = lambda e: True) -> Optional[Dict[str, Any]]:
+        """Verified claims for token, calling verifier only on a cache miss
+
+        verifier raises on failure. Failures for which is_rejection returns
+        True are negatively cached; others (e.g. transient key fetch errors)
+        propagate uncached.
+        """
+        hit, claims = self.lookup(token)
+        if hit:
+            return claims
+
+        try:
+            claims = verifier(token)
+        except Exception as e:
+            if not is_rejection(e):
+                raise
+            self.stats['rejected'] += 1
+            self.store_rejected(token)
+            return None
+        self.store(token, claims)
+        return dict(claims)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current size"""
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries), 'max_entries': self.max_entries}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _refresh_interval(response: Any) -> float:
+    """Seconds until public keys should be refetched, from the response's Cache-Control"""
+    headers = getattr(response, 'headers', None) or {}
+    match = _MAX_AGE.search(headers.get('Cache-Control', '') or headers.get('cache-control', ''))
+    if not match:
+        return KEY_REFRESH_DEFAULT_S
+    return max(int(match.group(1)) * KEY_REFRESH_FRACTION, KEY_REFRESH_RETRY_S)
+
+
+class KeyRefresher:
+    """Keeps a verifier's public-key cache warm
+
+    fetch() retrieves the signing keys through the same HTTP cache the
+    verifier reads from. maybe_refresh() is cheap to call on every request:
+    it starts one background fetch when the keys have never been loaded or
+    are close to their Cache-Control max-age, so verification on the request
+    path finds the keys already cached.
+    """
+
+    def __init__(self, fetch: Callable[[], Any]):
+        self.fetch = fetch
+        self.refresh_at = 0.0
+        self._lock = threading.Lock()
+        self._running = False
+        self.stats = {'refreshes': 0, 'failures': 0}
+
+    def refresh(self):
+        """Fetch keys now and schedule the next refresh"""
+        try:
+            response = self.fetch()
+            self.refresh_at = time.time() + _refresh_interval(response)
+            self.stats['refreshes'] += 1
+        except Exception as e:
+            self.refresh_at = time.time() + KEY_REFRESH_RETRY_S
+            self.stats['failures'] += 1
+            print(f"Public key refresh failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._running = False
+
+    def maybe_refresh(self) -> bool:
+        """Start a background refresh if one is due; returns whether one was started"""
+        if time.time() < self.refresh_at:
+            return False
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+        threading.Thread(target=self.refresh, name='key-refresh', daemon=True).start()
+        return True
@@ -0,0 +1,120 @@
+# Upstream HTTP Client
+# Shared keep-alive session for The Odds API and API-Sports with timeouts and jittered retries
+
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', '3.05'))  # seconds
+READ_TIMEOUT = float(os.getenv('UPSTREAM_READ_TIMEOUT', '10'))  # seconds
+MAX_RETRIES = int(os.getenv('UPSTREAM_MAX_RETRIES', '2'))
+# Wall-clock budget for one get() including every attempt and backoff; a retry is only started when
+# it can run to its read timeout within the budget (first attempt alone is bounded by the timeouts)
+TIME_BUDGET = float(os.getenv('UPSTREAM_TIME_BUDGET_SECONDS', '14'))  # under the 15s fan-out deadline
+BACKOFF_BASE = 0.25  # seconds
+BACKOFF_CAP = 4.0  # seconds
+POOL_HOSTS = 8  # Odds API plus one host per API-Sports sport
+POOL_MAXSIZE = 10  # keep-alive connections per host, at least the fan-out worker count
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class UpstreamClient:
+    """Pooled requests.Session with per-host keep-alive and bounded retries
+
+    Connections are reused across requests and warm function invocations, so
+    only the first call to each host pays for the TCP and TLS handshake.
+    Connection errors, timeouts and 429/5xx responses are retried with
+    full-jitter exponential backoff; a Retry-After header overrides the
+    backoff. A retry starts only if the time already spent, its backoff and
+    its read timeout fit in time_budget, so a slow upstream cannot hold a
+    request much longer than one attempt's timeouts.
+    """
+
+    def __init__(self, connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT,
+                 max_retries: int = MAX_RETRIES, time_budget: float = TIME_BUDGET,
+                 pool_hosts: int = POOL_HOSTS, pool_maxsize: int = POOL_MAXSIZE,
+                 session: Optional[requests.Session] = None, sleep=time.sleep, clock=time.monotonic):
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.time_budget = time_budget
+        self._sleep = sleep
+        self._clock = clock
+        self.session = session or requests.Session()
+        # Retries are handled here so Retry-After and the budget apply uniformly
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, host: str, field: str):
+        with self._lock:
+            counts = self.stats.setdefault(host, {'requests': 0, 'retries': 0, 'errors': 0})
+            counts[field] += 1
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """GET with retries; returns the last response or raises the last connection error"""
+        host = urlsplit(url).netloc
+        started = self._clock()
+        attempt = 0
+        while True:
+            self._count(host, 'requests')
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+
+            delay = self._backoff(attempt, retry_after)
+            elapsed = self._clock() - started
+            if attempt >= self.max_retries or elapsed + delay + self.timeout[1] > self.time_budget:
+                self._count(host, 'errors')
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            self._count(host, 'retries')
+            print(f"Retrying {host} in {delay:.2f}s (attempt {attempt}/{self.max_retries}): "
+                  f"{error or response.status_code}")
+            self._sleep(delay)
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Request, retry and error counts per upstream host"""
+        with self._lock:
+            return {host: dict(counts) for host, counts in self.stats.items()}
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for verify_jwt_token: cold verification vs the verified-token cache
+Run directly: python tests/benchmark_jwt_verification.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions'))
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-secret-key-with-enough-length')
+os.environ.setdefault('ODDS_API_KEY', 'benchmark')
+
+import jwt  # noqa: E402
+
+import main  # noqa: E402
+
+
+class BenchRequest:
+    def __init__(self, token):
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+
+def make_token(user_id):
+    now = int(time.time())
+    return jwt.encode(
+        {'sub': user_id, 'iat': now, 'exp': now + 3600, 'iss': main.JWT_ISSUER, 'aud': main.JWT_AUDIENCE},
+        main.JWT_SECRET_KEY,
+        algorithm='HS256'
+    )
+
+
+def run(label, requests):
+    start = time.perf_counter()
+    for req in requests:
+        user_id, error = main.verify_jwt_token(req)
+        assert error is None, error
+    elapsed = time.perf_counter() - start
+    print(f"{label:<8} {len(requests):>7} verifications  {elapsed * 1000:8.1f} ms  "
+          f"{len(requests) / elapsed:>10,.0f} ops/s  {elapsed / len(requests) * 1e6:6.2f} us/op")
+    return elapsed
+
+
+def main_benchmark(iterations=20000):
+    # Cold: every token is distinct, so each call pays for HMAC and claims parsing
+    cold_requests = [BenchRequest(make_token(f'user-{i}')) for i in range(iterations)]
+    main.jwt_token_cache = main.VerifiedTokenCache(max_entries=iterations)
+    cold = run('cold', cold_requests)
+
+    # Cached: one polling client presenting the same token
+    warm_request = BenchRequest(make_token('poller'))
+    main.verify_jwt_token(warm_request)
+    cached = run('cached', [warm_request] * iterations)
+
+    print(f"speedup  {cold / cached:.1f}x")
+    print(main.jwt_token_cache.get_stats())
+
+
+if __name__ == '__main__':
+    main_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
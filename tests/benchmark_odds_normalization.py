@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for bookmaker normalization: the previous per-game loop vs normalize_game
+Run directly: python tests/benchmark_odds_normalization.py [recorded_odds.json] [rounds]
+
+Without a recorded Odds API response, a synthetic 200-game, 15-book,
+three-market payload of the same shape is used.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions'))
+
+from odds_normalization import ALL_MARKETS, normalize_game  # noqa: E402
+from odds_payload import make_payload  # noqa: E402
+from test_odds_normalization import legacy_moneylines  # noqa: E402
+
+
+def legacy_all_markets(game):
+    """The previous loop extended to spreads and totals: one walk of the bookmakers per market"""
+    sportsbooks = legacy_moneylines(game)
+    for market_key, field in (('spreads', 'spread'), ('totals', 'total')):
+        for bookmaker in game.get('bookmakers', []):
+            book_key = bookmaker.get('key')
+            if book_key in ['draftkings', 'fanduel', 'betmgm', 'caesars', 'betrivers']:
+                for market in bookmaker.get('markets', []):
+                    if market.get('key') == market_key:
+                        line = {}
+                        for outcome in market.get('outcomes', []):
+                            if market_key == 'totals' and outcome.get('name') in ('Over', 'Under'):
+                                side = outcome.get('name').lower()
+                            elif outcome.get('name') == game.get('home_team'):
+                                side = 'home'
+                            elif outcome.get('name') == game.get('away_team'):
+                                side = 'away'
+                            else:
+                                continue
+                            line[side] = {'point': outcome.get('point'), 'price': outcome.get('price')}
+                        if line:
+                            sportsbooks.setdefault(book_key, {})[field] = line
+    return sportsbooks
+
+
+def run(label, convert, payload, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for game in payload:
+            convert(game)
+    elapsed = time.perf_counter() - start
+    games = rounds * len(payload)
+    print(f"{label:<32} {games:>7} games  {elapsed * 1000:8.1f} ms  {elapsed / games * 1e6:7.2f} us/game")
+    return elapsed
+
+
+def main_benchmark(path=None, rounds=50):
+    if path:
+        with open(path) as f:
+            payload = json.load(f)
+    else:
+        payload = make_payload()
+    books = sum(len(game.get('bookmakers', [])) for game in payload)
+    print(f"payload: {len(payload)} games, {books} bookmaker entries")
+
+    before = run('legacy loop, h2h', legacy_moneylines, payload, rounds)
+    after = run('single pass, h2h', normalize_game, payload, rounds)
+    print(f"h2h speedup  {before / after:.1f}x")
+
+    before = run('legacy loop per market, all 3', legacy_all_markets, payload, rounds)
+    after = run('single pass, all 3', lambda game: normalize_game(game, markets=ALL_MARKETS), payload, rounds)
+    print(f"all-markets speedup  {before / after:.1f}x")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    path = args.pop(0) if args and not args[0].isdigit() else None
+    main_benchmark(path, int(args[0]) if args else 50)
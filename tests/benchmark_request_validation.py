@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for request validation: per-call schema construction vs the compiled validator
+Run directly: python tests/benchmark_request_validation.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions'))
+
+from marshmallow import ValidationError  # noqa: E402
+
+from request_schemas import ParlaySchema  # noqa: E402
+from request_validation import CompiledValidator  # noqa: E402
+
+PAYLOAD = {
+    'bets': [
+        {'team': 'Los Angeles Lakers', 'bet_type': 'moneyline', 'odds': -150, 'opposing_odds': 130},
+        {'team': 'Kansas City Chiefs', 'bet_type': 'spread', 'odds': -110, 'line': -3.5},
+        {'team': 'Over 220.5', 'bet_type': 'total', 'odds': -105, 'game_id': 'abc123'},
+    ],
+    'total_amount': 25
+}
+
+
+def per_call_schema(data):
+    """Previous behaviour: a new schema instance per request and stringified errors"""
+    try:
+        return ParlaySchema().load(data), None
+    except ValidationError as e:
+        return None, f"Validation error: {str(e.messages)}"
+
+
+def run(label, validate, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result, error = validate(PAYLOAD)
+        assert error is None, error
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {iterations:>7} validations  {elapsed * 1000:8.1f} ms  "
+          f"{elapsed / iterations * 1e6:7.2f} us/op")
+    return elapsed
+
+
+def main_benchmark(iterations=20000):
+    compiled = CompiledValidator(ParlaySchema)
+    assert compiled.validate(PAYLOAD)[0] == per_call_schema(PAYLOAD)[0]
+
+    before = run('per-call schema', per_call_schema, iterations)
+    shared = ParlaySchema()
+    run('shared schema', lambda data: (shared.load(data), None), iterations)
+    after = run('compiled', compiled.validate, iterations)
+
+    print(f"speedup  {before / after:.1f}x")
+    print(compiled.stats)
+
+
+if __name__ == '__main__':
+    main_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
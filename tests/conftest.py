@@ -0,0 +1,7 @@
+# Shared pytest setup: make the Cloud Functions source importable
+import os
+import sys
+
+FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'functions')
+if FUNCTIONS_DIR not in sys.path:
+    sys.path.insert(0, FUNCTIONS_DIR)
@@ -0,0 +1,54 @@
+"""
+Synthetic Odds API v4 payloads for tests and benchmarks
+Same shape as GET /v4/sports/{sport}/odds?markets=h2h,spreads,totals&regions=us
+"""
+
+import random
+
+BOOKS = [
+    ('draftkings', 'DraftKings'), ('fanduel', 'FanDuel'), ('betmgm', 'BetMGM'), ('caesars', 'Caesars'),
+    ('betrivers', 'BetRivers'), ('pointsbetus', 'PointsBet (US)'), ('bovada', 'Bovada'), ('mybookieag', 'MyBookie.ag'),
+    ('betonlineag', 'BetOnline.ag'), ('lowvig', 'LowVig.ag'), ('betus', 'BetUS'), ('wynnbet', 'WynnBET'),
+    ('unibet_us', 'Unibet'), ('superbook', 'SuperBook'), ('espnbet', 'ESPN BET')
+]
+
+
+def make_game(index, rng, books=BOOKS):
+    home, away = f'Home Team {index}', f'Away Team {index}'
+    spread = rng.choice([1.5, 2.5, 3.5, 6.5, 7.5])
+    total = rng.choice([41.5, 44.5, 47.5, 220.5, 8.5])
+    bookmakers = []
+    for key, title in books:
+        bookmakers.append({
+            'key': key,
+            'title': title,
+            'last_update': '2030-01-01T00:00:00Z',
+            'markets': [
+                {'key': 'h2h', 'last_update': '2030-01-01T00:00:00Z', 'outcomes': [
+                    {'name': home, 'price': rng.randint(-250, -105)},
+                    {'name': away, 'price': rng.randint(100, 240)}
+                ]},
+                {'key': 'spreads', 'last_update': '2030-01-01T00:00:00Z', 'outcomes': [
+                    {'name': home, 'price': rng.randint(-120, -100), 'point': -spread},
+                    {'name': away, 'price': rng.randint(-120, -100), 'point': spread}
+                ]},
+                {'key': 'totals', 'last_update': '2030-01-01T00:00:00Z', 'outcomes': [
+                    {'name': 'Over', 'price': rng.randint(-120, -100), 'point': total},
+                    {'name': 'Under', 'price': rng.randint(-120, -100), 'point': total}
+                ]}
+            ]
+        })
+    return {
+        'id': f'event{index:05d}',
+        'sport_key': 'americanfootball_nfl',
+        'sport_title': 'NFL',
+        'commence_time': f'2030-01-{1 + index % 28:02d}T18:00:00Z',
+        'home_team': home,
+        'away_team': away,
+        'bookmakers': bookmakers
+    }
+
+
+def make_payload(games=200, seed=7):
+    rng = random.Random(seed)
+    return [make_game(index, rng) for index in range(games)]
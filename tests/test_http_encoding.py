@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Accept-Encoding negotiation and response compression
+"""
+
+import gzip
+import json
+
+import pytest
+
+from http_encoding import (
+    COMPRESSION_MIN_BYTES, encode_response, etag_matches, make_etag, negotiate_encoding,
+    parse_accept_encoding, select_body
+)
+from response_cache import ResponseCache
+
+
+class FakeRequest:
+    def __init__(self, accept_encoding=None):
+        self.headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+
+
+class FakeResponse:
+    def __init__(self, body, headers=None):
+        self._body = body
+        self.headers = dict(headers or {})
+        self.direct_passthrough = False
+
+    def get_data(self):
+        return self._body
+
+    def set_data(self, body):
+        self._body = body
+
+
+def test_parse_and_negotiate_accept_encoding():
+    """q-values are honoured, including explicit refusals"""
+    assert parse_accept_encoding('gzip;q=0.5, br') == {'gzip': 0.5, 'br': 1.0}
+    assert negotiate_encoding('gzip, deflate') == 'gzip'
+    assert negotiate_encoding('gzip;q=0, identity') is None
+    assert negotiate_encoding('*') in ('br', 'gzip')
+    assert negotiate_encoding(None) is None
+
+
+def test_encode_response_compresses_large_bodies_only():
+    """Bodies above the threshold are compressed and marked with Content-Encoding"""
+    large = b'{"games": [' + b'{"id": "g"},' * COMPRESSION_MIN_BYTES + b'{}]}'
+    response = encode_response(FakeRequest('gzip'), FakeResponse(large, {'Vary': 'Origin'}))
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Origin, Accept-Encoding'
+    assert gzip.decompress(response.get_data()) == large
+
+    small = encode_response(FakeRequest('gzip'), FakeResponse(b'{"status": "ok"}'))
+    assert 'Content-Encoding' not in small.headers
+
+    identity = encode_response(FakeRequest(), FakeResponse(large))
+    assert identity.get_data() == large
+
+
+def test_select_body_uses_cached_compressed_variant():
+    """Cache hits reuse the stored compressed bytes"""
+    cache = ResponseCache(default_ttl=60000)
+    entry = cache.set('all_games_50_True', {'games': ['game'] * COMPRESSION_MIN_BYTES})
+
+    body, encoding = select_body(entry, 'gzip')
+    assert encoding == 'gzip'
+    assert body is entry['body_gzip']
+
+    body, encoding = select_body(entry, 'identity')
+    assert (body, encoding) == (entry['body'], None)
+
+
+def test_etag_matches_any_coding_of_same_payload():
+    """If-None-Match validates against the content hash whatever coding was cached"""
+    entry = ResponseCache.encode({'games': []})
+    content_hash = entry['content_hash']
+
+    assert make_etag(content_hash) == f'W/"{content_hash[:32]}"'
+    assert make_etag(content_hash, 'gzip') == f'W/"{content_hash[:32]}-gzip"'
+
+    assert etag_matches(make_etag(content_hash), content_hash)
+    assert etag_matches(make_etag(content_hash, 'gzip'), content_hash)
+    assert etag_matches(f'"other", {make_etag(content_hash)}', content_hash)
+    assert etag_matches(f'"{content_hash[:32]}"', content_hash)
+    assert etag_matches('*', content_hash)
+
+    other_hash = ResponseCache.encode({'games': [1]})['content_hash']
+    assert not etag_matches(make_etag(other_hash), content_hash)
+    assert not etag_matches(None, content_hash)
+
+
+def test_etag_ignores_rebuild_timestamps():
+    """Payloads differing only in last_updated (at any depth) share a content hash"""
+    first = {'live_games': [{'id': 'g1', 'live_data': {'score': 3, 'last_updated': 't1'}}], 'last_updated': 't1'}
+    rebuilt = {'live_games': [{'id': 'g1', 'live_data': {'score': 3, 'last_updated': 't2'}}], 'last_updated': 't2'}
+    changed = {'live_games': [{'id': 'g1', 'live_data': {'score': 4, 'last_updated': 't2'}}], 'last_updated': 't2'}
+
+    assert ResponseCache.encode(first)['content_hash'] == ResponseCache.encode(rebuilt)['content_hash']
+    assert ResponseCache.encode(first)['content_hash'] != ResponseCache.encode(changed)['content_hash']
+
+
+@pytest.mark.parametrize('upstream', ['live', 'demo'])
+def test_live_scores_returns_304_after_rebuild(monkeypatch, upstream):
+    """A client polling with If-None-Match gets an empty 304 when the view is rebuilt from the same data"""
+    from datetime import datetime, timedelta, timezone
+
+    import flask
+    from firebase_functions import https_fn
+    from werkzeug.test import EnvironBuilder
+
+    import main
+    from live_scores import ApiSportsScoreCache
+    from odds_snapshot import OddsSnapshotStore
+
+    starts = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat().replace('+00:00', 'Z')
+    odds = {'basketball_nba': [
+        {'id': 'g1', 'home_team': 'Utah Jazz', 'away_team': 'Orlando Magic', 'commence_time': starts},
+        {'id': 'g2', 'home_team': 'Miami Heat', 'away_team': 'Denver Nuggets', 'commence_time': starts}
+    ]}
+    scores = {'basketball_nba': [{
+        'id': 7, 'teams': {'home': {'name': 'Utah Jazz'}, 'away': {'name': 'Orlando Magic'}},
+        'status': {'long': 'In Progress', 'short': 'Q2', 'timer': '5:00'},
+        'scores': {'home': {'total': 40}, 'away': {'total': 38}}
+    }]}
+
+    def fresh_caches():
+        # Empty caches force the next request to rebuild the view from upstream
+        monkeypatch.setattr(main, 'api_cache', ResponseCache())
+        if upstream == 'live':
+            monkeypatch.setattr(main, 'odds_snapshots', OddsSnapshotStore(lambda sport: odds.get(sport, []), 60000))
+            monkeypatch.setattr(main, 'apisports_scores', ApiSportsScoreCache(
+                lambda sport, season: scores.get(sport, []), 60000))
+        else:
+            monkeypatch.setattr(main, 'odds_snapshots', OddsSnapshotStore(lambda sport: None, 60000))
+            monkeypatch.setattr(main, 'apisports_scores', ApiSportsScoreCache(lambda sport, season: None, 60000))
+
+    class LaterDatetime(datetime):
+        """The second build runs a little later, as it would in the next cache window"""
+        offset = timedelta(0)
+
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + cls.offset
+
+    monkeypatch.setattr(main, 'datetime', LaterDatetime)
+    monkeypatch.setattr(main, 'load_view', lambda key, build, max_age_ms: build())
+    monkeypatch.setattr(main, 'check_rate_limit', lambda *args, **kwargs: (True, {}))
+
+    with flask.Flask(__name__).test_request_context():
+        fresh_caches()
+        first = main.api_live_scores(https_fn.Request(EnvironBuilder(path='/').get_environ()))
+        assert first.status_code == 200
+        payload = json.loads(first.get_data())
+        assert payload['live_games'] and payload['starting_soon']
+
+        fresh_caches()
+        LaterDatetime.offset = timedelta(seconds=2)
+        request = https_fn.Request(EnvironBuilder(path='/', headers={'If-None-Match': first.headers['ETag']})
+                                   .get_environ())
+        revalidated = main.api_live_scores(request)
+
+    assert revalidated.status_code == 304
+    assert revalidated.get_data() == b''
+    assert revalidated.headers['ETag'] == first.headers['ETag']
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Cold-start import profile for functions/main.py
+Run directly for a per-module breakdown: python tests/test_import_time.py [top_n]
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'functions')
+
+# Loaded on first use by the endpoints that need them, never at import
+DEFERRED_MODULES = ('numpy', 'marshmallow', 'pytz', 'redis', 'request_schemas', 'request_validation')
+
+# Generous ceiling on main.py's own import work, excluding the Firebase Functions framework
+LOCAL_IMPORT_BUDGET_MS = float(os.getenv('LOCAL_IMPORT_BUDGET_MS', '250'))
+FRAMEWORK_PREFIXES = ('firebase_functions', 'firebase_admin', 'flask', 'werkzeug', 'google', 'jwt', 'requests')
+
+
+def profile_import(module='main'):
+    """Import module in a fresh interpreter under -X importtime
+
+    Returns a list of (name, self_us, cumulative_us, depth) in import order.
+    """
+    env = {**os.environ, 'ODDS_API_KEY': os.environ.get('ODDS_API_KEY', 'profile')}
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=FUNCTIONS_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def local_import_ms(rows, module='main'):
+    """Time spent importing module minus top-level framework imports it triggers"""
+    total = next(cumulative for name, _, cumulative, _ in rows if name == module)
+    top_depth = next(depth for name, _, _, depth in rows if name == module) + 1
+    framework = sum(cumulative for name, _, cumulative, depth in rows
+                    if depth == top_depth and name.split('.')[0].startswith(FRAMEWORK_PREFIXES))
+    return (total - framework) / 1000
+
+
+@pytest.fixture(scope='module')
+def main_profile():
+    pytest.importorskip('firebase_functions')
+    return profile_import('main')
+
+
+def test_heavy_modules_are_deferred(main_profile):
+    """Importing main must not load modules only some endpoints use"""
+    loaded = {name for name, _, _, _ in main_profile}
+    assert not loaded.intersection(DEFERRED_MODULES)
+
+
+def test_local_import_time_within_budget(main_profile):
+    """main.py's own import work stays within the cold-start budget"""
+    assert local_import_ms(main_profile) < LOCAL_IMPORT_BUDGET_MS
+
+
+def print_breakdown(top_n=25):
+    rows = profile_import('main')
+    print(f"{'self ms':>9} {'cumulative ms':>14}  module")
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda row: row[2], reverse=True)[:top_n]:
+        print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:14.1f}  {'  ' * depth}{name}")
+    print(f"main.py excluding framework imports: {local_import_ms(rows):.1f} ms")
+
+
+if __name__ == '__main__':
+    print_breakdown(int(sys.argv[1]) if len(sys.argv) > 1 else 25)
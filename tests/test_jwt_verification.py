@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Unit tests for verify_jwt_token and Firebase ID token checks with the token caches
+"""
+
+import threading
+import time
+
+import jwt
+
+import main
+
+
+class FakeRequest:
+    def __init__(self, token):
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+
+def make_token(secret, **overrides):
+    now = int(time.time())
+    claims = {'sub': 'user-1', 'iat': now, 'exp': now + 3600, 'iss': main.JWT_ISSUER, 'aud': main.JWT_AUDIENCE}
+    claims.update(overrides)
+    return jwt.encode(claims, secret, algorithm='HS256')
+
+
+def test_verified_tokens_are_cached(monkeypatch):
+    """A valid token is decoded once; repeats are served from the cache"""
+    monkeypatch.setattr(main, 'JWT_SECRET_KEY', 'test-secret-key-with-enough-length-for-hs256')
+    monkeypatch.setattr(main, 'jwt_token_cache', main.VerifiedTokenCache())
+    token = make_token(main.JWT_SECRET_KEY)
+
+    assert main.verify_jwt_token(FakeRequest(token)) == ('user-1', None)
+    assert main.verify_jwt_token(FakeRequest(token)) == ('user-1', None)
+    assert main.jwt_token_cache.get_stats()['hits'] == 1
+
+
+def test_invalid_tokens_keep_specific_errors(monkeypatch):
+    """Rejections are not cached and still report why they failed"""
+    monkeypatch.setattr(main, 'JWT_SECRET_KEY', 'test-secret-key-with-enough-length-for-hs256')
+    monkeypatch.setattr(main, 'jwt_token_cache', main.VerifiedTokenCache())
+
+    expired = make_token(main.JWT_SECRET_KEY, exp=int(time.time()) - 10)
+    assert main.verify_jwt_token(FakeRequest(expired)) == (None, 'Token expired')
+
+    wrong_audience = make_token(main.JWT_SECRET_KEY, aud='someone-else')
+    assert main.verify_jwt_token(FakeRequest(wrong_audience)) == (None, 'Invalid token audience')
+
+    forged = make_token('a-different-secret-key-with-enough-length')
+    assert main.verify_jwt_token(FakeRequest(forged)) == (None, 'Invalid token')
+    assert len(main.jwt_token_cache) == 0
+
+
+def test_cache_honors_24_hour_token_age_limit(monkeypatch):
+    """Cached entries expire when the token reaches its maximum age, even before exp"""
+    monkeypatch.setattr(main, 'JWT_SECRET_KEY', 'test-secret-key-with-enough-length-for-hs256')
+    monkeypatch.setattr(main, 'jwt_token_cache', main.VerifiedTokenCache(max_ttl_ms=10 ** 9))
+    now = int(time.time())
+    token = make_token(main.JWT_SECRET_KEY, iat=now - main.JWT_MAX_AGE_SECONDS + 60, exp=now + 86400)
+
+    assert main.verify_jwt_token(FakeRequest(token)) == ('user-1', None)
+    hit, _ = main.jwt_token_cache.lookup(token, now=(now + 61) * 1000)
+    assert not hit
+
+
+def test_concurrent_firebase_app_init_creates_one_app(monkeypatch):
+    """The key refresher and a request thread racing on a cold instance share one initialize_app"""
+    calls = []
+
+    def slow_initialize_app():
+        calls.append(1)
+        time.sleep(0.05)
+        if len(calls) > 1:
+            raise ValueError('The default Firebase app already exists')
+        return object()
+
+    monkeypatch.setattr(main, 'firebase_app', None)
+    monkeypatch.setattr(main, 'initialize_app', slow_initialize_app)
+    apps = []
+    threads = [threading.Thread(target=lambda: apps.append(main.get_firebase_app())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(apps) == 4 and all(app is apps[0] for app in apps)
+
+
+def test_only_token_rejections_are_negatively_cached(monkeypatch):
+    """An SDK or setup error fails the request without locking the token out"""
+    monkeypatch.setattr(main, 'firebase_token_cache', main.VerifiedTokenCache())
+    monkeypatch.setattr(main.firebase_key_refresher, 'maybe_refresh', lambda: False)
+    monkeypatch.setattr(main, 'get_firebase_app', lambda: None)
+    errors = [ValueError('The default Firebase app already exists')]
+
+    def verify_id_token(token, app=None):
+        if errors:
+            raise errors.pop()
+        return {'uid': 'u1', 'exp': time.time() + 3600}
+
+    monkeypatch.setattr(main.auth, 'verify_id_token', verify_id_token)
+    assert main.require_firebase_user(FakeRequest('firebase-token')) is None
+    assert main.require_firebase_user(FakeRequest('firebase-token'))['uid'] == 'u1'
+    assert main.firebase_token_cache.get_stats()['negative_hits'] == 0
+
+    errors.append(main.auth.InvalidIdTokenError('bad signature'))
+    assert main.require_firebase_user(FakeRequest('forged-token')) is None
+    assert main.require_firebase_user(FakeRequest('forged-token')) is None
+    assert main.firebase_token_cache.get_stats()['negative_hits'] == 1
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the per-snapshot best-line index
+"""
+
+import pytest
+
+import line_index
+from line_index import best_lines, build_line_index, snapshot_line_index
+from odds_normalization import normalized_snapshot_games
+from odds_payload import make_payload
+from odds_snapshot import OddsSnapshot, OddsSnapshotStore
+
+
+def without_consensus(best):
+    return {market: {side: {key: value for key, value in line.items() if key not in ('consensus', 'books')}
+                     for side, line in sides.items()}
+            for market, sides in best.items()}
+
+
+def test_best_line_per_market_and_side():
+    """Highest price wins moneylines; spreads and totals prefer the better number, then price"""
+    sportsbooks = {
+        'draftkings': {
+            'moneyline': {'home': -120, 'away': 100},
+            'spread': {'home': {'point': -3.5, 'price': -105}, 'away': {'point': 3.5, 'price': -115}},
+            'total': {'over': {'point': 47.5, 'price': -110}, 'under': {'point': 47.5, 'price': -110}}
+        },
+        'fanduel': {
+            'moneyline': {'home': -115, 'away': -105},
+            'spread': {'home': {'point': -3.0, 'price': -120}, 'away': {'point': 3.5, 'price': -110}},
+            'total': {'over': {'point': 47.0, 'price': -115}, 'under': {'point': 48.0, 'price': -120}}
+        },
+        'betmgm': {'moneyline': {'home': -115}}
+    }
+    best = without_consensus(best_lines(sportsbooks))
+    assert best['moneyline'] == {'home': {'price': -115, 'book': 'fanduel'}, 'away': {'price': 100, 'book': 'draftkings'}}
+    assert best['spread']['home'] == {'point': -3.0, 'price': -120, 'book': 'fanduel'}
+    assert best['spread']['away'] == {'point': 3.5, 'price': -110, 'book': 'fanduel'}
+    assert best['total']['over'] == {'point': 47.0, 'price': -115, 'book': 'fanduel'}
+    assert best['total']['under'] == {'point': 48.0, 'price': -120, 'book': 'fanduel'}
+
+
+def test_index_is_built_once_per_snapshot():
+    """Games and the index are memoized on the snapshot object"""
+    snapshot = OddsSnapshot('americanfootball_nfl', make_payload(games=5), 0)
+    index = snapshot_line_index(snapshot)
+    assert index is snapshot_line_index(snapshot)
+    assert normalized_snapshot_games(snapshot) is normalized_snapshot_games(snapshot)
+    assert set(index) == {game['id'] for game in snapshot.games}
+
+    game = normalized_snapshot_games(snapshot)[0]
+    assert set(game['sportsbooks']['draftkings']) == {'moneyline', 'spread', 'total'}
+    assert index[game['id']] == best_lines(game['sportsbooks'])
+
+
+def test_consensus_is_the_median_line_and_payout():
+    """Consensus takes the median point and the median payout, so -105 and +105 meet at even money"""
+    sportsbooks = {
+        'draftkings': {'moneyline': {'home': -105}, 'total': {'over': {'point': 47.5, 'price': -110}}},
+        'fanduel': {'moneyline': {'home': 105}, 'total': {'over': {'point': 48.5, 'price': -110}}},
+        'betmgm': {'total': {'over': {'point': 47.0, 'price': -120}}}
+    }
+    best = best_lines(sportsbooks)
+    assert best['moneyline']['home'] == {'price': 105, 'book': 'fanduel', 'consensus': {'price': 100}, 'books': 2}
+    assert best['total']['over'] == {'point': 47.0, 'price': -120, 'book': 'betmgm',
+                                     'consensus': {'point': 47.5, 'price': -110}, 'books': 3}
+
+
+def test_vectorized_index_matches_per_game_reduction(monkeypatch):
+    """The numpy build and the pure-Python fallback produce the same index"""
+    pytest.importorskip('numpy')
+    games = normalized_snapshot_games(OddsSnapshot('americanfootball_nfl', make_payload(games=60, seed=3), 0))
+    games = games + [{'id': 'no-books', 'sportsbooks': {}}]
+
+    vectorized = build_line_index(games)
+    monkeypatch.setattr(line_index, 'NUMPY_AVAILABLE', False)
+    assert vectorized == build_line_index(games)
+    assert 'no-books' not in vectorized
+
+
+def test_index_is_built_only_by_the_odds_comparison_view(monkeypatch):
+    """Fetching a snapshot for other views leaves the index unbuilt; the odds view builds it once"""
+    import main
+
+    store = OddsSnapshotStore(lambda sport: make_payload(games=3), ttl_ms=60000)
+    monkeypatch.setattr(main, 'odds_snapshots', store)
+    snapshot = store.get('americanfootball_nfl')
+    assert snapshot not in line_index._indexes
+
+    view = main.build_odds_comparison_view('americanfootball_nfl')
+    assert snapshot in line_index._indexes
+    assert view['games'][0]['best_lines'] == snapshot_line_index(snapshot)[view['games'][0]['id']]
+
+
+def test_invalid_prices_are_left_out_of_the_index():
+    """Prices that are not American odds (0, inside -100..+100, missing) never reach the consensus"""
+    games = [{'id': 'g1', 'sportsbooks': {
+        'draftkings': {'moneyline': {'home': 0, 'away': 120}},
+        'fanduel': {'moneyline': {'home': 50, 'away': 110},
+                    'spread': {'home': {'point': -3.5, 'price': None}}},
+        'betmgm': {'moneyline': {'home': -130}}
+    }}]
+    expected = {'moneyline': {'home': {'price': -130, 'book': 'betmgm', 'consensus': {'price': -130}, 'books': 1},
+                              'away': {'price': 120, 'book': 'draftkings', 'consensus': {'price': 115}, 'books': 2}}}
+    assert best_lines(games[0]['sportsbooks']) == expected
+    assert build_line_index(games) == {'g1': expected}
+
+
+def test_demo_games_have_valid_prices():
+    """Demo fallback odds are always valid American odds"""
+    import main
+    from parlay_pricing import is_valid_american_odds
+
+    prices = [outcome['price'] for _ in range(50) for game in main.generate_demo_games('basketball_nba')
+              for outcome in game['bookmakers'][0]['markets'][0]['outcomes']]
+    assert all(is_valid_american_odds(price) for price in prices)
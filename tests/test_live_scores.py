@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Unit tests for memoized API-Sports live score lookups
+Verifies per-request and TTL memoization, the team registry and the team-name index
+"""
+
+from live_scores import ApiSportsScoreCache, LiveScoreIndex, LiveScoreSession
+from team_registry import TeamRegistry, team_registry
+
+
+def score_game(home, away, game_id, date=None):
+    return {'id': game_id, 'date': date, 'teams': {'home': {'name': home}, 'away': {'name': away}}}
+
+
+def test_registry_resolves_aliases():
+    """Abbreviations, short city names and accents resolve to one canonical name"""
+    assert team_registry.canonicalize('basketball_nba', 'LA Lakers') == 'Los Angeles Lakers'
+    assert team_registry.canonicalize('basketball_nba', 'L.A. Lakers') == 'Los Angeles Lakers'
+    assert team_registry.canonicalize('icehockey_nhl', 'Montréal Canadiens') == 'Montreal Canadiens'
+    assert team_registry.canonicalize('icehockey_nhl', 'St Louis Blues') == 'St. Louis Blues'
+    assert team_registry.canonicalize('baseball_mlb', 'Oakland Athletics') == 'Athletics'
+    assert team_registry.canonicalize('basketball_nba', 'Los Angeles Kings') is None
+    assert team_registry.team_key('mma_mixed_martial_arts', 'Jon Jones') == 'jon jones'
+
+
+def test_registry_rejects_conflicting_aliases():
+    """An alias may only point at one team per sport"""
+    try:
+        TeamRegistry({'sport': {'Team A': ('Alias',), 'Team B': ('Alias',)}})
+    except ValueError:
+        return
+    assert False, 'conflicting alias should raise'
+
+
+def test_index_matches_across_name_variants():
+    """Odds API and API-Sports spellings of the same teams match"""
+    index = LiveScoreIndex('basketball_nba', [
+        score_game('Los Angeles Clippers', 'Boston Celtics', 1),
+        score_game('Philadelphia 76ers', 'Chicago Bulls', 2),
+    ])
+
+    assert index.match('LA Clippers', 'Boston Celtics')['id'] == 1
+    assert index.match('Sixers', 'Chicago Bulls')['id'] == 2
+    assert index.match('Los Angeles Lakers', 'Boston Celtics') is None
+    assert index.match('Chicago Bulls', 'Philadelphia 76ers') is None
+
+
+def test_index_picks_meeting_closest_to_commence_time():
+    """Repeated matchups resolve deterministically by start time"""
+    index = LiveScoreIndex('basketball_nba', [
+        score_game('Miami Heat', 'Denver Nuggets', 'early', '2024-11-01T19:30:00-04:00'),
+        score_game('Miami Heat', 'Denver Nuggets', 'late', '2025-02-10T19:30:00-05:00'),
+    ])
+
+    assert index.match('Miami Heat', 'Denver Nuggets', '2025-02-11T00:30:00Z')['id'] == 'late'
+    assert index.match('Miami Heat', 'Denver Nuggets')['id'] == 'early'
+
+
+def test_session_fetches_each_sport_once_and_records_match_rate():
+    """A request resolves each sport once, even when the fetch fails"""
+    calls = []
+
+    def fetcher(sport_key, season):
+        calls.append((sport_key, season))
+        return None if sport_key == 'icehockey_nhl' else [score_game('Utah Jazz', 'Orlando Magic', 1)]
+
+    cache = ApiSportsScoreCache(fetcher, ttl_ms=60000)
+    session = LiveScoreSession(cache, '2024')
+
+    for _ in range(10):
+        session.match('basketball_nba', 'Utah Jazz', 'Orlando Magic')
+        session.match('basketball_nba', 'Utah Jazz', 'Miami Heat')
+        session.match('icehockey_nhl', 'Utah Mammoth', 'Boston Bruins')
+
+    assert calls == [('basketball_nba', '2024'), ('icehockey_nhl', '2024')]
+    assert cache.match_metrics.snapshot()['basketball_nba'] == {'attempts': 20, 'matched': 10, 'match_rate': 0.5}
+
+    # A later request reuses the TTL-cached index
+    LiveScoreSession(cache, '2024').match('basketball_nba', 'Utah Jazz', 'Orlando Magic')
+    assert cache.stats['hits'] == 1
+
+
+def test_session_serves_prefetched_indexes_without_fetching():
+    """Sports resolved by a prefetch, including failed ones, are never fetched on the request path"""
+    calls = []
+    cache = ApiSportsScoreCache(lambda sport_key, season: calls.append(sport_key) or [], ttl_ms=60000)
+    index = LiveScoreIndex('basketball_nba', [score_game('Utah Jazz', 'Orlando Magic', 1)])
+    session = LiveScoreSession(cache, '2024', {'basketball_nba': index, 'icehockey_nhl': None})
+
+    assert session.match('basketball_nba', 'Utah Jazz', 'Orlando Magic')['id'] == 1
+    assert session.match('icehockey_nhl', 'Utah Mammoth', 'Boston Bruins') is None
+    assert calls == []
+
+
+def test_live_scores_view_fetches_odds_and_scores_in_one_round_trip(monkeypatch):
+    """Every upstream call for the view runs in one concurrent fan-out"""
+    import time
+
+    import main
+    from odds_snapshot import OddsSnapshotStore
+
+    def slow_odds(sport_key):
+        time.sleep(0.3)
+        return []
+
+    def slow_scores(sport_key, season):
+        time.sleep(0.3)
+        return []
+
+    monkeypatch.setattr(main, 'odds_snapshots', OddsSnapshotStore(slow_odds, ttl_ms=60000))
+    monkeypatch.setattr(main, 'apisports_scores', ApiSportsScoreCache(slow_scores, ttl_ms=60000))
+
+    started = time.perf_counter()
+    snapshots, session = main.fetch_sports_data(['americanfootball_nfl', 'basketball_nba', 'baseball_mlb',
+                                                 'basketball_wnba', 'icehockey_nhl'])
+    for sport_key in main.APISPORTS_ENDPOINTS:
+        session.match(sport_key, 'Utah Jazz', 'Orlando Magic')
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.9
+    assert main.apisports_scores.stats['fetches'] == len(main.APISPORTS_ENDPOINTS)
+    assert all(snapshot is not None for snapshot in snapshots.values())
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Unit tests for single-pass bookmaker normalization
+"""
+
+from odds_normalization import ALL_MARKETS, SUPPORTED_BOOKS, normalize_bookmakers, normalize_game
+from odds_payload import make_payload
+
+
+def legacy_moneylines(game, books=SUPPORTED_BOOKS):
+    """The conversion loop normalize_bookmakers replaced"""
+    sportsbooks = {}
+    for bookmaker in game.get('bookmakers', []):
+        book_key = bookmaker.get('key')
+        if books is None or book_key in books:
+            for market in bookmaker.get('markets', []):
+                if market.get('key') == 'h2h':
+                    moneyline = {}
+                    for outcome in market.get('outcomes', []):
+                        if outcome.get('name') == game.get('home_team'):
+                            moneyline['home'] = outcome.get('price')
+                        elif outcome.get('name') == game.get('away_team'):
+                            moneyline['away'] = outcome.get('price')
+                    if moneyline:
+                        sportsbooks[book_key] = {'moneyline': moneyline}
+    return sportsbooks
+
+
+def test_moneyline_output_matches_previous_conversion():
+    """The default h2h-only output is identical to the old loop, with and without the book filter"""
+    for game in make_payload(games=20):
+        assert normalize_game(game)['sportsbooks'] == legacy_moneylines(game)
+        assert normalize_game(game, books=None)['sportsbooks'] == legacy_moneylines(game, books=None)
+    assert list(normalize_game(game)['sportsbooks']) == ['draftkings', 'fanduel', 'betmgm', 'caesars', 'betrivers']
+
+
+def test_spreads_and_totals_in_the_same_pass():
+    """Spreads are keyed by side and totals by over/under, each with point and price"""
+    bookmakers = [
+        {'key': 'fanduel', 'markets': [
+            {'key': 'spreads', 'outcomes': [{'name': 'Home', 'price': -110, 'point': -3.5},
+                                            {'name': 'Away', 'price': -110, 'point': 3.5}]},
+            {'key': 'totals', 'outcomes': [{'name': 'Over', 'price': -105, 'point': 47.5},
+                                           {'name': 'Under', 'price': -115, 'point': 47.5}]},
+            {'key': 'h2h_lay', 'outcomes': [{'name': 'Home', 'price': 1.5}]}
+        ]},
+        {'key': 'betmgm', 'markets': [{'key': 'h2h', 'outcomes': [{'name': 'Draw', 'price': 250}]}]},
+    ]
+    lines = normalize_bookmakers(bookmakers, 'Home', 'Away', markets=ALL_MARKETS)
+    assert lines == {'fanduel': {
+        'spread': {'home': {'point': -3.5, 'price': -110}, 'away': {'point': 3.5, 'price': -110}},
+        'total': {'over': {'point': 47.5, 'price': -105}, 'under': {'point': 47.5, 'price': -115}}
+    }}
+    assert normalize_bookmakers(bookmakers, 'Home', 'Away') == {}
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared odds snapshot store
+Verifies that one upstream fetch per sport feeds every caller within the TTL
+"""
+
+from odds_snapshot import OddsSnapshotStore
+
+
+def make_fetcher(result):
+    calls = []
+
+    def fetcher(sport):
+        calls.append(sport)
+        return result
+    return fetcher, calls
+
+
+def test_snapshot_fetched_once_per_ttl():
+    """Repeated gets for the same sport reuse the snapshot"""
+    fetcher, calls = make_fetcher([{'id': 'g1'}])
+    store = OddsSnapshotStore(fetcher, ttl_ms=60000)
+
+    first = store.get('basketball_nba')
+    second = store.get('basketball_nba')
+
+    assert first is second
+    assert calls == ['basketball_nba']
+    assert store.stats['hits'] == 1
+
+
+def test_snapshot_refetched_after_expiry():
+    """Expired snapshots trigger a new upstream fetch"""
+    fetcher, calls = make_fetcher([])
+    store = OddsSnapshotStore(fetcher, ttl_ms=0)
+
+    store.get('americanfootball_nfl')
+    store.get('americanfootball_nfl')
+
+    assert len(calls) == 2
+
+
+def test_failed_fetch_is_not_cached():
+    """A failed fetch returns None and is retried on the next call"""
+    fetcher, calls = make_fetcher(None)
+    store = OddsSnapshotStore(fetcher, ttl_ms=60000)
+
+    assert store.get('baseball_mlb') is None
+    assert store.get('baseball_mlb') is None
+    assert len(calls) == 2
+    assert store.stats['failures'] == 2
+
+
+def test_get_many_fetches_concurrently_with_partial_results():
+    """Multi-sport fan-out runs in parallel and reports per-sport failures"""
+    import time
+
+    def fetcher(sport):
+        time.sleep(0.2)
+        return None if sport == 'icehockey_nhl' else [{'id': sport}]
+
+    store = OddsSnapshotStore(fetcher, ttl_ms=60000)
+    sports = ['americanfootball_nfl', 'basketball_nba', 'baseball_mlb', 'icehockey_nhl']
+
+    started = time.time()
+    results = store.get_many(sports, deadline_seconds=5)
+    elapsed = time.time() - started
+
+    assert elapsed < 0.6
+    assert results['basketball_nba'].games == [{'id': 'basketball_nba'}]
+    assert results['icehockey_nhl'] is None
+
+
+def test_get_many_honours_deadline():
+    """Sports that miss the deadline come back as None without blocking"""
+    import time
+
+    def fetcher(sport):
+        time.sleep(1.0 if sport == 'slow' else 0)
+        return [{'id': sport}]
+
+    store = OddsSnapshotStore(fetcher, ttl_ms=60000)
+
+    started = time.time()
+    results = store.get_many(['fast', 'slow'], deadline_seconds=0.3)
+
+    assert time.time() - started < 0.8
+    assert results['fast'] is not None
+    assert results['slow'] is None
+
+
+def test_concurrent_gets_share_one_upstream_fetch():
+    """Endpoints missing the same sport at once trigger a single fetch"""
+    import threading
+    import time
+
+    calls = []
+
+    def fetcher(sport):
+        calls.append(sport)
+        time.sleep(0.2)
+        return [{'id': sport}]
+
+    store = OddsSnapshotStore(fetcher, ttl_ms=60000)
+    threads = [threading.Thread(target=store.get, args=('basketball_nba',)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ['basketball_nba']
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the parlay pricing engine
+"""
+
+import math
+
+import pytest
+
+import parlay_pricing
+from parlay_pricing import american_to_decimal, american_to_implied, price_parlay, price_parlays
+
+
+def test_american_odds_conversion():
+    """Positive and negative American odds map to decimal odds and implied probability"""
+    assert american_to_decimal(150) == 2.5
+    assert american_to_decimal(-200) == 1.5
+    assert american_to_decimal(100) == american_to_decimal(-100) == 2.0
+    assert math.isclose(american_to_implied(-110), 110 / 210)
+    assert list(american_to_decimal([150, -200])) == [2.5, 1.5]
+
+
+def test_parlay_payout_and_vig_removal():
+    """Payout multiplies decimal odds; a reference price removes that market's vig"""
+    priced = price_parlay([
+        {'odds': -110, 'opposing_odds': -110},
+        {'odds': 150, 'opposing_odds': -170}
+    ], 100)
+
+    assert priced['decimal_odds'] == pytest.approx((1 + 100 / 110) * 2.5, abs=1e-4)
+    assert priced['potential_payout'] == pytest.approx(100 * (1 + 100 / 110) * 2.5, abs=0.01)
+    assert priced['legs'][0]['fair_probability'] == 0.5
+
+    underdog_implied = 1 / 2.5
+    favourite_implied = 170 / 270
+    assert priced['legs'][1]['fair_probability'] == pytest.approx(
+        underdog_implied / (underdog_implied + favourite_implied), abs=1e-4
+    )
+    expected_value = priced['fair_probability'] * priced['potential_payout'] - 100
+    assert priced['expected_value'] == pytest.approx(expected_value, abs=0.01)
+    assert priced['house_edge_pct'] > 0
+
+
+def test_batch_matches_single_and_python_fallback(monkeypatch):
+    """Batched NumPy pricing matches per-parlay and pure-Python results"""
+    parlays = [
+        [{'odds': -110}],
+        [{'odds': 200}, {'odds': -150, 'opposing_odds': 130}, {'odds': -105}],
+        [{'odds': 120, 'opposing_odds': -140}] * 12
+    ]
+    stakes = [10, 25.5, 1]
+    batched = price_parlays(parlays, stakes)
+    assert batched == [price_parlay(legs, stake) for legs, stake in zip(parlays, stakes)]
+
+    monkeypatch.setattr(parlay_pricing, 'NUMPY_AVAILABLE', False)
+    assert price_parlays(parlays, stakes) == batched
+
+
+def test_invalid_odds_rejected():
+    """Odds strictly between -100 and +100 are not valid American odds"""
+    with pytest.raises(ValueError):
+        price_parlay([{'odds': 50}], 10)
+    with pytest.raises(ValueError):
+        price_parlay([{'odds': -110, 'opposing_odds': 0}], 10)
+    with pytest.raises(ValueError):
+        price_parlays([[]], [10])
+
+
+def test_evaluate_parlay_is_deterministic():
+    """The api_evaluate scoring uses the priced legs, not random draws"""
+    import main
+
+    bets = [{'team': 'Lakers', 'bet_type': 'moneyline', 'odds': -150, 'opposing_odds': 130},
+            {'team': 'Chiefs', 'bet_type': 'spread', 'odds': -110}]
+    first = main.evaluate_parlay(bets, 50)
+    assert first == main.evaluate_parlay(bets, 50)
+    assert first['parlay_analysis']['potential_payout'] == price_parlay(bets, 50)['potential_payout']
+    assert first['individual_bets'][0]['confidence_score'] == 0.58
+
+
+def test_batch_evaluation_keeps_order_and_reports_item_errors():
+    """Valid parlays are evaluated together; invalid ones report their own field errors"""
+    import main
+
+    valid = {'bets': [{'team': 'Lakers', 'bet_type': 'moneyline', 'odds': -150}], 'total_amount': 20}
+    items = [
+        valid,
+        {'bets': [{'team': 'Lakers', 'bet_type': 'moneyline', 'odds': 50}], 'total_amount': 20},
+        'not a parlay',
+        {**valid, 'total_amount': 40}
+    ]
+    response = main.evaluate_parlay_batch(items)
+
+    assert (response['batch_size'], response['evaluated'], response['failed']) == (4, 2, 2)
+    assert [result['index'] for result in response['results']] == [0, 1, 2, 3]
+    assert response['results'][0] == {'index': 0, **main.evaluate_parlay(valid['bets'], 20)}
+    assert response['results'][1]['success'] is False
+    assert 'odds' in response['results'][1]['details']['bets'][0]
+    assert response['results'][3]['parlay_analysis']['potential_payout'] == price_parlay(valid['bets'], 40)['potential_payout']
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Unit tests for correlated-leg detection and Monte Carlo parlay simulation
+"""
+
+import pytest
+
+from odds_snapshot import OddsSnapshot
+from parlay_simulation import (
+    OPPOSING_SIDE_CORRELATION, SAME_SIDE_CORRELATION, find_correlated_legs, game_index_for, resolve_leg_games,
+    simulate_joint_probability
+)
+
+GAMES = [
+    {'id': 'g2', 'home_team': 'Los Angeles Lakers', 'away_team': 'Miami Heat',
+     'commence_time': '2030-01-03T00:00:00Z'},
+    {'id': 'g1', 'home_team': 'Los Angeles Lakers', 'away_team': 'Boston Celtics',
+     'commence_time': '2030-01-01T00:00:00Z'},
+]
+
+
+def make_snapshot():
+    return OddsSnapshot('basketball_nba', GAMES, 0)
+
+
+def test_legs_resolve_to_games_and_pairs_are_classified():
+    """Team names resolve to the team's next game; game_id pins a leg to a specific game"""
+    snapshot = make_snapshot()
+    legs = [
+        {'team': 'Lakers', 'bet_type': 'moneyline', 'odds': -150},
+        {'team': 'Boston Celtics', 'bet_type': 'spread', 'odds': -110},
+        {'team': 'Over 221.5', 'bet_type': 'total', 'odds': -110, 'game_id': 'g1'},
+        {'team': 'Los Angeles Lakers', 'bet_type': 'moneyline', 'odds': -120, 'game_id': 'g2'},
+        {'team': 'Unknown Club', 'bet_type': 'moneyline', 'odds': 120},
+    ]
+    resolved = resolve_leg_games(legs, [snapshot])
+    assert [game and game['game_id'] for game in resolved] == ['g1', 'g1', 'g1', 'g2', None]
+    assert game_index_for(snapshot) is game_index_for(snapshot)
+
+    pairs = {tuple(pair['legs']): pair for pair in find_correlated_legs(legs, resolved)}
+    assert pairs[(0, 1)]['correlation'] == OPPOSING_SIDE_CORRELATION
+    assert pairs[(0, 2)]['relation'] == pairs[(1, 2)]['relation'] == 'side_and_total'
+    assert pairs[(0, 3)]['relation'] == 'same_team' and pairs[(0, 3)]['correlation'] == 0.0
+    assert all(4 not in key for key in pairs)
+
+
+def test_simulation_is_reproducible_and_tracks_correlation():
+    """A fixed seed repeats exactly; positive correlation raises the joint hit probability"""
+    pytest.importorskip('numpy')
+    probabilities = [0.6, 0.5]
+    pair = [{'legs': [0, 1], 'relation': 'same_side_same_game', 'correlation': SAME_SIDE_CORRELATION}]
+
+    independent = simulate_joint_probability(probabilities, [], trials=40000, seed=7, time_budget_ms=10000)
+    correlated = simulate_joint_probability(probabilities, pair, trials=40000, seed=7, time_budget_ms=10000)
+
+    assert independent['joint_probability'] == pytest.approx(0.3, abs=4 * independent['std_error'])
+    assert correlated['joint_probability'] > independent['joint_probability'] + 0.05
+    assert correlated == {**simulate_joint_probability(probabilities, pair, trials=40000, seed=7,
+                                                       time_budget_ms=10000),
+                          'elapsed_ms': correlated['elapsed_ms']}
+
+
+def test_simulation_stops_at_time_budget():
+    """An exhausted budget still runs one chunk and reports the shortfall"""
+    pytest.importorskip('numpy')
+    result = simulate_joint_probability([0.5] * 3, [], trials=200000, time_budget_ms=0)
+    assert result['truncated'] is True
+    assert 0 < result['trials'] < 200000
+
+
+def test_evaluate_parlay_reports_correlations_and_simulation():
+    """api_evaluate flags same-game legs from stored snapshots and prices them with the simulated probability"""
+    pytest.importorskip('numpy')
+    import main
+
+    main.odds_snapshots._snapshots['basketball_nba'] = make_snapshot()
+    try:
+        bets = [
+            {'team': 'Lakers', 'bet_type': 'moneyline', 'odds': -150, 'sport': 'nba'},
+            {'team': 'Los Angeles Lakers', 'bet_type': 'spread', 'odds': -110, 'game_id': 'g1'},
+        ]
+        plain = main.evaluate_parlay(bets, 20)
+        simulated = main.evaluate_parlay(bets, 20, {'trials': 20000, 'seed': 1})
+    finally:
+        main.odds_snapshots.invalidate('basketball_nba')
+
+    assert plain['parlay_analysis']['correlated_legs'][0]['bets'] == [1, 2]
+    assert plain['parlay_analysis']['correlation_impact'] == '0.2 point penalty'
+    assert 'simulation' not in plain
+    assert simulated['simulation']['available'] is True
+    assert simulated['simulation']['joint_probability'] > plain['parlay_analysis']['fair_probability']
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the precomputed view store and scheduled pipeline
+"""
+
+import json
+
+from precomputed_views import MemoryViewStore, PrecomputedViews
+from response_cache import ResponseCache, Serialized
+
+
+class FailingStore:
+    def get(self, key):
+        raise ConnectionError('store unreachable')
+
+    def put(self, key, record):
+        raise ConnectionError('store unreachable')
+
+
+def test_publish_and_load_until_ttl():
+    """A published view is served until its TTL, then treated as a miss"""
+    views = PrecomputedViews(MemoryViewStore, ttl_ms=1000)
+    assert views.publish('live_scores_all', {'success': True, 'live_games': []}, now=5000)
+
+    assert json.loads(views.load('live_scores_all', now=5999)['body']) == {'success': True, 'live_games': []}
+    assert views.load('live_scores_all', now=6000) is None
+    assert views.load('odds_basketball_nba', now=5000) is None
+    assert (views.stats['hits'], views.stats['expired'], views.stats['misses']) == (1, 1, 1)
+
+
+def test_pipeline_publishes_each_view_and_isolates_failures():
+    """One failing or empty builder does not stop the others"""
+    views = PrecomputedViews(MemoryViewStore)
+
+    def broken():
+        raise RuntimeError('upstream down')
+
+    summary = views.run({'odds_a': lambda: {'games': [1]}, 'odds_b': lambda: None, 'odds_c': broken})
+    assert summary['published'] == ['odds_a']
+    assert summary['failed'] == ['odds_b', 'odds_c']
+    assert json.loads(views.load('odds_a')['body']) == {'games': [1]}
+
+
+def test_store_errors_fall_back_to_building():
+    """An unreachable store never fails a request: load_view builds the view itself"""
+    import main
+
+    original = main.precomputed_views
+    main.precomputed_views = PrecomputedViews(FailingStore)
+    try:
+        assert main.precomputed_views.publish('odds_a', {'games': []}) is False
+        assert main.load_view('odds_a', lambda: {'built': True}, 60000) == {'built': True}
+
+        main.precomputed_views = PrecomputedViews(MemoryViewStore)
+        main.precomputed_views.publish('odds_a', {'published': True})
+        view = main.load_view('odds_a', lambda: {'built': True}, 60000)
+        assert isinstance(view, Serialized) and json.loads(view.body) == {'published': True}
+    finally:
+        main.precomputed_views = original
+
+
+def test_precompute_keys_match_endpoint_cache_keys():
+    """Published keys are the ones api_odds_comparison, api_all_games and api_live_scores read"""
+    import main
+
+    keys = set(main.precompute_builders())
+    assert 'live_scores_all' in keys
+    assert f'all_games_{main.DEFAULT_ALL_GAMES_PER_SPORT}_True' in keys
+    assert {f'odds_{sport}' for sport in main.PRECOMPUTE_SPORTS} <= keys
+
+
+def test_published_views_age_from_generation():
+    """A view older than the endpoint's TTL is rebuilt; a younger one is cached as stored, dated when generated"""
+    views = PrecomputedViews(MemoryViewStore, ttl_ms=240000)
+    views.publish('live_scores_all', {'live_games': ['g1']}, now=1000)
+    assert views.load('live_scores_all', max_age_ms=60000, now=61000) is None
+    record = views.load('live_scores_all', max_age_ms=60000, now=31000)
+
+    cache = ResponseCache()
+    entry = cache.set('live_scores_all', Serialized(record['body'], record['content_hash'], record['generated_at']),
+                      ttl=60000)
+    assert entry['timestamp'] == 1000
+    assert entry['body'] is record['body'] and entry['content_hash'] == record['content_hash']
+    assert cache.lookup('live_scores_all') == (None, None)
+
+
+def test_schedule_refreshes_views_before_readers_reject_them():
+    """Each view is republished strictly sooner than the max age its endpoint accepts"""
+    import main
+
+    assert main.PRECOMPUTE_INTERVAL_MINUTES * 60000 < min(main.ODDS_CACHE_DURATION, main.CACHE_DURATION)
+    assert main.LIVE_PRECOMPUTE_INTERVAL_SECONDS * 1000 < main.LIVE_CACHE_DURATION
+
+
+def test_live_scores_republished_within_each_scheduled_run(monkeypatch):
+    """Between scheduled runs live scores are republished on their own cadence, never past the next run"""
+    import main
+
+    now = [100.0]
+    monkeypatch.setattr(main, 'precomputed_views', PrecomputedViews(MemoryViewStore))
+    monkeypatch.setattr(main, 'build_live_scores_view', lambda: {'live_games': [], 'at': now[0]})
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    published = main.run_live_refreshes(100.0, sleep=sleep, clock=lambda: now[0])
+    interval = main.PRECOMPUTE_INTERVAL_MINUTES * 60
+    assert published == len(range(main.LIVE_PRECOMPUTE_INTERVAL_SECONDS, interval, main.LIVE_PRECOMPUTE_INTERVAL_SECONDS))
+    assert now[0] < 100.0 + interval
+    assert json.loads(main.precomputed_views.load('live_scores_all')['body'])['at'] == now[0]
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Unit tests for upstream quota accounting and adaptive TTLs
+"""
+
+from datetime import datetime, timezone
+
+from odds_snapshot import OddsSnapshot, OddsSnapshotStore
+from quota_governor import QuotaGovernor
+
+HOUR = 3600000
+# 2026-10-11 00:00 UTC: 21 days (504 hours) before the monthly reset on the 1st
+NOW = int(datetime(2026, 10, 11, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def make_governor(**kwargs):
+    return QuotaGovernor('the-odds-api', 'x-requests-remaining', 'x-requests-used', **kwargs)
+
+
+def record(governor, remaining, used, at):
+    governor.record({'x-requests-remaining': str(remaining), 'x-requests-used': str(used)}, now=at)
+
+
+def test_budget_and_reset_time():
+    """Remaining quota less the reserve is spread evenly until the reset"""
+    governor = make_governor(reserve_fraction=0.0)
+    assert governor.ttl_scale(NOW) == 1.0  # nothing observed yet
+
+    record(governor, 5040, 14960, NOW)
+    snapshot = governor.snapshot(NOW)
+    assert snapshot['remaining'] == 5040
+    assert snapshot['budget_per_hour'] == 10.0
+    assert snapshot['resets_at'].startswith('2026-11-01T00:00:00')
+
+
+def test_ttl_stretches_when_burning_too_fast():
+    """Burning above the sustainable pace lengthens TTLs, below it shortens them"""
+    governor = make_governor(reserve_fraction=0.0)
+    record(governor, 5040, 14960, NOW)
+    record(governor, 5000, 15000, NOW + HOUR)  # 40/hour against a ~10/hour budget
+
+    scale = governor.ttl_scale(NOW + HOUR)
+    assert 3.9 < scale < 4.1
+    assert governor.ttl_for(120000, next_start_ms=NOW + HOUR, now=NOW + HOUR) == int(120000 * scale)
+
+    slow = make_governor(reserve_fraction=0.0)
+    record(slow, 5040, 14960, NOW)
+    record(slow, 5039, 14961, NOW + HOUR)
+    assert slow.ttl_scale(NOW + HOUR) == slow.min_scale
+
+
+def test_exhausted_quota_and_idle_sports_poll_least():
+    """An empty budget maxes the TTL; sports with nothing soon use the idle multiplier"""
+    governor = make_governor(reserve_fraction=0.05, idle_horizon_hours=6, idle_scale=10)
+    record(governor, 500, 19500, NOW)
+    assert governor.ttl_scale(NOW) == governor.max_scale
+
+    fresh = make_governor(idle_horizon_hours=6, idle_scale=10)
+    assert fresh.ttl_for(120000, next_start_ms=NOW + 2 * HOUR, now=NOW) == 120000
+    assert fresh.ttl_for(120000, next_start_ms=NOW + 12 * HOUR, now=NOW) == 1200000
+    assert fresh.ttl_for(120000, next_start_ms=None, now=NOW) == 1200000
+
+
+def test_quota_reset_is_not_counted_as_spend():
+    """A jump back up in remaining quota does not register as consumption"""
+    governor = make_governor(period='day')
+    governor.record({'x-requests-remaining': '3'}, now=NOW)
+    governor.record({'x-requests-remaining': '100'}, now=NOW + HOUR)
+    assert governor.snapshot(NOW + HOUR)['burn_per_hour'] == 0.0
+
+
+def test_snapshot_store_uses_dynamic_ttl():
+    """The snapshot store asks ttl_for on every lookup"""
+    calls = []
+    ttl = {'value': 60000}
+
+    def fetcher(sport):
+        calls.append(sport)
+        return [{'id': 'g1', 'commence_time': '2026-10-11T18:00:00Z'}]
+
+    store = OddsSnapshotStore(fetcher, ttl_ms=60000, ttl_for=lambda snapshot: ttl['value'])
+    store.get('basketball_nba')
+    store.get('basketball_nba')
+    assert len(calls) == 1
+
+    ttl['value'] = 0
+    store.get('basketball_nba')
+    assert len(calls) == 2
+
+    snapshot = OddsSnapshot('basketball_nba', fetcher('x'), NOW)
+    assert snapshot.next_start() == int(datetime(2026, 10, 11, 18, tzinfo=timezone.utc).timestamp() * 1000)
+    assert OddsSnapshot('basketball_nba', [], NOW).next_start() is None
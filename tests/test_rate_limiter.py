@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the sliding-window rate limiter
+"""
+
+from rate_limiter import RedisRateLimiter, SlidingWindowRateLimiter
+
+WINDOW = 60000
+
+
+def test_limit_enforced_within_window():
+    """Requests beyond the limit in one window are rejected with a retry hint"""
+    limiter = SlidingWindowRateLimiter(window_ms=WINDOW)
+    start = 10 * WINDOW
+    results = [limiter.hit('ip:1', 3, now=start + i) for i in range(4)]
+    assert [r['allowed'] for r in results] == [True, True, True, False]
+    assert results[2]['remaining'] == 0
+    assert results[3]['retry_after'] >= 1
+    # Other keys have their own budget
+    assert limiter.hit('ip:2', 3, now=start)['allowed']
+
+
+def test_previous_window_is_weighted_by_overlap():
+    """Counts from the previous window decay linearly instead of resetting"""
+    limiter = SlidingWindowRateLimiter(window_ms=WINDOW)
+    start = 10 * WINDOW
+    for i in range(10):
+        assert limiter.hit('ip:1', 10, now=start + i)['allowed']
+
+    # A quarter into the next window, 7.5 of the previous 10 still count
+    quarter = start + WINDOW + WINDOW // 4
+    assert limiter.hit('ip:1', 10, now=quarter)['allowed']
+    assert limiter.hit('ip:1', 10, now=quarter)['allowed']
+    assert not limiter.hit('ip:1', 10, now=quarter)['allowed']
+
+    # Two windows later the key starts fresh
+    assert limiter.hit('ip:1', 10, now=start + 3 * WINDOW)['remaining'] == 9
+
+
+def test_idle_keys_expire_through_wheel():
+    """Keys drop out once both of their windows have passed"""
+    limiter = SlidingWindowRateLimiter(window_ms=WINDOW)
+    start = 10 * WINDOW
+    for i in range(100):
+        limiter.hit(f'ip:{i}', 5, now=start)
+    assert len(limiter) == 100
+
+    # Keep one key active; the rest go idle
+    limiter.hit('ip:0', 5, now=start + WINDOW)
+    limiter.hit('ip:0', 5, now=start + 2 * WINDOW + 1)
+    assert len(limiter) == 1
+    assert limiter.get_stats()['expired_keys'] == 99
+
+    # After a long gap the whole wheel is drained
+    limiter.hit('ip:new', 5, now=start + 100 * WINDOW)
+    assert len(limiter) == 1
+
+
+class FakeRedis:
+    """In-process stand-in for the Redis commands the limiter uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.executed = 0
+        self.down = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def decrby(self, key, amount):
+        self.data[key] = self.data.get(key, 0) - amount
+        return self.data[key]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def incrby(self, key, amount):
+        self.commands.append(('incrby', key, amount))
+
+    def pexpire(self, key, ttl):
+        self.commands.append(('pexpire', key, ttl))
+
+    def get(self, key):
+        self.commands.append(('get', key))
+
+    def execute(self):
+        if self.client.down:
+            raise ConnectionError('redis unavailable')
+        self.client.executed += 1
+        results = []
+        for command, key, *args in self.commands:
+            if command == 'incrby':
+                self.client.data[key] = self.client.data.get(key, 0) + args[0]
+                results.append(self.client.data[key])
+            elif command == 'pexpire':
+                results.append(True)
+            else:
+                value = self.client.data.get(key)
+                results.append(str(value).encode() if value is not None else None)
+        return results
+
+
+def test_redis_backend_shares_limit_across_instances():
+    """Two instances on one Redis enforce a single combined limit"""
+    client = FakeRedis()
+    first = RedisRateLimiter(client, window_ms=WINDOW, batch_size=1)
+    second = RedisRateLimiter(client, window_ms=WINDOW, batch_size=1)
+    start = 10 * WINDOW
+
+    decisions = [(first if i % 2 else second).hit('ip:1', 4, now=start + i)['allowed'] for i in range(6)]
+    assert decisions == [True, True, True, True, False, False]
+    # Denied requests are handed back, so the shared count stays at the limit
+    assert client.data[f'{first.key_prefix}:ip:1:10'] == 4
+
+
+def test_redis_backend_batches_round_trips():
+    """Hits well under the limit are admitted locally and flushed in batches"""
+    client = FakeRedis()
+    limiter = RedisRateLimiter(client, window_ms=WINDOW, batch_size=5, sync_interval_ms=WINDOW)
+    start = 10 * WINDOW
+
+    for i in range(20):
+        assert limiter.hit('ip:1', 100, now=start + i)['allowed']
+    assert client.executed == 4
+    assert limiter.get_stats()['local_decisions'] == 16
+    assert client.data[f'{limiter.key_prefix}:ip:1:10'] == 16
+
+    # Close to the limit every hit goes to Redis
+    for i in range(90):
+        limiter.hit('ip:1', 100, now=start + 100 + i)
+    assert client.data[f'{limiter.key_prefix}:ip:1:10'] <= 100
+
+
+def test_redis_backend_falls_back_when_unreachable():
+    """Backend errors are counted and decided by the in-memory limiter"""
+    client = FakeRedis()
+    client.down = True
+    limiter = RedisRateLimiter(client, window_ms=WINDOW)
+    start = 10 * WINDOW
+
+    results = [limiter.hit('ip:1', 2, now=start + i)['allowed'] for i in range(3)]
+    assert results == [True, True, False]
+    # After the first error Redis is skipped instead of waiting out its timeout on every request
+    assert limiter.get_stats()['backend_errors'] == 1
+    assert limiter.get_stats()['short_circuited'] == 2
+    assert client.executed == 0
+
+    client.down = False
+    limiter.hit('ip:2', 2, now=start + limiter.retry_after_ms)
+    assert client.executed == 1
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Unit tests for compiled request validation
+"""
+
+from marshmallow import Schema, fields, post_load, validate
+
+from request_schemas import ParlaySchema
+from request_validation import CompiledValidator, compile_schema, get_validator
+
+
+def test_fast_path_matches_marshmallow_load():
+    """Well-formed payloads take the fast path and load exactly as marshmallow would"""
+    validator = CompiledValidator(ParlaySchema)
+    payloads = [
+        {'bets': [{'team': 'Lakers', 'bet_type': 'moneyline', 'odds': -150}], 'total_amount': 20},
+        {'bets': [{'team': 'Lakers', 'bet_type': 'spread', 'odds': 120, 'opposing_odds': None, 'line': -3,
+                   'game_id': 'g1', 'sport': 'nba'}], 'total_amount': 15.5, 'simulation': {'trials': 5000}},
+    ]
+    for payload in payloads:
+        result, errors = validator.validate(payload)
+        assert errors is None
+        assert result == ParlaySchema().load(payload)
+        assert type(result['total_amount']) is float
+    assert validator.stats == {'fast': 2, 'full': 0, 'invalid': 0}
+
+
+def test_invalid_and_ambiguous_payloads_fall_back_with_structured_errors():
+    """Anything the fast path cannot accept is decided by marshmallow, with per-field details"""
+    validator = CompiledValidator(ParlaySchema)
+
+    result, errors = validator.validate({'bets': [{'team': 'Lakers', 'bet_type': 'parlay', 'odds': 50}],
+                                         'total_amount': 20, 'extra': 1})
+    assert result is None
+    assert set(errors['details']) == {'bets', 'extra'}
+    assert set(errors['details']['bets'][0]) == {'bet_type', 'odds'}
+
+    # A numeric string is not an exact JSON type, but marshmallow still coerces it
+    result, errors = validator.validate({'bets': [{'team': 'Lakers', 'bet_type': 'moneyline', 'odds': '-150'}],
+                                         'total_amount': '20'})
+    assert errors is None and result['total_amount'] == 20.0
+    assert validator.stats == {'fast': 0, 'full': 2, 'invalid': 1}
+
+    assert validator.validate('not a parlay')[1]['details'] == {'_schema': ['Invalid input type.']}
+
+
+def test_schemas_with_hooks_are_not_compiled_and_validators_are_shared():
+    """Hooks could change the result, so those schemas always use the full load"""
+    class HookedSchema(Schema):
+        name = fields.Str(validate=validate.Length(min=1))
+
+        @post_load
+        def upper(self, data, **kwargs):
+            return {'name': data['name'].upper()}
+
+    assert compile_schema(HookedSchema()) is None
+    assert get_validator(HookedSchema).validate({'name': 'a'}) == ({'name': 'A'}, None)
+    assert get_validator(HookedSchema) is get_validator(HookedSchema)
+
+
+def test_nested_schema_with_hooks_and_field_validators_uses_full_load():
+    """A nested schema that cannot be compiled keeps the whole schema on the full load"""
+    class HookedLegSchema(Schema):
+        team = fields.Str(required=True)
+
+        @post_load
+        def upper(self, data, **kwargs):
+            return {'team': data['team'].upper()}
+
+    class WrapperSchema(Schema):
+        leg = fields.Nested(HookedLegSchema, required=True, validate=validate.Length(min=1))
+
+    assert compile_schema(WrapperSchema()) is None
+    assert CompiledValidator(WrapperSchema).validate({'leg': {'team': 'jazz'}}) == ({'leg': {'team': 'JAZZ'}}, None)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the in-process API response cache
+Covers fresh hits, stale-while-revalidate refreshes, misses and expiry
+"""
+
+import json
+import threading
+import time
+
+from response_cache import ResponseCache
+
+
+def payload(entry):
+    """Entries keep only the encoded body; decode it for assertions"""
+    return json.loads(entry['body'])
+
+
+def test_fresh_entry_is_served_without_loading():
+    """A fresh entry is a hit and never calls the loader"""
+    cache = ResponseCache(default_ttl=60000, max_stale=60000)
+    cache.set('odds_basketball_nba', {'games': [1]})
+
+    entry = cache.get_or_load('odds_basketball_nba', lambda: {'games': [2]})
+
+    assert payload(entry) == {'games': [1]}
+    assert 'data' not in entry
+    assert cache.stats['hits'] == 1
+    assert cache.stats['misses'] == 0
+
+
+def test_miss_loads_inline_and_none_is_not_cached():
+    """Misses load synchronously; a None result is passed through uncached"""
+    cache = ResponseCache(default_ttl=60000, max_stale=0)
+
+    assert cache.get_or_load('odds_mma', lambda: None) is None
+    assert 'odds_mma' not in cache
+
+    entry = cache.get_or_load('odds_mma', lambda: {'games': []}, ttl=1000)
+    assert entry['ttl'] == 1000
+    assert cache.stats['misses'] == 2
+
+
+def test_stale_entry_served_while_single_refresh_runs():
+    """Stale entries return immediately and trigger exactly one background refresh"""
+    cache = ResponseCache(default_ttl=60000, max_stale=60000)
+    cache.set('live_scores_all', 'old', ttl=0)
+
+    release = threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        release.wait(2)
+        return 'new'
+
+    results = [payload(cache.get_or_load('live_scores_all', slow_loader, ttl=60000)) for _ in range(5)]
+    assert results == ['old'] * 5
+    assert cache.stats['stale_hits'] == 5
+
+    release.set()
+    for _ in range(100):
+        if cache.lookup('live_scores_all')[1] == 'fresh':
+            break
+        time.sleep(0.01)
+
+    assert payload(cache.get_or_load('live_scores_all', slow_loader)) == 'new'
+    assert len(calls) == 1
+
+
+def test_entries_past_max_staleness_are_misses():
+    """Beyond the stale window an entry is treated as missing and cleaned"""
+    cache = ResponseCache(default_ttl=60000, max_stale=0)
+    cache.set('odds_basketball_nba', 'old', ttl=0)
+
+    assert cache.lookup('odds_basketball_nba') == (None, None)
+    cache.clean_expired()
+    assert len(cache) == 0
+
+
+def test_concurrent_misses_share_one_load():
+    """Concurrent misses on a hot key wait on a single loader call"""
+    cache = ResponseCache(default_ttl=60000, max_stale=0)
+    calls = []
+    started = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return {'games': ['g1']}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load('odds_basketball_nba', loader)))
+        for _ in range(8)
+    ]
+    threads[0].start()
+    started.wait(1)
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(payload(entry) == {'games': ['g1']} for entry in results)
+    assert cache.stats['coalesced'] == 7
+
+
+def test_coalesce_timeout_falls_back_to_expired_entry():
+    """Waiters that time out get the last expired entry instead of blocking"""
+    cache = ResponseCache(default_ttl=60000, max_stale=0, coalesce_timeout=50)
+    cache.set('all_games_3_True', 'expired', ttl=20)
+    time.sleep(0.05)
+    release = threading.Event()
+
+    def slow_loader():
+        release.wait(2)
+        return 'fresh'
+
+    leader = threading.Thread(target=lambda: cache.get_or_load('all_games_3_True', slow_loader))
+    leader.start()
+    time.sleep(0.05)
+
+    assert payload(cache.get_or_load('all_games_3_True', slow_loader)) == 'expired'
+    assert cache.stats['coalesce_timeouts'] == 1
+
+    release.set()
+    leader.join()
+    assert payload(cache.lookup('all_games_3_True')[0]) == 'fresh'
+
+
+def test_lru_eviction_by_entry_count():
+    """The least recently used key is evicted once max_entries is exceeded"""
+    cache = ResponseCache(default_ttl=60000, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.lookup('a')
+    cache.set('c', 3)
+
+    assert 'a' in cache and 'c' in cache
+    assert 'b' not in cache
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_eviction_by_approximate_bytes():
+    """Large payloads push older entries out to stay under max_bytes"""
+    cache = ResponseCache(default_ttl=60000, max_bytes=1000)
+    for per_sport in range(10):
+        cache.set(f'all_games_{per_sport}_True', 'x' * 300)
+
+    stats = cache.get_stats()
+    assert stats['approx_bytes'] <= 1000
+    assert stats['entries'] == 3
+
+
+def test_expiry_queue_purges_only_expired_entries():
+    """Expired entries are purged on write without touching live ones"""
+    cache = ResponseCache(default_ttl=60000, max_stale=0)
+    cache.set('live_scores_all', 'short', ttl=20)
+    cache.set('odds_basketball_nba', 'long', ttl=60000)
+    cache.set('live_scores_all', 'replaced', ttl=20)
+    time.sleep(0.05)
+
+    cache.set('odds_icehockey_nhl', 'new')
+
+    assert 'live_scores_all' not in cache
+    assert 'odds_basketball_nba' in cache
+    assert cache.get_stats()['expirations'] == 1
+
+
+def test_entries_carry_preserialized_bodies():
+    """Stored entries hold JSON bytes, a gzip variant and a content hash"""
+    import gzip
+    import hashlib
+    import json
+
+    cache = ResponseCache(default_ttl=60000)
+    payload = {'success': True, 'games': [{'id': 'g1', 'sportsbooks': {'draftkings': {'moneyline': {'home': -110}}}}]}
+    entry = cache.set('odds_basketball_nba', payload)
+
+    assert entry['body'] == json.dumps(payload).encode('utf-8')
+    assert gzip.decompress(entry['body_gzip']) == entry['body']
+    assert entry['content_hash'] == hashlib.sha256(entry['body']).hexdigest()
+    assert cache.get_or_load('odds_basketball_nba', lambda: None)['body'] is entry['body']
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the verified-token cache and public key refresher
+"""
+
+import time
+
+import pytest
+
+from token_cache import KeyRefresher, VerifiedTokenCache
+
+
+def make_verifier(claims=None, error=None):
+    calls = []
+
+    def verifier(token):
+        calls.append(token)
+        if error is not None:
+            raise error
+        return dict(claims)
+    return verifier, calls
+
+
+def test_repeat_tokens_skip_verification():
+    """A verified token is served from cache until it is re-presented after expiry"""
+    cache = VerifiedTokenCache()
+    verifier, calls = make_verifier({'uid': 'u1', 'exp': time.time() + 3600})
+
+    first = cache.verify('token-a', verifier)
+    second = cache.verify('token-a', verifier)
+
+    assert first['uid'] == second['uid'] == 'u1'
+    assert calls == ['token-a']
+    assert cache.get_stats()['hits'] == 1
+
+    # Callers mutating the returned claims do not corrupt the cache
+    second['uid'] = 'tampered'
+    assert cache.verify('token-a', verifier)['uid'] == 'u1'
+
+
+def test_entries_never_outlive_token_exp():
+    """Cached claims expire at the token's exp even when max_ttl is longer"""
+    cache = VerifiedTokenCache(max_ttl_ms=3600000)
+    now = 1_000_000_000_000
+    cache.store('token-a', {'uid': 'u1', 'exp': (now + 5000) / 1000}, now=now)
+
+    assert cache.lookup('token-a', now=now + 4999)[0]
+    assert cache.lookup('token-a', now=now + 5000) == (False, None)
+
+    cache.store('expired', {'uid': 'u1', 'exp': (now - 1) / 1000}, now=now)
+    assert len(cache) == 0
+
+
+def test_rejected_tokens_are_negatively_cached():
+    """Bad tokens are remembered briefly; transient errors are not cached"""
+    cache = VerifiedTokenCache(negative_ttl_ms=30000)
+    verifier, calls = make_verifier(error=ValueError('bad signature'))
+
+    assert cache.verify('bad', verifier) is None
+    assert cache.verify('bad', verifier) is None
+    assert calls == ['bad']
+    assert cache.get_stats()['negative_hits'] == 1
+
+    transient, calls = make_verifier(error=ConnectionError('cert fetch'))
+    with pytest.raises(ConnectionError):
+        cache.verify('good', transient, is_rejection=lambda e: not isinstance(e, ConnectionError))
+    assert cache.lookup('good') == (False, None)
+
+
+def test_cache_is_bounded_and_stores_only_digests():
+    """Old entries are evicted and raw tokens never appear as keys"""
+    cache = VerifiedTokenCache(max_entries=2)
+    for token in ('t1', 't2', 't3'):
+        cache.store(token, {'uid': token})
+
+    assert len(cache) == 2
+    assert cache.lookup('t1') == (False, None)
+    assert all(len(key) == 64 and key not in ('t2', 't3') for key in cache._entries)
+
+
+class FakeKeyResponse:
+    headers = {'Cache-Control': 'public, max-age=20000, must-revalidate, no-transform'}
+
+
+def test_key_refresher_schedules_from_max_age():
+    """Keys are refetched ahead of their Cache-Control max-age"""
+    fetches = []
+    refresher = KeyRefresher(lambda: fetches.append(1) or FakeKeyResponse())
+
+    refresher.refresh()
+    assert fetches == [1]
+    assert 15000 < refresher.refresh_at - time.time() <= 16000
+    assert refresher.maybe_refresh() is False
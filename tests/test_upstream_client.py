@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the pooled upstream HTTP client and its retry policy
+"""
+
+import pytest
+import requests
+
+from upstream_client import UpstreamClient, parse_retry_after
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSession(requests.Session):
+    """Session returning scripted responses (or raising scripted errors) in order"""
+
+    def __init__(self, script):
+        super().__init__()
+        self.script = list(script)
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        outcome = self.script.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_client(script, **kwargs):
+    sleeps = []
+    session = FakeSession(script)
+    client = UpstreamClient(session=session, sleep=sleeps.append, **kwargs)
+    return client, session, sleeps
+
+
+def test_retries_server_errors_then_succeeds():
+    """5xx responses are retried with bounded jittered backoff"""
+    client, session, sleeps = make_client([FakeResponse(503), FakeResponse(502), FakeResponse(200)])
+    response = client.get('https://api.the-odds-api.com/v4/sports/basketball_nba/odds', params={'apiKey': 'x'})
+
+    assert response.status_code == 200
+    assert len(session.calls) == 3
+    assert all(0 <= delay <= 4.0 for delay in sleeps)
+    assert session.calls[0][1]['timeout'] == client.timeout
+    assert client.get_stats()['api.the-odds-api.com'] == {'requests': 3, 'retries': 2, 'errors': 0}
+
+
+def test_honors_retry_after_and_budget():
+    """Retry-After overrides backoff; waits beyond the budget return the 429 instead"""
+    client, session, sleeps = make_client([FakeResponse(429, {'Retry-After': '2'}), FakeResponse(200)])
+    assert client.get('https://v1.basketball.api-sports.io/games').status_code == 200
+    assert sleeps == [2.0]
+
+    client, session, sleeps = make_client([FakeResponse(429, {'Retry-After': '120'})], time_budget=12)
+    assert client.get('https://v1.basketball.api-sports.io/games').status_code == 429
+    assert sleeps == []
+
+
+class SlowSession(FakeSession):
+    """FakeSession whose calls take a scripted time on a fake clock"""
+
+    def __init__(self, script, seconds_per_call):
+        super().__init__(script)
+        self.now = 0.0
+        self.seconds_per_call = seconds_per_call
+
+    def get(self, url, **kwargs):
+        self.now += self.seconds_per_call
+        return super().get(url, **kwargs)
+
+
+def test_time_budget_covers_attempts_not_just_backoff():
+    """A retry that could not finish within the budget is not started"""
+    session = SlowSession([requests.Timeout('read timed out')] * 3, seconds_per_call=10.0)
+    sleeps = []
+
+    def sleep(delay):
+        sleeps.append(delay)
+        session.now += delay
+
+    client = UpstreamClient(session=session, sleep=sleep, clock=lambda: session.now, time_budget=12)
+    with pytest.raises(requests.Timeout):
+        client.get('https://api.the-odds-api.com/v4/sports/americanfootball_nfl/odds')
+    assert len(session.calls) == 1 and sleeps == []
+    assert session.now <= 12
+
+    # Fast failures still leave room to retry inside the same budget
+    session = SlowSession([FakeResponse(503), FakeResponse(200)], seconds_per_call=0.2)
+    client = UpstreamClient(session=session, sleep=sleep, clock=lambda: session.now, time_budget=12)
+    assert client.get('https://api.the-odds-api.com/v4/sports').status_code == 200
+    assert len(session.calls) == 2
+
+
+def test_client_errors_are_not_retried_and_connection_errors_raise():
+    """4xx other than 429 return immediately; exhausted connection errors propagate"""
+    client, session, _ = make_client([FakeResponse(401)])
+    assert client.get('https://v1.hockey.api-sports.io/games').status_code == 401
+    assert len(session.calls) == 1
+
+    client, session, _ = make_client([requests.ConnectionError('reset')] * 3, max_retries=2)
+    with pytest.raises(requests.ConnectionError):
+        client.get('https://v1.hockey.api-sports.io/games')
+    assert len(session.calls) == 3
+
+
+def test_parse_retry_after():
+    """Both delta-seconds and HTTP-date forms are accepted"""
+    assert parse_retry_after('30') == 30.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None